@@ -1,7 +1,11 @@
 from rest_framework_simplejwt.authentication import JWTAuthentication
 from rest_framework_simplejwt.exceptions import InvalidToken, AuthenticationFailed
+from rest_framework_simplejwt.settings import api_settings
+from rest_framework_simplejwt.utils import get_md5_hash_password
 from rest_framework.exceptions import AuthenticationFailed as DRFAuthFailed
 from rest_framework.authentication import BaseAuthentication
+from authentication.tokens import TOKEN_VERSION_CLAIM, ClaimsUser, has_user_claims
+from users.cache import get_cached_user, user_cache
 from users.models import User
 from .utils import get_user_from_token
 
@@ -51,6 +55,38 @@ class Staff(BaseAuthentication):
 
 
 class CookieJWTAuthentication(JWTAuthentication):
+    def get_user(self, validated_token):
+        """
+        Resolve the token's user without a SELECT per request.
+
+        Tokens that carry user claims only need the user's current
+        ``token_version`` to be accepted; older tokens load a cached snapshot.
+        """
+        try:
+            user_id = validated_token[api_settings.USER_ID_CLAIM]
+        except KeyError:
+            raise InvalidToken("Token contained no recognizable user identification")
+
+        if has_user_claims(validated_token):
+            token_version = user_cache.get_token_version(user_id)
+            if token_version is None:
+                raise AuthenticationFailed("User not found", code="user_not_found")
+            if token_version != validated_token[TOKEN_VERSION_CLAIM]:
+                raise AuthenticationFailed("Token has been revoked", code="token_revoked")
+            return ClaimsUser(validated_token)
+
+        try:
+            user = get_cached_user(user_id)
+        except User.DoesNotExist:
+            raise AuthenticationFailed("User not found", code="user_not_found")
+
+        if api_settings.CHECK_USER_IS_ACTIVE and not user.is_active:
+            raise AuthenticationFailed("User is inactive", code="user_inactive")
+        if api_settings.CHECK_REVOKE_TOKEN and (
+                validated_token.get(api_settings.REVOKE_TOKEN_CLAIM) != get_md5_hash_password(user.password)):
+            raise AuthenticationFailed("The user's password has been changed.", code="password_changed")
+        return user
+
     def authenticate(self, request):
         header_token = super().authenticate(request)
         if header_token is not None:
@@ -0,0 +1,163 @@
+"""
+Response cache for the public publication endpoints.
+
+Rendered responses are stored under a key built from the route's invalidation
+groups, the path with its query string and the negotiated media type. Every
+group has a version token in the cache; :func:`invalidate` replaces the token,
+which orphans every response rendered under the old one. ``api.signals`` calls
+it when a publication or its authors change, so only the lists and detail
+pages that can show that publication are dropped.
+
+Each entry keeps the gzip and brotli encodings of the body next to the plain
+bytes (see ``api.compression``), so hits are not compressed again.
+"""
+import hashlib
+from functools import wraps
+from uuid import uuid4
+
+from django.conf import settings
+from django.core.cache import cache
+from django.http import HttpResponse
+from django.template.response import SimpleTemplateResponse
+
+from users.models import User
+from . import compression
+from .conditional import not_modified
+
+KEY_PREFIX = 'api:response'
+# Bumped when the layout of a stored entry changes.
+ENTRY_VERSION = 2
+
+POSTS = 'posts'
+EDITORIALS = 'editorials'
+# Every publication that isn't hidden, drafts included, as /api/articles/ lists them.
+ARTICLES = 'articles'
+LIST_GROUPS = (POSTS, EDITORIALS, ARTICLES)
+
+STORED_HEADERS = ('Content-Type', 'ETag', 'Last-Modified')
+
+
+def article_group(slug):
+    return f'article:{slug}'
+
+
+def list_groups(published, hidden):
+    """The lists a publication in this state appears in."""
+    if hidden:
+        return {EDITORIALS} if published else set()
+    return {POSTS, EDITORIALS, ARTICLES} if published else {ARTICLES}
+
+
+def _version_key(group):
+    return f'{KEY_PREFIX}:version:{group}'
+
+
+def get_versions(groups):
+    keys = [_version_key(group) for group in groups]
+    versions = cache.get_many(keys)
+    missing = {key: uuid4().hex for key in keys if key not in versions}
+    for key, version in missing.items():
+        # add() keeps a token another worker stored in the meantime.
+        if not cache.add(key, version, None):
+            version = cache.get(key, version)
+        versions[key] = version
+    return [versions[key] for key in keys]
+
+
+def invalidate(*groups):
+    """Drop every cached response rendered for any of ``groups``."""
+    if groups:
+        cache.set_many({_version_key(group): uuid4().hex for group in groups}, None)
+
+
+def version_validators(*groups):
+    """
+    ``api.conditional`` validators of a list: the version tokens of ``groups``.
+
+    They cost no query, and change whenever ``api.signals`` invalidates one of
+    the groups, i.e. when a publication the list can show or one of its authors
+    changes. Like cached responses, they stay stale after writes that skip both
+    the signals and :func:`invalidate`, and lists go unvalidated unless the cache
+    is ``SHARED_CACHE``. Lists carry no ``Last-Modified``.
+    """
+    def get_validators(view, request, *args, **kwargs):
+        if not settings.SHARED_CACHE:
+            return None, None
+        return '.'.join(get_versions(groups)), None
+    return get_validators
+
+
+def is_enabled():
+    return bool(settings.RESPONSE_CACHE_TTL) and settings.SHARED_CACHE
+
+
+def bypasses_cache(request):
+    """Editors and staff always see the live state of what they are working on."""
+    user = request.user
+    return user.is_authenticated and (user.is_staff or user.role == User.Role.EDITOR)
+
+
+def get_cache_key(request, groups):
+    variant = request.accepted_media_type or ''
+    digest = hashlib.md5(f'{request.get_full_path()}|{variant}'.encode()).hexdigest()
+    versions = '.'.join(get_versions(groups))
+    return f'{KEY_PREFIX}:v{ENTRY_VERSION}:{hashlib.md5(versions.encode()).hexdigest()}:{digest}'
+
+
+def _stored_headers(response):
+    return {header: response[header] for header in STORED_HEADERS if header in response}
+
+
+def _store(request, key):
+    def callback(response):
+        encoded = compression.precompress(response.content) if compression.is_compressible(request, response) else {}
+        cache.set(
+            key,
+            (response.status_code, _stored_headers(response), response.content, encoded),
+            settings.RESPONSE_CACHE_TTL,
+        )
+        encoding = compression.choose_encoding(request, encoded)
+        if encoding is not None:
+            compression.set_encoded_content(response, encoding, encoded[encoding])
+    return callback
+
+
+def cache_response(*groups):
+    """
+    Serve a view action from the response cache.
+
+    ``groups`` are invalidation groups; they are formatted with the view's URL
+    kwargs, e.g. ``cache_response('article:{slug}')``. Only successful ``GET``
+    responses are stored, and nothing is cached while ``RESPONSE_CACHE_TTL`` is 0
+    or the cache isn't ``SHARED_CACHE``: other processes would miss invalidations.
+    Stored validators answer conditional requests on a hit without a query, and
+    stored encodings serve clients that accept them without compressing.
+    """
+    def decorator(func):
+        @wraps(func)
+        def wrapper(self, request, *args, **kwargs):
+            if not is_enabled() or request.method != 'GET' or bypasses_cache(request):
+                return func(self, request, *args, **kwargs)
+
+            key = get_cache_key(request, [group.format(**kwargs) for group in groups])
+            cached = cache.get(key)
+            if cached is not None:
+                status, headers, content, encoded = cached
+                response = not_modified(request, headers)
+                if response is None:
+                    response = HttpResponse(content, status=status)
+                    for header, value in headers.items():
+                        response[header] = value
+                    encoding = compression.choose_encoding(request, encoded)
+                    if encoding is not None:
+                        compression.set_encoded_content(response, encoding, encoded[encoding], precompressed=True)
+                response['X-Cache'] = 'HIT'
+                return response
+
+            response = func(self, request, *args, **kwargs)
+            if response.status_code == 200 and isinstance(response, SimpleTemplateResponse):
+                response.add_post_render_callback(_store(request, key))
+                response['X-Cache'] = 'MISS'
+            return response
+        return wrapper
+    return decorator
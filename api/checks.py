@@ -0,0 +1,23 @@
+import os
+
+from django.conf import settings
+from django.core.cache import caches
+from django.core.cache.backends.locmem import LocMemCache
+from django.core.checks import Error, Tags, register
+
+
+@register(Tags.caches)
+def check_shared_cache(app_configs, **kwargs):
+    """
+    A local-memory cache is private to its process, so ``SHARED_CACHE`` can't
+    hold with several gunicorn workers (``WEB_CONCURRENCY``): each would keep
+    serving what the others invalidated.
+    """
+    workers = int(os.getenv('WEB_CONCURRENCY', 1))
+    if settings.SHARED_CACHE and workers > 1 and isinstance(caches['default'], LocMemCache):
+        return [Error(
+            f"SHARED_CACHE is set, but the local-memory cache isn't shared by the {workers} workers.",
+            hint="Set REDIS_URL, or unset SHARED_CACHE.",
+            id='api.E001',
+        )]
+    return []
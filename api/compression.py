@@ -0,0 +1,177 @@
+"""
+gzip and brotli compression of API responses.
+
+:class:`CompressionMiddleware` compresses ``GET``/``HEAD`` responses of the
+types in ``COMPRESSIBLE_TYPES`` once they reach ``RESPONSE_COMPRESSION['MIN_SIZE']``
+bytes, using the coding the client prefers among those available (brotli only
+when the ``brotli`` package is installed). Unsafe methods are left alone: their
+bodies may carry tokens, which compression would expose to BREACH-style
+attacks. Streaming responses are not compressed.
+
+``api.cache`` stores every encoding of a cached response next to the plain
+bytes via :func:`precompress`, so a cache hit is served without compressing
+again. :func:`get_compression_stats` reports, per encoding, the bytes saved
+and the CPU time spent compressing in this process.
+"""
+import gzip
+import time
+from threading import Lock
+
+from django.conf import settings
+from django.utils.cache import patch_vary_headers
+
+try:
+    import brotli
+except ImportError:
+    brotli = None
+
+BROTLI, GZIP = 'br', 'gzip'
+COMPRESSIBLE_TYPES = ('application/json', 'application/msgpack', 'application/x-ndjson')
+
+
+def compress_gzip(content):
+    # mtime=0 keeps the output identical for identical content.
+    return gzip.compress(content, compresslevel=settings.RESPONSE_COMPRESSION['GZIP_LEVEL'], mtime=0)
+
+
+def compress_brotli(content):
+    return brotli.compress(content, quality=settings.RESPONSE_COMPRESSION['BROTLI_QUALITY'])
+
+
+def get_compressors():
+    """Available codings and their compressors, in order of preference."""
+    compressors = {BROTLI: compress_brotli} if brotli is not None else {}
+    compressors[GZIP] = compress_gzip
+    return compressors
+
+
+class CompressionStats:
+    """Thread-safe per-encoding counters of compressed and precompressed responses."""
+    COUNTERS = ('compressed', 'served_precompressed', 'bytes_in', 'bytes_out', 'cpu_ms')
+
+    def __init__(self):
+        self._lock = Lock()
+        self._counters = {}
+
+    def _add(self, encoding, **values):
+        with self._lock:
+            counters = self._counters.setdefault(encoding, dict.fromkeys(self.COUNTERS, 0))
+            for name, value in values.items():
+                counters[name] += value
+
+    def record_compressed(self, encoding, cpu_ms):
+        self._add(encoding, compressed=1, cpu_ms=cpu_ms)
+
+    def record_served(self, encoding, size, compressed_size, precompressed=False):
+        self._add(encoding, served_precompressed=int(precompressed), bytes_in=size, bytes_out=compressed_size)
+
+    def clear(self):
+        with self._lock:
+            self._counters.clear()
+
+    def stats(self):
+        with self._lock:
+            return {
+                encoding: {
+                    **counters,
+                    'cpu_ms': round(counters['cpu_ms'], 3),
+                    'bytes_saved': counters['bytes_in'] - counters['bytes_out'],
+                    'ratio': round(counters['bytes_out'] / counters['bytes_in'], 4) if counters['bytes_in'] else 0.0,
+                }
+                for encoding, counters in self._counters.items()
+            }
+
+
+compression_stats = CompressionStats()
+
+
+def get_compression_stats():
+    return compression_stats.stats()
+
+
+def compress(content, encoding):
+    """``content`` compressed with ``encoding``; the CPU time is counted."""
+    start = time.thread_time()
+    compressed = get_compressors()[encoding](content)
+    compression_stats.record_compressed(encoding, (time.thread_time() - start) * 1000)
+    return compressed
+
+
+def parse_accept_encoding(header):
+    """``{coding: q}`` for an ``Accept-Encoding`` header."""
+    weights = {}
+    for item in header.split(','):
+        coding, *params = (part.strip() for part in item.split(';'))
+        if not coding:
+            continue
+        weight = 1.0
+        for param in params:
+            name, _, value = param.partition('=')
+            if name.strip().lower() == 'q':
+                try:
+                    weight = float(value)
+                except ValueError:
+                    weight = 0.0
+        weights[coding.lower()] = weight
+    return weights
+
+
+def choose_encoding(request, available=None):
+    """The coding to send ``request``, among ``available`` (default: all installed), or None."""
+    weights = parse_accept_encoding(request.META.get('HTTP_ACCEPT_ENCODING', ''))
+    best, best_weight = None, 0.0
+    for encoding in available if available is not None else get_compressors():
+        weight = weights.get(encoding, weights.get('*', 0.0))
+        if weight > best_weight:
+            best, best_weight = encoding, weight
+    return best
+
+
+def is_compressible(request, response):
+    content_type = response.get('Content-Type', '').split(';')[0].strip().lower()
+    return (
+        request.method in ('GET', 'HEAD')
+        and not response.streaming
+        and not response.has_header('Content-Encoding')
+        and content_type in COMPRESSIBLE_TYPES
+        and len(response.content) >= settings.RESPONSE_COMPRESSION['MIN_SIZE']
+    )
+
+
+def precompress(content):
+    """Every available encoding of ``content``, for the response cache."""
+    if len(content) < settings.RESPONSE_COMPRESSION['MIN_SIZE']:
+        return {}
+    return {encoding: compress(content, encoding) for encoding in get_compressors()}
+
+
+def set_encoded_content(response, encoding, content, precompressed=False):
+    """Send ``content``, the ``encoding`` of the response's current body, in place of it."""
+    compression_stats.record_served(encoding, len(response.content), len(content), precompressed)
+    response.content = content
+    response['Content-Length'] = str(len(content))
+    response['Content-Encoding'] = encoding
+    patch_vary_headers(response, ('Accept-Encoding',))
+    # The representation changed; the same ETag must not validate both.
+    etag = response.get('ETag')
+    if etag and etag.startswith('"'):
+        response['ETag'] = 'W/' + etag
+    return response
+
+
+class CompressionMiddleware:
+    def __init__(self, get_response):
+        self.get_response = get_response
+
+    def __call__(self, request):
+        response = self.get_response(request)
+        if not is_compressible(request, response):
+            return response
+        patch_vary_headers(response, ('Accept-Encoding',))
+        encoding = choose_encoding(request)
+        if encoding is None:
+            return response
+        compressed = compress(response.content, encoding)
+        if len(compressed) >= len(response.content):
+            return response
+        return set_encoded_content(response, encoding, compressed)
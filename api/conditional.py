@@ -0,0 +1,80 @@
+"""
+ETag / Last-Modified validators and ``304 Not Modified`` for publication reads.
+
+A detail is validated by the publication's id and ``updated_on``, read with
+one narrow query; a list by the version tokens of its response-cache groups
+when the cache is shared, see ``api.cache.version_validators``. A matching ``If-None-Match`` or
+``If-Modified-Since`` is answered before anything is serialized.
+"""
+import hashlib
+from functools import wraps
+
+from django.utils.cache import get_conditional_response
+from django.utils.http import http_date, parse_http_date_safe, quote_etag
+
+
+def detail_validators(view, request, *args, **kwargs):
+    lookup_url_kwarg = view.lookup_url_kwarg or view.lookup_field
+    queryset = view.filter_queryset(view.get_queryset()).prefetch_related(None)
+    row = queryset.filter(**{view.lookup_field: kwargs[lookup_url_kwarg]}).values_list('id', 'updated_on').first()
+    if row is None:
+        return None, None
+    return f'{row[0]}|{row[1]}', row[1]
+
+
+def make_validators(request, version, last_modified):
+    """The ``ETag`` and ``Last-Modified`` header values of one representation."""
+    variant = f'{version}|{request.get_full_path()}|{request.accepted_media_type}'
+    etag = quote_etag(hashlib.md5(variant.encode()).hexdigest())
+    return {
+        'ETag': etag,
+        'Last-Modified': http_date(last_modified.timestamp()) if last_modified else None,
+    }
+
+
+def not_modified(request, validators):
+    """A 304 carrying ``validators`` if the request's preconditions match them, else None."""
+    last_modified = validators.get('Last-Modified')
+    response = get_conditional_response(
+        request,
+        etag=validators.get('ETag'),
+        last_modified=parse_http_date_safe(last_modified) if last_modified else None,
+    )
+    if response is not None:
+        set_validators(response, validators)
+    return response
+
+
+def set_validators(response, validators):
+    for header, value in validators.items():
+        if value:
+            response[header] = value
+
+
+def conditional(get_validators):
+    """
+    Answer conditional ``GET`` requests for a view action.
+
+    ``get_validators(view, request, *args, **kwargs)`` returns a version string
+    and the last modification time, or ``(None, None)`` to skip validation.
+    """
+    def decorator(func):
+        @wraps(func)
+        def wrapper(self, request, *args, **kwargs):
+            if request.method not in ('GET', 'HEAD'):
+                return func(self, request, *args, **kwargs)
+            version, last_modified = get_validators(self, request, *args, **kwargs)
+            if version is None:
+                return func(self, request, *args, **kwargs)
+
+            validators = make_validators(request, version, last_modified)
+            response = not_modified(request, validators)
+            if response is not None:
+                return response
+
+            response = func(self, request, *args, **kwargs)
+            if response.status_code == 200:
+                set_validators(response, validators)
+            return response
+        return wrapper
+    return decorator
@@ -0,0 +1,193 @@
+"""
+Read-only rendering of list pages straight from ``values()`` rows.
+
+:class:`FastListSerializer` compiles a configured
+:class:`~api.serializer.DynamicFieldsModelSerializer` once: it works out which
+columns each rendered field reads and how the DRF field would turn the raw
+value into its representation. A page is then one ``values()`` query, with no
+model instances and no per-field ``get_attribute`` dispatch, plus one query per
+nested serializer. Nested objects are rendered once each by their DRF
+serializer and shared between the rows that reference them.
+
+The output is the same as ``serializer.data``, which the parity tests in
+``api/tests.py`` check. :func:`get_fast_serializer` returns None for
+serializers it cannot compile, and those keep the regular path. Method fields
+are called with a stand-in object carrying only their
+``method_field_sources``, so they must read nothing else.
+"""
+from collections import defaultdict
+from types import SimpleNamespace
+
+from django.core.exceptions import FieldDoesNotExist
+from django.db import models
+from django.db.models import F
+from django.db.models.fields.files import FieldFile
+from rest_framework import serializers
+
+from .serializer import DynamicFieldsModelSerializer
+
+# DRF fields whose to_representation returns database values of their type unchanged.
+PASSTHROUGH_FIELDS = (
+    serializers.CharField, serializers.SlugField, serializers.EmailField, serializers.ChoiceField,
+    serializers.IntegerField, serializers.BooleanField, serializers.JSONField,
+)
+
+
+class Unsupported(Exception):
+    """A serializer field the fast path cannot render exactly like DRF."""
+
+
+class ManyRelatedLoader:
+    """Renders a nested ``many=True`` serializer over a many-to-many field for a page of rows."""
+    SOURCE = '_fast_source_pk'
+
+    def __init__(self, model_field, child):
+        self.query_name = model_field.related_query_name()
+        self.related_model = model_field.related_model
+        self.child = child
+        self.objects = {}
+
+    def load(self, rows):
+        # One query over the join, like the prefetch, through the same default manager.
+        queryset = self.child.optimize_queryset(
+            self.related_model._default_manager.filter(**{f'{self.query_name}__in': [row['pk'] for row in rows]})
+        ).annotate(**{self.SOURCE: F(self.query_name)}).order_by('pk')
+        rendered = {}
+        self.objects = defaultdict(list)
+        for obj in queryset:
+            if obj.pk not in rendered:
+                rendered[obj.pk] = self.child.to_representation(obj)
+            self.objects[getattr(obj, self.SOURCE)].append(rendered[obj.pk])
+
+    def render(self, row):
+        return self.objects.get(row['pk'], [])
+
+
+class ForeignKeyLoader:
+    """Renders a nested serializer over a foreign key for a page of rows."""
+
+    def __init__(self, model_field, child):
+        self.column = model_field.attname
+        self.related_model = model_field.related_model
+        self.child = child
+        self.objects = {}
+
+    def load(self, rows):
+        ids = {row[self.column] for row in rows if row[self.column] is not None}
+        # select_related ignores managers, so the base manager matches it.
+        queryset = self.child.optimize_queryset(self.related_model._base_manager.filter(pk__in=ids))
+        self.objects = {obj.pk: self.child.to_representation(obj) for obj in queryset}
+
+    def render(self, row):
+        value = row[self.column]
+        return None if value is None else self.objects.get(value)
+
+
+class FastListSerializer:
+    def __init__(self, serializer):
+        self.serializer = serializer
+        self.opts = serializer.Meta.model._meta
+        self.columns = {'pk': None}
+        self.loaders = []
+        self.renderers = [
+            (name, self.compile(name, field)) for name, field in serializer.fields.items() if not field.write_only
+        ]
+
+    def get_model_field(self, source):
+        if source == '*' or '.' in source:
+            raise Unsupported(source)
+        try:
+            return self.opts.get_field(source)
+        except FieldDoesNotExist:
+            raise Unsupported(source)
+
+    def read(self, column):
+        self.columns[column] = None
+        return column
+
+    def compile(self, name, field):
+        relations = getattr(self.serializer, 'property_field_relations', {})
+        if name in relations:
+            # Mirrors Publication.content: a missing related row reads as ''.
+            column = self.read(f'{relations[name]}__{field.source}')
+            return lambda row: field.to_representation(row[column] if row[column] is not None else '')
+
+        if isinstance(field, serializers.SerializerMethodField):
+            return self.compile_method_field(name, field)
+
+        if isinstance(field, serializers.ListSerializer):
+            model_field = self.get_model_field(field.source)
+            if not (model_field.many_to_many and model_field.concrete
+                    and isinstance(field.child, DynamicFieldsModelSerializer)):
+                raise Unsupported(name)
+            loader = ManyRelatedLoader(model_field, field.child)
+            self.read('pk')
+            self.loaders.append(loader)
+            return loader.render
+
+        model_field = self.get_model_field(field.source)
+        if isinstance(field, DynamicFieldsModelSerializer):
+            if not (model_field.many_to_one or model_field.one_to_one) or not model_field.concrete:
+                raise Unsupported(name)
+            loader = ForeignKeyLoader(model_field, field)
+            self.read(model_field.attname)
+            self.loaders.append(loader)
+            return loader.render
+
+        if model_field.is_relation and not isinstance(field, serializers.PrimaryKeyRelatedField):
+            # Only plain fields reading the key itself, e.g. source='publication_id'.
+            if field.source != model_field.attname:
+                raise Unsupported(name)
+        elif isinstance(field, serializers.PrimaryKeyRelatedField):
+            if not model_field.concrete or field.pk_field is not None:
+                raise Unsupported(name)
+            column = self.read(model_field.attname)
+            return lambda row: row[column]
+        elif isinstance(field, serializers.RelatedField) or not model_field.concrete:
+            raise Unsupported(name)
+
+        column = self.read(model_field.attname)
+        if isinstance(model_field, models.FileField):
+            return lambda row: field.to_representation(FieldFile(None, model_field, row[column] or ''))
+        if type(field) in PASSTHROUGH_FIELDS:
+            return lambda row: row[column]
+        return lambda row: None if row[column] is None else field.to_representation(row[column])
+
+    def compile_method_field(self, name, field):
+        sources = self.serializer.method_field_sources.get(name)
+        if sources is None:
+            raise Unsupported(name)
+        getters = []
+        for source in sources:
+            model_field = self.get_model_field(source)
+            if not model_field.concrete or model_field.many_to_many:
+                raise Unsupported(name)
+            column = self.read(model_field.attname)
+            if isinstance(model_field, models.FileField):
+                getters.append((source, lambda row, c=column, f=model_field: FieldFile(None, f, row[c] or '')))
+            else:
+                getters.append((source, lambda row, c=column: row[c]))
+        method = getattr(self.serializer, field.method_name)
+        return lambda row: method(SimpleNamespace(**{source: get(row) for source, get in getters}))
+
+    def get_queryset(self, queryset, required_fields=()):
+        """``queryset`` as the ``values()`` rows :meth:`to_representation` reads."""
+        columns = dict.fromkeys([*self.columns, *required_fields])
+        return queryset.select_related(None).prefetch_related(None).values(*columns)
+
+    def to_representation(self, rows):
+        rows = list(rows)
+        if rows:
+            for loader in self.loaders:
+                loader.load(rows)
+        return [{name: render(row) for name, render in self.renderers} for row in rows]
+
+
+def get_fast_serializer(serializer):
+    """A :class:`FastListSerializer` rendering like ``serializer``, or None if it cannot."""
+    if not isinstance(serializer, DynamicFieldsModelSerializer):
+        return None
+    try:
+        return FastListSerializer(serializer)
+    except Unsupported:
+        return None
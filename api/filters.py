@@ -1,4 +1,3 @@
-from django.utils import timezone
 from django_filters import rest_framework as filters
 from blog.models import Article
 
@@ -13,7 +12,7 @@ class ArticleFilter(filters.FilterSet):
     def filter_by_status(self, queryset, name, value):
         status_filters = {
             'published': {'published': True},
-            'scheduled': {'published': False, 'published_on__gt': timezone.now()},
+            'scheduled': {'published': False, 'published_on__isnull': False},
             'in_progress': {'published': False, 'published_on__isnull': True},
             'rejected': {'hide': True},
             'in_review': {'approved_on__isnull': True, 'hide': False, 'published': False},
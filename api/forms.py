@@ -1,8 +1,8 @@
-from django.forms import ModelForm
+from blog.forms import PublicationBodyForm
 from blog.models import Article
 
 
-class ArticleForm(ModelForm):
+class ArticleForm(PublicationBodyForm):
     class Meta:
         model = Article
         fields = (
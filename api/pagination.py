@@ -0,0 +1,150 @@
+from base64 import b64decode, b64encode
+from collections import OrderedDict
+from urllib import parse
+
+from django.db.models import F, Q
+from django.utils.dateparse import parse_datetime
+from rest_framework.exceptions import NotFound
+from rest_framework.pagination import BasePagination
+from rest_framework.response import Response
+from rest_framework.settings import api_settings
+from rest_framework.utils.urls import remove_query_param, replace_query_param
+
+
+class PublicationCursorPagination(BasePagination):
+    """
+    Keyset pagination over publications ordered by (published_on, pk), newest first.
+
+    The cursor carries the position of the last row seen, so every page is a
+    single indexed range scan no matter how deep the client pages. Rows without
+    a publish date sort after the dated ones.
+    """
+    cursor_query_param = 'cursor'
+    page_size = api_settings.PAGE_SIZE
+    page_size_query_param = 'page_size'
+    max_page_size = 100
+    invalid_cursor_message = 'Invalid cursor'
+    # Read from the page's rows by encode_cursor, so they must be loaded.
+    cursor_fields = ('published_on', 'pk')
+
+    def paginate_queryset(self, queryset, request, view=None):
+        self.request = request
+        self.base_url = request.build_absolute_uri()
+        self.page_size = self.get_page_size(request)
+        self.cursor = self.decode_cursor(request)
+
+        reverse = self.cursor is not None and self.cursor['reverse']
+        if reverse:
+            queryset = queryset.order_by(F('published_on').asc(nulls_first=True), 'pk')
+        else:
+            queryset = queryset.order_by(F('published_on').desc(nulls_last=True), '-pk')
+
+        if self.cursor is not None:
+            queryset = queryset.filter(self.get_position_filter(self.cursor))
+
+        results = list(queryset[:self.page_size + 1])
+        has_more = len(results) > self.page_size
+        self.page = results[:self.page_size]
+
+        if reverse:
+            self.page.reverse()
+            self.has_next = True
+            self.has_previous = has_more
+        else:
+            self.has_next = has_more
+            self.has_previous = self.cursor is not None
+
+        return self.page
+
+    def get_page_size(self, request):
+        try:
+            page_size = int(request.query_params[self.page_size_query_param])
+        except (KeyError, ValueError):
+            return self.page_size
+        if page_size <= 0:
+            return self.page_size
+        return min(page_size, self.max_page_size)
+
+    def get_position_filter(self, cursor):
+        published_on, pk = cursor['published_on'], cursor['id']
+        if cursor['reverse']:
+            if published_on is None:
+                return Q(published_on__isnull=False) | Q(published_on__isnull=True, pk__gt=pk)
+            return Q(published_on__gt=published_on) | Q(published_on=published_on, pk__gt=pk)
+
+        if published_on is None:
+            return Q(published_on__isnull=True, pk__lt=pk)
+        return (
+            Q(published_on__lt=published_on)
+            | Q(published_on=published_on, pk__lt=pk)
+            | Q(published_on__isnull=True)
+        )
+
+    def decode_cursor(self, request):
+        encoded = request.query_params.get(self.cursor_query_param)
+        if encoded is None:
+            return None
+
+        try:
+            querystring = b64decode(encoded.encode('ascii')).decode('ascii')
+            tokens = parse.parse_qs(querystring, keep_blank_values=True)
+            published_on = tokens.get('p', [''])[0]
+            cursor = {
+                'published_on': parse_datetime(published_on) if published_on else None,
+                'id': int(tokens['i'][0]),
+                'reverse': bool(int(tokens.get('r', ['0'])[0])),
+            }
+        except (TypeError, ValueError, KeyError, UnicodeError):
+            raise NotFound(self.invalid_cursor_message)
+
+        if published_on and cursor['published_on'] is None:
+            raise NotFound(self.invalid_cursor_message)
+        return cursor
+
+    def get_position(self, row):
+        """``(published_on, pk)`` of a page row, a model instance or a ``values()`` dict."""
+        if isinstance(row, dict):
+            return row['published_on'], row['pk']
+        return row.published_on, row.pk
+
+    def encode_cursor(self, instance, reverse=False):
+        published_on, pk = self.get_position(instance)
+        tokens = {
+            'p': published_on.isoformat() if published_on else '',
+            'i': str(pk),
+        }
+        if reverse:
+            tokens['r'] = '1'
+        querystring = parse.urlencode(tokens, doseq=True)
+        encoded = b64encode(querystring.encode('ascii')).decode('ascii')
+        return replace_query_param(self.base_url, self.cursor_query_param, encoded)
+
+    def get_next_link(self):
+        if not self.has_next or not self.page:
+            return None
+        return self.encode_cursor(self.page[-1])
+
+    def get_previous_link(self):
+        if not self.has_previous:
+            return None
+        if not self.page:
+            return remove_query_param(self.base_url, self.cursor_query_param)
+        return self.encode_cursor(self.page[0], reverse=True)
+
+    def get_paginated_response(self, data):
+        return Response(OrderedDict([
+            ('next', self.get_next_link()),
+            ('previous', self.get_previous_link()),
+            ('results', data),
+        ]))
+
+    def get_paginated_response_schema(self, schema):
+        return {
+            'type': 'object',
+            'required': ['results'],
+            'properties': {
+                'next': {'type': 'string', 'nullable': True, 'format': 'uri'},
+                'previous': {'type': 'string', 'nullable': True, 'format': 'uri'},
+                'results': schema,
+            },
+        }
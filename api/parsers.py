@@ -0,0 +1,38 @@
+"""
+Parsers matching :mod:`api.renderers`.
+
+:class:`JSONParser` decodes UTF-8 bodies with orjson when it is installed and
+falls back to DRF's parser otherwise; both reject ``NaN`` and ``Infinity``.
+"""
+from django.conf import settings
+from rest_framework import parsers
+from rest_framework.exceptions import ParseError
+
+from .renderers import JSONRenderer, MessagePackRenderer, msgpack, orjson
+
+UTF8 = ('utf-8', 'utf8')
+
+
+class JSONParser(parsers.JSONParser):
+    renderer_class = JSONRenderer
+
+    def parse(self, stream, media_type=None, parser_context=None):
+        parser_context = parser_context or {}
+        encoding = parser_context.get('encoding', settings.DEFAULT_CHARSET)
+        if orjson is None or not self.strict or encoding.lower() not in UTF8:
+            return super().parse(stream, media_type, parser_context)
+        try:
+            return orjson.loads(stream.read())
+        except orjson.JSONDecodeError as exc:
+            raise ParseError('JSON parse error - %s' % str(exc))
+
+
+class MessagePackParser(parsers.BaseParser):
+    media_type = 'application/msgpack'
+    renderer_class = MessagePackRenderer
+
+    def parse(self, stream, media_type=None, parser_context=None):
+        try:
+            return msgpack.unpackb(stream.read(), raw=False, strict_map_key=False)
+        except ValueError as exc:
+            raise ParseError('MessagePack parse error - %s' % str(exc))
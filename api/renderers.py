@@ -0,0 +1,66 @@
+"""
+Renderers for the API.
+
+:class:`JSONRenderer` encodes with orjson when it is installed and produces the
+same bytes as DRF's renderer for compact output; indented output (the browsable
+API, ``Accept: application/json; indent=4``) and anything orjson refuses, such
+as integers beyond 64 bits, go through the stdlib encoder.
+:class:`MessagePackRenderer` serves ``application/msgpack`` when ``msgpack`` is
+installed; ``crowpro.settings`` only lists it then.
+
+Values neither library encodes natively (lazy translations, Decimals, dates)
+are converted by DRF's ``JSONEncoder.default``, so every renderer agrees on
+their representation.
+"""
+from rest_framework import renderers
+from rest_framework.utils.encoders import JSONEncoder
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+try:
+    import msgpack
+except ImportError:
+    msgpack = None
+
+# Line and paragraph separators, escaped like DRF does so output stays valid JavaScript.
+UNSAFE_CHARACTERS = (('\u2028'.encode(), b'\\u2028'), ('\u2029'.encode(), b'\\u2029'))
+
+
+def encode_default(obj):
+    return JSONEncoder().default(obj)
+
+
+class JSONRenderer(renderers.JSONRenderer):
+    def render(self, data, accepted_media_type=None, renderer_context=None):
+        if data is None:
+            return b''
+        # orjson writes compact UTF-8 and no NaN; anything else is the stdlib's job.
+        if (orjson is None or not self.compact or self.ensure_ascii or not self.strict
+                or self.get_indent(accepted_media_type, renderer_context or {}) is not None):
+            return super().render(data, accepted_media_type, renderer_context)
+        try:
+            # DRF formats datetimes itself (millisecond precision, 'Z' for UTC).
+            ret = orjson.dumps(
+                data, default=encode_default, option=orjson.OPT_NON_STR_KEYS | orjson.OPT_PASSTHROUGH_DATETIME,
+            )
+        except orjson.JSONEncodeError:
+            return super().render(data, accepted_media_type, renderer_context)
+        for character, escaped in UNSAFE_CHARACTERS:
+            if character in ret:
+                ret = ret.replace(character, escaped)
+        return ret
+
+
+class MessagePackRenderer(renderers.BaseRenderer):
+    media_type = 'application/msgpack'
+    format = 'msgpack'
+    charset = None
+    render_style = 'binary'
+
+    def render(self, data, accepted_media_type=None, renderer_context=None):
+        if data is None:
+            return b''
+        return msgpack.packb(data, default=encode_default, use_bin_type=True, datetime=False)
@@ -1,30 +1,130 @@
+from django.conf import settings
+from django.core.exceptions import FieldDoesNotExist
+from django.db.models import Prefetch
 from django.utils.timezone import datetime
 from rest_framework import serializers
 from users.models import User
-from blog.models import Article, Editorial, Publication, PublicationAuthor
+from blog import thumbnails
+from blog.models import Article, Editorial, Publication, PublicationAuthor, PublicationCard
 
 
 class DynamicFieldsModelSerializer(serializers.ModelSerializer):
     """Serializer with dynamic field selection"""
+    # Model fields read by each SerializerMethodField, used to narrow the SELECT.
+    method_field_sources = {}
+    # One-to-one relations behind fields that read a model property, joined when rendered.
+    property_field_relations = {}
 
     def __init__(self, *args, **kwargs):
         fields = kwargs.pop('fields', None)
+        exclude = kwargs.pop('exclude', None)
         super().__init__(*args, **kwargs)
         if fields:
             allowed = set(fields)
             existing = set(self.fields)
             for field in existing - allowed:
                 self.fields.pop(field)
+        if exclude:
+            for field in set(exclude) & set(self.fields):
+                self.fields.pop(field)
+
+    def get_eager_loading(self):
+        """
+        Work out what a queryset needs to render the current fields without extra queries.
+
+        Returns ``(only, select_related, prefetch_related)``. Nested serializers on
+        foreign keys are joined, nested many-to-many serializers are prefetched with
+        their own narrowed queryset. ``only`` is ``None`` when a rendered field reads
+        something other than a model field, in which case every column is loaded.
+        """
+        opts = self.Meta.model._meta
+        only = {opts.pk.name}
+        select_related, prefetch_related = [], []
+
+        for name, field in self.fields.items():
+            if field.write_only:
+                continue
+            if name in self.property_field_relations:
+                relation = self.property_field_relations[name]
+                select_related.append(relation)
+                if only is not None:
+                    only.add(relation)
+                continue
+            if isinstance(field, serializers.SerializerMethodField):
+                if name not in self.method_field_sources:
+                    only = None
+                elif only is not None:
+                    only.update(self.method_field_sources[name])
+                continue
+            if field.source == '*':
+                only = None
+                continue
+
+            source = field.source_attrs[0]
+            try:
+                model_field = opts.get_field(source)
+            except FieldDoesNotExist:
+                only = None
+                continue
+
+            if isinstance(field, (serializers.ListSerializer, serializers.ManyRelatedField)):
+                child = getattr(field, 'child', None)
+                if isinstance(child, DynamicFieldsModelSerializer):
+                    # Ordered so that api.fast renders the same list.
+                    queryset = child.optimize_queryset(model_field.related_model._default_manager.order_by('pk'))
+                    prefetch_related.append(Prefetch(source, queryset=queryset))
+                else:
+                    prefetch_related.append(source)
+            elif isinstance(field, DynamicFieldsModelSerializer):
+                child_only, child_select, child_prefetch = field.get_eager_loading()
+                select_related.append(source)
+                select_related.extend(f'{source}__{lookup}' for lookup in child_select)
+                prefetch_related.extend(_prefix_prefetch(source, lookup) for lookup in child_prefetch)
+                if only is not None:
+                    only.add(source)
+                    if child_only is None:
+                        only = None
+                    else:
+                        only.update(f'{source}__{lookup}' for lookup in child_only)
+            elif only is not None:
+                only.add(source)
+
+        return only, select_related, prefetch_related
+
+    def optimize_queryset(self, queryset, required_fields=()):
+        """
+        Apply :meth:`get_eager_loading` to ``queryset``; ``required_fields`` stay
+        loaded even when no rendered field reads them, e.g. for a paginator.
+        """
+        only, select_related, prefetch_related = self.get_eager_loading()
+        if select_related:
+            queryset = queryset.select_related(*select_related)
+        if prefetch_related:
+            queryset = queryset.prefetch_related(*prefetch_related)
+        if only is not None:
+            queryset = queryset.only(*only, *required_fields)
+        return queryset
+
+
+def _prefix_prefetch(prefix, lookup):
+    if isinstance(lookup, Prefetch):
+        return Prefetch(f'{prefix}__{lookup.prefetch_through}', queryset=lookup.queryset)
+    return f'{prefix}__{lookup}'
 
 
 class UserSerializer(DynamicFieldsModelSerializer):
     full_name = serializers.SerializerMethodField()
+    profile_img_srcset = serializers.SerializerMethodField()
+    method_field_sources = {
+        'full_name': ('first_name', 'last_name'),
+        'profile_img_srcset': ('profile_img', 'profile_img_derivatives'),
+    }
 
     class Meta:
         model = User
         fields = [
             'id', 'email', 'first_name', 'last_name', 'full_name',
-            'profile_img', 'role', 'is_active', 'date_joined'
+            'profile_img', 'profile_img_srcset', 'role', 'is_active', 'date_joined'
         ]
         read_only_fields = ['id', 'date_joined', 'role', ]
         extra_kwargs = {
@@ -34,6 +134,12 @@ class UserSerializer(DynamicFieldsModelSerializer):
     def get_full_name(self, obj):
         return obj.get_full_name()
 
+    def get_profile_img_srcset(self, obj):
+        derivatives = thumbnails.get_current(obj.profile_img.name, obj.profile_img_derivatives)
+        request = self.context.get('request')
+        return thumbnails.get_srcset(derivatives, obj.profile_img.storage,
+                                     request.build_absolute_uri if request else None)
+
 
 class AuthorSerializer(serializers.ModelSerializer):
     class Meta:
@@ -43,13 +149,30 @@ class AuthorSerializer(serializers.ModelSerializer):
 class BaseContentSerializer(DynamicFieldsModelSerializer):
     created_by = UserSerializer(read_only=True, fields=('id', 'email', 'full_name', 'profile_img'))
     authors = UserSerializer(many=True, read_only=True, fields=('id', 'email', 'full_name', 'profile_img'))
+    content = serializers.CharField()
     thumbnail_url = serializers.SerializerMethodField()
+    thumbnail_srcset = serializers.SerializerMethodField()
+    method_field_sources = {
+        'thumbnail_url': ('thumbnail',),
+        'thumbnail_srcset': ('thumbnail', 'thumbnail_derivatives'),
+    }
+    property_field_relations = {'content': 'body'}
+    # The compact representation lists render on ?view=compact: the stored summary instead of the body.
+    list_fields = (
+        'id', 'slug', 'title', 'excerpt', 'word_count', 'reading_time', 'first_image_url', 'thumbnail_url',
+        'thumbnail_srcset', 'authors', 'published', 'published_on', 'approved_on', 'updated_on',
+        'publication_type',
+    )
 
     def get_thumbnail_url(self, obj):
         if obj.thumbnail:
             return self.context['request'].build_absolute_uri(obj.thumbnail.url)
         return None
 
+    def get_thumbnail_srcset(self, obj):
+        derivatives = thumbnails.get_current(obj.thumbnail.name, obj.thumbnail_derivatives)
+        return thumbnails.get_srcset(derivatives, obj.thumbnail.storage, self.context['request'].build_absolute_uri)
+
 
 class AuthorArticleSerializer(BaseContentSerializer):
     class Meta:
@@ -61,12 +184,14 @@ class PublicationSerializer(BaseContentSerializer):
     class Meta:
         model = Publication
         fields = [
-            'id', 'slug', 'title', 'content', 'thumbnail', 'thumbnail_url',
+            'id', 'slug', 'title', 'content', 'thumbnail', 'thumbnail_url', 'thumbnail_srcset',
+            'excerpt', 'word_count', 'reading_time', 'first_image_url',
             'created_by', 'authors', 'created_on', 'updated_on',
             'published', 'published_on', 'hide', 'publication_type',
         ]
         read_only_fields = [
             'id', 'slug', 'created_on', 'updated_on',
+            'excerpt', 'word_count', 'reading_time', 'first_image_url',
             'thumbnail_url', 'published_on', 'hide', 'authors'
         ]
         extra_kwargs = {
@@ -79,13 +204,15 @@ class ArticleSerializer(BaseContentSerializer):
     class Meta:
         model = Article
         fields = [
-            'id', 'slug', 'title', 'content', 'thumbnail_url',
+            'id', 'slug', 'title', 'content', 'thumbnail_url', 'thumbnail_srcset',
+            'excerpt', 'word_count', 'reading_time', 'first_image_url',
             'created_by', 'authors', 'created_on', 'updated_on',
             'published', 'published_on', 'approved_by', 'approved_on',
             'hide', 'publication_type', 'thumbnail',
         ]
         read_only_fields = [
             'id', 'slug', 'created_on', 'updated_on', 'approved_on',
+            'excerpt', 'word_count', 'reading_time', 'first_image_url',
             'thumbnail_url', 'published_on', 'hide', 'approved_by',
             'publication_type', 'authors'
         ]
@@ -104,12 +231,14 @@ class EditorialSerializer(BaseContentSerializer):
     class Meta:
         model = Editorial
         fields = [
-            'id', 'slug', 'title', 'content', 'thumbnail', 'thumbnail_url',
+            'id', 'slug', 'title', 'content', 'thumbnail', 'thumbnail_url', 'thumbnail_srcset',
+            'excerpt', 'word_count', 'reading_time', 'first_image_url',
             'created_by', 'authors', 'created_on', 'updated_on',
             'published', 'published_on', 'hide', 'publication_type',
         ]
         read_only_fields = [
             'id', 'slug', 'created_on', 'updated_on',
+            'excerpt', 'word_count', 'reading_time', 'first_image_url',
             'thumbnail_url', 'published_on', 'hide', 'authors'
         ]
         extra_kwargs = {
@@ -119,6 +248,8 @@ class EditorialSerializer(BaseContentSerializer):
 
 
 class PublicationApproveSerializer(BaseContentSerializer):
+    content = serializers.CharField(read_only=True)
+
     class Meta:
         model = Publication
         fields = [
@@ -133,6 +264,60 @@ class PublicationApproveSerializer(BaseContentSerializer):
         ]
 
 
+class PublicationCardSerializer(DynamicFieldsModelSerializer):
+    """A feed entry, rendered from its PublicationCard without touching the publication."""
+    id = serializers.IntegerField(source='publication_id', read_only=True)
+    thumbnail_url = serializers.SerializerMethodField()
+    thumbnail_srcset = serializers.SerializerMethodField()
+    authors = serializers.SerializerMethodField()
+    method_field_sources = {
+        'thumbnail_url': ('thumbnail',),
+        'thumbnail_srcset': ('thumbnail_derivatives',),
+        'authors': ('authors',),
+    }
+
+    class Meta:
+        model = PublicationCard
+        fields = [
+            'id', 'slug', 'title', 'excerpt', 'thumbnail_url', 'thumbnail_srcset', 'authors',
+            'status', 'published_on', 'approved_on', 'publication_type',
+        ]
+        read_only_fields = fields
+
+    def storage_url(self, model, field, name):
+        """The absolute URL of ``name`` in the storage of ``model``'s ``field``, or None."""
+        if not name:
+            return None
+        return self.context['request'].build_absolute_uri(model._meta.get_field(field).storage.url(name))
+
+    def get_thumbnail_url(self, obj):
+        return self.storage_url(Publication, 'thumbnail', obj.thumbnail)
+
+    def get_thumbnail_srcset(self, obj):
+        return thumbnails.get_srcset(obj.thumbnail_derivatives, Publication._meta.get_field('thumbnail').storage,
+                                     self.context['request'].build_absolute_uri)
+
+    def get_authors(self, obj):
+        return [{**author, 'profile_img': self.storage_url(User, 'profile_img', author['profile_img'])}
+                for author in obj.authors]
+
+
+class BulkActionSerializer(serializers.Serializer):
+    """The publications a bulk workflow action applies to, by id and/or slug."""
+    ids = serializers.ListField(child=serializers.IntegerField(), required=False, default=list)
+    slugs = serializers.ListField(child=serializers.CharField(max_length=128), required=False, default=list)
+
+    def validate(self, attrs):
+        count = len(attrs['ids']) + len(attrs['slugs'])
+        if not count:
+            raise serializers.ValidationError("Give at least one id or slug.")
+        if count > settings.BULK_ACTION_MAX_ITEMS:
+            raise serializers.ValidationError(
+                f"At most {settings.BULK_ACTION_MAX_ITEMS} publications can be changed per request."
+            )
+        return attrs
+
+
 class StatisticsSerializer(serializers.Serializer):
     total_articles = serializers.IntegerField()
     published_articles = serializers.IntegerField()
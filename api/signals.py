@@ -0,0 +1,142 @@
+"""
+Invalidate cached API responses when a publication, its author list or one of
+its authors' names or pictures changes.
+
+Author changes also move the publication's ``updated_on`` forward, which the
+detail validators in ``api.conditional`` are built from; list validators are
+the group versions themselves.
+
+Invalidation runs once the surrounding transaction commits, so a response
+rendered from the old rows can never be stored under the new version.
+"""
+from django.db import transaction
+from django.db.models import Q
+from django.db.models.signals import m2m_changed, post_delete, post_save
+from django.dispatch import receiver
+from django.utils import timezone
+
+from blog import stats
+from blog.scheduler import publications_published
+from blog.thumbnails import thumbnails_generated
+from blog.models import Article, Editorial, Publication, PublicationAuthor
+from users.models import Admin, Author, Editor, Moderator, Reader, User, Writer
+from .cache import LIST_GROUPS, article_group, invalidate, list_groups
+from .workflow import publications_updated
+
+# The user fields publications render for their authors and creator.
+AUTHOR_FIELDS = {'email', 'first_name', 'last_name', 'profile_img'}
+
+
+def _invalidate_on_commit(groups):
+    if groups:
+        transaction.on_commit(lambda: invalidate(*sorted(groups)))
+
+
+def _publication_groups(instance, previous, current):
+    groups = {article_group(slug) for slug in (getattr(instance, '_loaded_slug', None), instance.slug) if slug}
+    for state in (previous, current):
+        if state is not None:
+            groups |= list_groups(state.published, state.hidden)
+    return groups
+
+
+def _touch_publications(pks):
+    """Authors are part of a publication's representation, so changing them, or their names, is a modification."""
+    Publication.objects.filter(pk__in=pks).update(updated_on=timezone.now())
+    return _stored_publication_groups(pks)
+
+
+def _stored_publication_groups(pks):
+    groups = set()
+    rows = Publication.objects.filter(pk__in=pks).values_list('slug', 'published', 'hide')
+    for slug, published, hidden in rows:
+        groups |= list_groups(published, hidden)
+        if slug:
+            groups.add(article_group(slug))
+    return groups
+
+
+@receiver(post_save, sender=Publication)
+@receiver(post_save, sender=Article)
+@receiver(post_save, sender=Editorial)
+def publication_saved(sender, instance, created, **kwargs):
+    # Publication.save replaces _stats_state after post_save, so it still holds the loaded state.
+    previous = getattr(instance, '_stats_state', None)
+    groups = _publication_groups(instance, previous, stats.get_state(instance))
+    if previous is None and not created:
+        groups.update(LIST_GROUPS)
+    instance._loaded_slug = instance.slug
+    _invalidate_on_commit(groups)
+
+
+@receiver(post_delete, sender=Publication)
+@receiver(post_delete, sender=Article)
+@receiver(post_delete, sender=Editorial)
+def publication_deleted(sender, instance, **kwargs):
+    previous = getattr(instance, '_stats_state', None)
+    groups = _publication_groups(instance, previous, None)
+    if previous is None:
+        groups.update(LIST_GROUPS)
+    _invalidate_on_commit(groups)
+
+
+@receiver(post_save, sender=PublicationAuthor)
+@receiver(post_delete, sender=PublicationAuthor)
+def publication_author_changed(sender, instance, **kwargs):
+    _invalidate_on_commit(_touch_publications([instance.publication_id]))
+
+
+@receiver(m2m_changed, sender=PublicationAuthor)
+def authors_changed(sender, instance, action, reverse, pk_set, **kwargs):
+    if reverse and action == 'pre_clear':
+        instance._cleared_publication_ids = set(
+            PublicationAuthor.objects.filter(user=instance.pk).values_list('publication_id', flat=True)
+        )
+        return
+    if action not in ('post_add', 'post_remove', 'post_clear'):
+        return
+
+    if reverse:
+        # ``instance`` is the user; the affected publications are in pk_set, or were cleared.
+        if action == 'post_clear':
+            pk_set = instance.__dict__.pop('_cleared_publication_ids', set())
+        _invalidate_on_commit(_touch_publications(pk_set))
+    else:
+        _invalidate_on_commit(_touch_publications([instance.pk]))
+
+
+@receiver(post_save, sender=User)
+@receiver(post_save, sender=Author)
+@receiver(post_save, sender=Editor)
+@receiver(post_save, sender=Moderator)
+@receiver(post_save, sender=Admin)
+@receiver(post_save, sender=Reader)
+@receiver(post_save, sender=Writer)
+def author_saved(sender, instance, created, update_fields=None, **kwargs):
+    if created or (update_fields is not None and not AUTHOR_FIELDS & set(update_fields)):
+        return
+    pks = Publication.objects.filter(Q(authors=instance.pk) | Q(created_by=instance.pk)).values_list('pk', flat=True)
+    _invalidate_on_commit(_touch_publications(set(pks)))
+
+
+@receiver(publications_published)
+def scheduled_publications_published(sender, rows, **kwargs):
+    groups = set(LIST_GROUPS)
+    groups.update(article_group(row['slug']) for row in rows if row['slug'])
+    _invalidate_on_commit(groups)
+
+
+@receiver(publications_updated)
+def bulk_publications_updated(sender, rows, values, **kwargs):
+    groups = set()
+    for row in rows:
+        groups |= list_groups(row['published'], row['hide'])
+        groups |= list_groups(values.get('published', row['published']), values.get('hide', row['hide']))
+        if row['slug']:
+            groups.add(article_group(row['slug']))
+    _invalidate_on_commit(groups)
+
+
+@receiver(thumbnails_generated)
+def publication_thumbnails_generated(sender, pks, **kwargs):
+    _invalidate_on_commit(_stored_publication_groups(pks))
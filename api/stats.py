@@ -0,0 +1,41 @@
+from django.conf import settings
+from django.core.cache import cache
+from django.db.models import Count, Q
+
+from users.models import User
+from blog import stats as publication_stats
+from blog.models import Publication
+
+STATS_CACHE_KEY = 'api:stats'
+
+
+def compute_stats():
+    """Publication counters from the rollup tables plus one aggregate over active users."""
+    article_stats = publication_stats.get_counts(Publication.PublicationType.Article)
+
+    user_stats = User.objects.filter(is_active=True).aggregate(
+        active_authors=Count('id', filter=Q(role=User.Role.AUTHOR)),
+        active_readers=Count('id', filter=Q(role=User.Role.READER)),
+    )
+
+    return {
+        "article": article_stats,
+        "user_stats": user_stats,
+    }
+
+
+def get_stats():
+    """
+    Return :func:`compute_stats`, served from a snapshot for ``STATS_CACHE_TTL`` seconds.
+
+    Dashboards poll this endpoint; a short-lived snapshot keeps them from
+    rescanning the publication table on every poll. A TTL of 0 disables it.
+    """
+    if not settings.STATS_CACHE_TTL:
+        return compute_stats()
+
+    stats = cache.get(STATS_CACHE_KEY)
+    if stats is None:
+        stats = compute_stats()
+        cache.set(STATS_CACHE_KEY, stats, settings.STATS_CACHE_TTL)
+    return stats
@@ -0,0 +1,84 @@
+from itertools import chain, islice
+
+from django.conf import settings
+from django.db.models.fields.files import FieldFile
+from django.http import StreamingHttpResponse
+from rest_framework.utils.encoders import JSONEncoder
+
+JSON, NDJSON = 'json', 'ndjson'
+
+CONTENT_TYPES = {
+    JSON: 'application/json',
+    NDJSON: 'application/x-ndjson',
+}
+
+
+def get_stream_format(request):
+    """The export format asked for with ``?stream=json`` or ``?stream=ndjson``, if any."""
+    requested = request.query_params.get('stream')
+    return requested if requested in CONTENT_TYPES else None
+
+
+def iter_chunks(queryset, chunk_size):
+    # iterator() reads through a server-side cursor and prefetches per chunk.
+    rows = queryset.iterator(chunk_size=chunk_size)
+    while True:
+        chunk = list(islice(rows, chunk_size))
+        if not chunk:
+            return
+        yield chunk
+
+
+def release(instances):
+    """
+    Break the reference cycles of serialized instances, so a chunk is freed as
+    soon as it is dropped rather than by the cyclic garbage collector. Related
+    instances loaded by ``select_related`` or ``prefetch_related`` can point
+    back at their instance, and so does every file field once it is read.
+    """
+    for instance in instances:
+        if instance is None:
+            continue
+        prefetched = instance.__dict__.pop('_prefetched_objects_cache', {})
+        related = [*instance._state.fields_cache.values(), *chain.from_iterable(prefetched.values())]
+        instance._state.fields_cache.clear()
+        for name, value in instance.__dict__.items():
+            if isinstance(value, FieldFile):
+                # The file field's descriptor wraps the name again on access.
+                instance.__dict__[name] = value.name
+        release(related)
+
+
+def iter_serialized(queryset, serializer_class, context, fmt, chunk_size):
+    encoder = JSONEncoder(ensure_ascii=False, separators=(',', ':'))
+    first = True
+    if fmt == JSON:
+        yield '['
+    # One serializer for every chunk: a serializer and its fields refer to each
+    # other, so one per chunk would keep its instances until the next collection.
+    serializer = serializer_class(many=True, context=context)
+    for chunk in iter_chunks(queryset, chunk_size):
+        rows = serializer.to_representation(chunk)
+        release(chunk)
+        if fmt == NDJSON:
+            yield ''.join(encoder.encode(row) + '\n' for row in rows)
+        else:
+            body = ','.join(encoder.encode(row) for row in rows)
+            yield body if first else ',' + body
+            first = False
+    if fmt == JSON:
+        yield ']'
+
+
+def streaming_response(queryset, serializer_class, context, fmt, chunk_size=None):
+    """
+    Serialize ``queryset`` into a StreamingHttpResponse, ``chunk_size`` rows at a time.
+
+    Only one chunk of model instances and serialized rows is alive at once, so a
+    worker's memory stays flat however many rows are exported.
+    """
+    chunk_size = chunk_size or settings.EXPORT_CHUNK_SIZE
+    return StreamingHttpResponse(
+        iter_serialized(queryset, serializer_class, context, fmt, chunk_size),
+        content_type=CONTENT_TYPES[fmt],
+    )
@@ -1,10 +1,35 @@
-from django.test import TestCase
+import gzip
+import json
+import os
+import unittest
+from datetime import timedelta
+from decimal import Decimal
+from io import BytesIO, StringIO
+
+from django.core.cache import cache
+from django.core.management import CommandError, call_command
+from django.db import connection
+from django.test import TestCase, modify_settings, override_settings
+from django.test.utils import CaptureQueriesContext
+from django.utils import timezone
+from django.utils.translation import gettext_lazy
 from unittest.mock import patch
 from .auth import Staff
+from rest_framework.exceptions import ParseError
+from rest_framework.renderers import JSONRenderer as StdlibJSONRenderer
 from rest_framework.test import APIClient
 from rest_framework import status
 from django.contrib.auth import get_user_model
-from blog.models import Editorial, Article
+from blog import cards, scheduler, stats as publication_stats
+from blog.models import Editorial, Article, Publication, PublicationStats
+from . import compression, renderers, streaming
+from .checks import check_shared_cache
+from .fast import get_fast_serializer
+from .pagination import PublicationCursorPagination
+from .parsers import JSONParser
+from .serializer import ArticleSerializer
+from .views import ArticleViewSet, EditorialViewSet, PostReadOnlyViewSet
+from users.models import Writer
 
 User = get_user_model()
 
@@ -229,3 +254,1038 @@ class PostReadOnlyViewSetTests(TestCase):
         )
         response = self.client.get(f'api/posts/{hidden_article.id}/')
         self.assertEqual(response.status_code, status.HTTP_404_NOT_FOUND)
+
+
+@modify_settings(MIDDLEWARE={'remove': ['logs.middleware.RequestLoggingMiddleware']})
+class PublicationPaginationTests(TestCase):
+    def setUp(self):
+        self.client = APIClient()
+        self.author = User.objects.create_user(
+            email='author@example.com',
+            password='password',
+            role=User.Role.AUTHOR,
+            first_name='Author',
+            last_name='User'
+        )
+        now = timezone.now()
+        self.articles = [
+            Article.objects.create(
+                title=f"Article {i}",
+                content="Content",
+                published=True,
+                published_on=now - timedelta(days=i // 2),
+                created_by=self.author
+            )
+            for i in range(7)
+        ]
+        self.draft = Article.objects.create(title="Draft", content="Content", created_by=self.author)
+
+    def collect_pages(self, url):
+        slugs, pages = [], 0
+        while url:
+            response = self.client.get(url)
+            self.assertEqual(response.status_code, status.HTTP_200_OK)
+            slugs += [item['slug'] for item in response.data['results']]
+            url = response.data['next']
+            pages += 1
+        return slugs, pages
+
+    def test_pages_follow_published_on_then_id(self):
+        slugs, pages = self.collect_pages('/api/articles/?page_size=3')
+        expected = sorted(self.articles, key=lambda a: (a.published_on, a.id), reverse=True)
+        self.assertEqual(slugs, [a.slug for a in expected] + [self.draft.slug])
+        self.assertEqual(pages, 3)
+
+    def test_previous_link_returns_preceding_page(self):
+        first = self.client.get('/api/posts/articles/published/?page_size=3').data
+        second = self.client.get(first['next']).data
+        self.assertIsNone(first['previous'])
+        back = self.client.get(second['previous']).data
+        self.assertEqual(back['results'], first['results'])
+
+    def test_page_size_is_capped(self):
+        with patch.object(PublicationCursorPagination, 'max_page_size', 3):
+            response = self.client.get('/api/posts/articles/all/?page_size=1000')
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(len(response.data['results']), 3)
+        self.assertIsNotNone(response.data['next'])
+
+    def test_invalid_cursor(self):
+        response = self.client.get('/api/posts/?cursor=garbage')
+        self.assertEqual(response.status_code, status.HTTP_404_NOT_FOUND)
+
+
+@modify_settings(MIDDLEWARE={'remove': ['logs.middleware.RequestLoggingMiddleware']})
+class QueryCountTests(TestCase):
+    def setUp(self):
+        self.client = APIClient()
+        self.author = User.objects.create_user(
+            email='author@example.com',
+            password='password',
+            role=User.Role.AUTHOR,
+            first_name='Author',
+            last_name='User'
+        )
+        self.editor = User.objects.create_user(
+            email='editor@example.com',
+            password='password',
+            role=User.Role.EDITOR,
+            first_name='Editor',
+            last_name='User'
+        )
+        self.add_publications(3)
+
+    def add_publications(self, count):
+        for _ in range(count):
+            for model in (Article, Editorial):
+                publication = model.objects.create(
+                    title=f"{model.__name__} {model.objects.count()}",
+                    content="Content",
+                    published=True,
+                    published_on=timezone.now(),
+                    publication_type=model.__name__.upper(),
+                    created_by=self.author,
+                    approved_by=self.editor,
+                )
+                publication.authors.set([self.author.id, self.editor.id])
+
+    def count_queries(self, url):
+        with CaptureQueriesContext(connection) as context:
+            response = self.client.get(url)
+        self.assertEqual(response.status_code, status.HTTP_200_OK, url)
+        return len(context)
+
+    def assertConstantQueries(self, url, expected):
+        self.assertEqual(self.count_queries(url), expected, url)
+        self.add_publications(3)
+        self.assertEqual(self.count_queries(url), expected, url)
+
+    def test_public_lists(self):
+        # The page, its authors and its creators; the compact view has no creator.
+        for url in (
+            '/api/articles/',
+            '/api/editorials/',
+            '/api/posts/articles/all/',
+            '/api/posts/articles/approved/',
+        ):
+            with self.subTest(url=url):
+                self.assertConstantQueries(url, 3)
+                self.assertConstantQueries(f'{url}?view=compact', 2)
+
+    def test_card_lists(self):
+        # Cards carry their authors, so a feed page is one query.
+        self.assertConstantQueries('/api/posts/articles/published/', 1)
+        self.assertConstantQueries('/api/posts/', 1)
+
+    def test_lists_render_compact_representation(self):
+        results = self.client.get('/api/articles/').data['results']
+        for field in ('content', 'created_by', 'approved_by', 'hide', 'created_on'):
+            self.assertIn(field, results[0])
+
+        results = self.client.get('/api/articles/?view=compact').data['results']
+        self.assertNotIn('content', results[0])
+        self.assertNotIn('created_by', results[0])
+        self.assertEqual(results[0]['excerpt'], 'Content')
+        self.assertEqual(results[0]['word_count'], 1)
+        article = Article.objects.first()
+        self.assertEqual(self.client.get(f'/api/articles/{article.slug}/').data['content'], 'Content')
+
+    def test_published_period_with_rollup_count(self):
+        self.assertConstantQueries('/api/posts/published/current-year/', 4)
+
+    def test_author_publications(self):
+        # One extra query resolves the author before listing their publications.
+        self.assertConstantQueries(f'/api/author/{self.author.id}', 3)
+
+    def test_details(self):
+        article = Article.objects.first()
+        editorial = Editorial.objects.filter(publication_type='EDITORIAL').first()
+        for url in (
+            f'/api/articles/{article.slug}/',
+            f'/api/editorials/{editorial.slug}/',
+        ):
+            with self.subTest(url=url):
+                self.assertEqual(self.count_queries(url), 3)
+        self.assertEqual(self.count_queries(f'/api/posts/{article.slug}/'), 2)
+
+    def test_approval_detail(self):
+        self.client.force_authenticate(user=self.editor)
+        article = Article.objects.first()
+        self.assertEqual(self.count_queries(f'/api/publications/{article.slug}/'), 1)
+
+    def test_author_articles(self):
+        self.client.force_authenticate(user=self.author)
+        self.assertConstantQueries('/api/myarticles', 2)
+
+    def test_users(self):
+        self.assertConstantQueries('/api/users/', 1)
+        self.assertEqual(self.count_queries(f'/api/users/{self.author.id}/'), 1)
+
+    def test_only_rendered_columns_are_selected(self):
+        article = ArticleSerializer().optimize_queryset(Article.objects.all()).first()
+        self.assertEqual(article.get_deferred_fields(), set())
+        self.assertIn('password', article.created_by.get_deferred_fields())
+        self.assertIn('password', article.authors.all()[0].get_deferred_fields())
+
+
+@modify_settings(MIDDLEWARE={'remove': ['logs.middleware.RequestLoggingMiddleware']})
+class StatsQueryTests(AuthenticationTests):
+    def setUp(self):
+        super().setUp()
+        cache.clear()
+        self.author = User.objects.create_user(
+            email='author@example.com',
+            password='password',
+            role=User.Role.AUTHOR,
+            first_name='Author',
+            last_name='User'
+        )
+        now = timezone.now()
+        Article.objects.create(title="Draft", content="Content", created_by=self.author)
+        Article.objects.create(title="Scheduled", content="Content", created_by=self.author,
+                               published_on=now + timedelta(days=1), approved_by=self.author)
+        Article.objects.create(title="Live", content="Content", created_by=self.author,
+                               published=True, published_on=now, approved_by=self.author)
+        self.client.force_authenticate(user=self.staff_user)
+
+    @override_settings(STATS_CACHE_TTL=0)
+    def test_reads_rollup_rows(self):
+        with self.assertNumQueries(3):
+            response = self.client.get('/api/stats/')
+        article = response.data['article']
+        self.assertEqual(article['total_articles'], 3)
+        self.assertEqual(article['total_published'], 1)
+        self.assertEqual(article['total_scheduled'], 1)
+        self.assertEqual(article['asking_approval'], 1)
+        self.assertEqual(article['total_unapproved'], 1)
+        self.assertEqual(article['total_approved'], 2)
+        self.assertEqual(article['today_published'], 1)
+        self.assertEqual(response.data['user_stats'], {'active_authors': 1, 'active_readers': 2})
+
+    def test_media_stats(self):
+        with self.assertNumQueries(1):
+            response = self.client.get('/api/stats/media/')
+        self.assertEqual(response.data, {'files': 0, 'saves': 0, 'stored_bytes': 0, 'saved_bytes': 0, 'ratio': 1.0})
+        self.client.force_authenticate(user=self.author)
+        self.assertEqual(self.client.get('/api/stats/media/').status_code, status.HTTP_403_FORBIDDEN)
+
+    @override_settings(STATS_CACHE_TTL=60)
+    def test_snapshot_is_reused(self):
+        first = self.client.get('/api/stats/').data
+        with self.assertNumQueries(0):
+            second = self.client.get('/api/stats/').data
+        self.assertEqual(first, second)
+
+
+@modify_settings(MIDDLEWARE={'remove': ['logs.middleware.RequestLoggingMiddleware']})
+class PublicationRollupTests(AuthenticationTests):
+    def setUp(self):
+        super().setUp()
+        cache.clear()
+        self.author = User.objects.create_user(
+            email='author@example.com',
+            password='password',
+            role=User.Role.AUTHOR,
+            first_name='Author',
+            last_name='User'
+        )
+        self.editor = User.objects.create_user(
+            email='editor@example.com',
+            password='password',
+            role=User.Role.EDITOR,
+            first_name='Editor',
+            last_name='User'
+        )
+        self.article = Article.objects.create(title="Draft", content="Content", created_by=self.author)
+
+    def counts(self):
+        return publication_stats.get_counts(Publication.PublicationType.Article)
+
+    def test_rollup_follows_the_workflow(self):
+        self.assertEqual(self.counts()['total_unapproved'], 1)
+
+        self.client.force_authenticate(user=self.editor)
+        response = self.client.patch(f'/api/publications/{self.article.slug}/', {'approved_by': self.editor.id})
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(self.counts()['total_approved'], 1)
+
+        response = self.client.patch(f'/api/articles/{self.article.slug}/', {'published': True})
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        counts = self.counts()
+        self.assertEqual((counts['total_published'], counts['today_published']), (1, 1))
+
+        self.client.delete(f'/api/articles/{self.article.slug}/')
+        self.assertEqual(PublicationStats.objects.get(publication_type='ARTICLE').hidden, 1)
+        self.assertEqual(publication_stats.find_drift(), [])
+
+        Article.objects.get(pk=self.article.pk).delete()
+        self.assertEqual(self.counts()['total_articles'], 0)
+        self.assertEqual(self.counts()['today_published'], 0)
+
+    def test_scheduled_counts_unpublished_dated_publications(self):
+        now = timezone.now()
+        Article.objects.create(title="Next week", content="Content", created_by=self.author,
+                               published_on=now + timedelta(days=7))
+        # Still awaiting approval, so blog.scheduler hasn't published it.
+        overdue = Article.objects.create(title="Last week", content="Content", created_by=self.author,
+                                         published_on=now - timedelta(days=7))
+        Article.objects.create(title="Live", content="Content", created_by=self.author, published=True,
+                               published_on=now - timedelta(days=7))
+        self.assertEqual(self.counts()['total_scheduled'], 2)
+        scheduled = self.client.get('/api/posts/articles/scheduled/').data['results']
+        self.assertEqual(self.counts()['total_scheduled'], len(scheduled))
+
+        overdue.approved_by = self.editor
+        overdue.save()
+        scheduler.publish_due()
+        self.assertEqual(self.counts()['total_scheduled'], 1)
+        self.assertEqual(publication_stats.find_drift(), [])
+
+    def test_rebuild_stats_command(self):
+        Article.objects.filter(pk=self.article.pk).update(published=True)
+        with self.assertRaises(CommandError):
+            call_command('rebuild_stats', '--check', stdout=StringIO())
+
+        call_command('rebuild_stats', stdout=StringIO())
+        self.assertEqual(publication_stats.find_drift(), [])
+        self.assertEqual(self.counts()['total_published'], 1)
+
+
+@modify_settings(MIDDLEWARE={'remove': ['logs.middleware.RequestLoggingMiddleware']})
+@override_settings(EXPORT_CHUNK_SIZE=2)
+class StreamingExportTests(TestCase):
+    def setUp(self):
+        self.client = APIClient()
+        self.author = User.objects.create_user(
+            email='author@example.com',
+            password='password',
+            role=User.Role.AUTHOR,
+            first_name='Author',
+            last_name='User'
+        )
+        for i in range(5):
+            article = Article.objects.create(title=f"Article {i}", content="Content", created_by=self.author,
+                                             published_on=timezone.now() - timedelta(days=i))
+            article.authors.set([self.author.id])
+
+    def expected(self):
+        return self.client.get('/api/posts/articles/all/?page_size=100').data['results']
+
+    def test_json_array(self):
+        response = self.client.get('/api/posts/articles/all/?stream=json')
+        self.assertTrue(response.streaming)
+        self.assertEqual(response['Content-Type'], 'application/json')
+        rows = json.loads(b''.join(response.streaming_content))
+        self.assertEqual(rows, json.loads(json.dumps(self.expected())))
+
+    def test_ndjson(self):
+        response = self.client.get('/api/posts/articles/all/?stream=ndjson')
+        self.assertEqual(response['Content-Type'], 'application/x-ndjson')
+        lines = b''.join(response.streaming_content).decode().splitlines()
+        self.assertEqual([json.loads(line)['slug'] for line in lines], [row['slug'] for row in self.expected()])
+
+    def test_queries_per_chunk(self):
+        response = self.client.get('/api/posts/articles/all/?stream=ndjson')
+        # One cursor over the rows plus one author prefetch per chunk of two.
+        with self.assertNumQueries(4):
+            list(response.streaming_content)
+
+    def test_release_breaks_reference_cycles(self):
+        article = ArticleSerializer().optimize_queryset(Article.objects.all()).first()
+        self.assertEqual({*article._state.fields_cache}, {'body', 'created_by'})
+        self.assertEqual(article.thumbnail.instance, article)
+        author = article.authors.all()[0]
+        self.assertEqual(author.profile_img.instance, author)
+
+        streaming.release([article])
+        for instance in (article, author):
+            self.assertEqual(instance._state.fields_cache, {})
+            self.assertNotIn('_prefetched_objects_cache', instance.__dict__)
+        self.assertIsInstance(author.__dict__['profile_img'], str)
+        self.assertEqual(article.thumbnail.instance, article)
+
+
+@override_settings(RESPONSE_CACHE_TTL=60)
+@modify_settings(MIDDLEWARE={'remove': ['logs.middleware.RequestLoggingMiddleware']})
+class ResponseCacheTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.client = APIClient()
+        self.author = User.objects.create_user(
+            email='author@example.com',
+            password='password',
+            role=User.Role.AUTHOR,
+            first_name='Author',
+            last_name='User'
+        )
+        self.other_author = User.objects.create_user(
+            email='other@example.com',
+            password='password',
+            role=User.Role.AUTHOR,
+            first_name='Other',
+            last_name='Author'
+        )
+        self.editor = User.objects.create_user(
+            email='editor@example.com',
+            password='password',
+            role=User.Role.EDITOR,
+            first_name='Editor',
+            last_name='User'
+        )
+        self.article = Article.objects.create(title="Published", content="Content", published=True,
+                                              published_on=timezone.now(), created_by=self.author)
+        self.article.authors.set([self.author.id])
+        self.draft = Article.objects.create(title="Draft", content="Content", created_by=self.author)
+
+    def get(self, url):
+        response = self.client.get(url)
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        return response
+
+    def assertCached(self, url):
+        with self.assertNumQueries(0):
+            response = self.get(url)
+        self.assertEqual(response['X-Cache'], 'HIT')
+        return response
+
+    def assertRendered(self, url):
+        response = self.get(url)
+        self.assertEqual(response['X-Cache'], 'MISS')
+        return response
+
+    def test_repeated_anonymous_get_is_served_from_cache(self):
+        first = self.assertRendered('/api/posts/')
+        second = self.assertCached('/api/posts/')
+        self.assertEqual(json.loads(second.content), json.loads(first.content))
+        self.assertRendered('/api/posts/?page_size=1')
+
+    def test_detail_and_editorial_routes_are_cached(self):
+        for url in (f'/api/articles/{self.article.slug}/', '/api/editorials/'):
+            self.assertRendered(url)
+            self.assertCached(url)
+
+    def test_editing_published_article_invalidates_lists_and_detail(self):
+        detail = f'/api/articles/{self.article.slug}/'
+        for url in ('/api/posts/', '/api/editorials/', detail):
+            self.get(url)
+
+        with self.captureOnCommitCallbacks(execute=True):
+            self.article.title = "Retitled"
+            self.article.save()
+
+        self.assertEqual(self.assertRendered('/api/posts/').data['results'][0]['title'], "Retitled")
+        self.assertRendered('/api/editorials/')
+        self.assertEqual(self.assertRendered(detail).data['title'], "Retitled")
+
+    def test_editing_draft_keeps_public_lists(self):
+        detail = f'/api/articles/{self.draft.slug}/'
+        self.get('/api/posts/')
+        self.get(detail)
+
+        with self.captureOnCommitCallbacks(execute=True):
+            self.draft.content = "Edited"
+            self.draft.save()
+
+        self.assertCached('/api/posts/')
+        self.assertRendered(detail)
+
+    def test_publishing_draft_invalidates_lists(self):
+        self.get('/api/posts/')
+        with self.captureOnCommitCallbacks(execute=True):
+            self.draft.published = True
+            self.draft.published_on = timezone.now()
+            self.draft.save()
+
+        slugs = [row['slug'] for row in self.assertRendered('/api/posts/').data['results']]
+        self.assertIn(self.draft.slug, slugs)
+
+    def test_author_changes_invalidate(self):
+        self.get('/api/posts/')
+        with self.captureOnCommitCallbacks(execute=True):
+            self.article.authors.add(self.other_author.id)
+        authors = self.assertRendered('/api/posts/').data['results'][0]['authors']
+        self.assertEqual(len(authors), 2)
+
+        with self.captureOnCommitCallbacks(execute=True):
+            Writer.objects.get(pk=self.other_author.pk).publications.clear()
+        authors = self.assertRendered('/api/posts/').data['results'][0]['authors']
+        self.assertEqual(len(authors), 1)
+
+    def test_scheduled_publishing_invalidates_lists(self):
+        self.get('/api/posts/')
+        Article.objects.filter(pk=self.draft.pk).update(approved_by=self.editor, published_on=timezone.now())
+        with self.captureOnCommitCallbacks(execute=True):
+            self.assertEqual(scheduler.publish_due(), 1)
+
+        slugs = [row['slug'] for row in self.assertRendered('/api/posts/').data['results']]
+        self.assertIn(self.draft.slug, slugs)
+
+    def test_changes_apply_only_after_commit(self):
+        self.get('/api/posts/')
+        with self.captureOnCommitCallbacks(execute=False) as callbacks:
+            self.article.title = "Retitled"
+            self.article.save()
+            self.assertCached('/api/posts/')
+        self.assertTrue(callbacks)
+
+    def test_editors_bypass_cache(self):
+        self.get('/api/posts/')
+        self.client.force_authenticate(self.editor)
+        response = self.get('/api/posts/')
+        self.assertNotIn('X-Cache', response)
+
+        self.client.force_authenticate(self.author)
+        self.assertCached('/api/posts/')
+
+    @override_settings(RESPONSE_CACHE_TTL=0)
+    def test_disabled(self):
+        self.assertNotIn('X-Cache', self.get('/api/posts/'))
+        self.assertNotIn('X-Cache', self.get('/api/posts/'))
+
+    @override_settings(SHARED_CACHE=False)
+    def test_disabled_without_a_shared_cache(self):
+        self.assertNotIn('X-Cache', self.get('/api/posts/'))
+        self.assertNotIn('X-Cache', self.get('/api/posts/'))
+
+
+class SharedCacheCheckTests(TestCase):
+    def test_local_memory_cache_with_several_workers(self):
+        self.assertEqual(check_shared_cache(None), [])
+        with patch.dict(os.environ, {'WEB_CONCURRENCY': '3'}):
+            self.assertEqual([error.id for error in check_shared_cache(None)], ['api.E001'])
+            with override_settings(SHARED_CACHE=False):
+                self.assertEqual(check_shared_cache(None), [])
+
+
+@override_settings(RESPONSE_COMPRESSION={'MIN_SIZE': 200, 'GZIP_LEVEL': 6, 'BROTLI_QUALITY': 5})
+@modify_settings(MIDDLEWARE={'remove': ['logs.middleware.RequestLoggingMiddleware']})
+class CompressionTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        compression.compression_stats.clear()
+        self.client = APIClient()
+        author = User.objects.create_user(email='author@example.com', password='password', role=User.Role.AUTHOR,
+                                          first_name='Author', last_name='User', profile_img='')
+        for i in range(5):
+            article = Article.objects.create(title=f"Article {i}", content="<p>Content</p>" * 50, published=True,
+                                             published_on=timezone.now(), created_by=author)
+            article.authors.set([author.id])
+
+    def get(self, url, encoding='gzip'):
+        response = self.client.get(url, HTTP_ACCEPT_ENCODING=encoding)
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        return response
+
+    def test_choose_encoding(self):
+        for header, expected in (
+            ('gzip, deflate', 'gzip'),
+            ('gzip;q=0, br;q=0', None),
+            ('*', 'br' if compression.brotli else 'gzip'),
+            ('gzip;q=0.5, br', 'br' if compression.brotli else 'gzip'),
+            ('identity', None),
+            ('', None),
+        ):
+            with self.subTest(header=header):
+                request = type('Request', (), {'META': {'HTTP_ACCEPT_ENCODING': header}})()
+                self.assertEqual(compression.choose_encoding(request), expected)
+
+    def test_large_responses_are_gzipped(self):
+        plain = self.get('/api/posts/articles/all/', encoding='')
+        response = self.get('/api/posts/articles/all/')
+        self.assertNotIn('Content-Encoding', plain)
+        self.assertEqual(response['Content-Encoding'], 'gzip')
+        self.assertIn('Accept-Encoding', response['Vary'])
+        self.assertEqual(gzip.decompress(response.content), plain.content)
+        self.assertEqual(int(response['Content-Length']), len(response.content))
+
+        stats = compression.get_compression_stats()['gzip']
+        self.assertEqual(stats['compressed'], 1)
+        self.assertEqual(stats['bytes_saved'], len(plain.content) - len(response.content))
+
+    @override_settings(RESPONSE_COMPRESSION={'MIN_SIZE': 10 ** 7, 'GZIP_LEVEL': 6, 'BROTLI_QUALITY': 5})
+    def test_small_responses_are_not_compressed(self):
+        self.assertNotIn('Content-Encoding', self.get('/api/posts/articles/all/'))
+        self.assertEqual(compression.get_compression_stats(), {})
+
+    @override_settings(RESPONSE_CACHE_TTL=60)
+    def test_cache_hits_reuse_compressed_variants(self):
+        first = self.get('/api/posts/')
+        self.assertEqual(first['X-Cache'], 'MISS')
+        compressed = compression.get_compression_stats()[compression.GZIP]['compressed']
+
+        for encoding in ('gzip', 'gzip;q=1, br;q=0'):
+            hit = self.get('/api/posts/', encoding=encoding)
+            self.assertEqual(hit['X-Cache'], 'HIT')
+            self.assertEqual(hit['Content-Encoding'], 'gzip')
+            self.assertEqual(hit.content, first.content)
+            self.assertIn('Accept-Encoding', hit['Vary'])
+            self.assertTrue(hit['ETag'].startswith('W/'))
+
+        plain = self.get('/api/posts/', encoding='')
+        self.assertNotIn('Content-Encoding', plain)
+        self.assertEqual(gzip.decompress(first.content), plain.content)
+
+        stats = compression.get_compression_stats()[compression.GZIP]
+        self.assertEqual(stats['compressed'], compressed)
+        self.assertEqual(stats['served_precompressed'], 2)
+
+    @unittest.skipIf(compression.brotli is None, 'brotli is not installed')
+    def test_brotli(self):
+        plain = self.get('/api/posts/articles/all/', encoding='')
+        response = self.get('/api/posts/articles/all/', encoding='gzip, br')
+        self.assertEqual(response['Content-Encoding'], 'br')
+        self.assertEqual(compression.brotli.decompress(response.content), plain.content)
+
+
+@modify_settings(MIDDLEWARE={'remove': ['logs.middleware.RequestLoggingMiddleware']})
+class ConditionalGetTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.client = APIClient()
+        self.author = User.objects.create_user(
+            email='author@example.com',
+            password='password',
+            role=User.Role.AUTHOR,
+            first_name='Author',
+            last_name='User'
+        )
+        self.article = Article.objects.create(title="Published", content="Content", published=True,
+                                              published_on=timezone.now(), created_by=self.author)
+        self.article.authors.set([self.author.id])
+        self.detail = f'/api/articles/{self.article.slug}/'
+
+    def test_timestamps(self):
+        created_on = self.article.created_on
+        self.article.title = "Retitled"
+        self.article.save()
+        self.article.refresh_from_db()
+        self.assertEqual(self.article.created_on, created_on)
+        self.assertGreater(self.article.updated_on, created_on)
+
+    def test_detail_not_modified(self):
+        response = self.client.get(self.detail)
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertIn('Last-Modified', response)
+
+        with self.assertNumQueries(1):
+            response = self.client.get(self.detail, HTTP_IF_NONE_MATCH=response['ETag'])
+        self.assertEqual(response.status_code, status.HTTP_304_NOT_MODIFIED)
+        self.assertEqual(response.content, b'')
+        self.assertIn('ETag', response)
+
+        response = self.client.get(self.detail, HTTP_IF_MODIFIED_SINCE=response['Last-Modified'])
+        self.assertEqual(response.status_code, status.HTTP_304_NOT_MODIFIED)
+
+    def test_detail_changes_after_edit(self):
+        etag = self.client.get(self.detail)['ETag']
+        self.article.title = "Retitled"
+        self.article.save()
+        response = self.client.get(self.detail, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertNotEqual(response['ETag'], etag)
+
+    def test_author_change_is_a_modification(self):
+        etag = self.client.get(self.detail)['ETag']
+        other = User.objects.create_user(email='other@example.com', password='password', role=User.Role.AUTHOR,
+                                         first_name='Other', last_name='Author')
+        self.article.authors.add(other.id)
+        response = self.client.get(self.detail, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+
+    def test_author_rename_is_a_modification(self):
+        etags = {url: self.client.get(url)['ETag'] for url in ('/api/posts/', '/api/articles/', self.detail)}
+        with self.captureOnCommitCallbacks(execute=True):
+            User.objects.filter(pk=self.author.pk).update(last_login=timezone.now())
+            Writer.objects.get(pk=self.author.pk).save(update_fields=['last_login'])
+        for url, etag in etags.items():
+            self.assertEqual(self.client.get(url, HTTP_IF_NONE_MATCH=etag).status_code,
+                             status.HTTP_304_NOT_MODIFIED, url)
+
+        writer = Writer.objects.get(pk=self.author.pk)
+        writer.first_name = 'Renamed'
+        with self.captureOnCommitCallbacks(execute=True):
+            writer.save(update_fields=['first_name'])
+        for url, etag in etags.items():
+            response = self.client.get(url, HTTP_IF_NONE_MATCH=etag)
+            self.assertEqual(response.status_code, status.HTTP_200_OK, url)
+        self.assertEqual(response.data['authors'][0]['full_name'], 'Renamed User')
+
+    def test_list_validators(self):
+        for url in ('/api/posts/', '/api/articles/', '/api/editorials/'):
+            etag = self.client.get(url)['ETag']
+            response = self.client.get(url, HTTP_IF_NONE_MATCH=etag)
+            self.assertEqual(response.status_code, status.HTTP_304_NOT_MODIFIED, url)
+            self.assertNotEqual(self.client.get(f'{url}?page_size=1')['ETag'], etag)
+
+        etag = self.client.get('/api/posts/')['ETag']
+        with self.captureOnCommitCallbacks(execute=True):
+            Article.objects.create(title="Second", content="Content", published=True,
+                                   published_on=timezone.now(), created_by=self.author)
+        response = self.client.get('/api/posts/', HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+
+    def test_list_validators_cost_no_query(self):
+        etag = self.client.get('/api/articles/')['ETag']
+        with self.assertNumQueries(0):
+            response = self.client.get('/api/articles/', HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, status.HTTP_304_NOT_MODIFIED)
+        self.assertNotIn('Last-Modified', response)
+
+    def test_draft_changes_article_list(self):
+        etag = self.client.get('/api/articles/')['ETag']
+        posts_etag = self.client.get('/api/posts/')['ETag']
+        with self.captureOnCommitCallbacks(execute=True):
+            Article.objects.create(title="Draft", content="Content", created_by=self.author)
+        response = self.client.get('/api/articles/', HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        # Drafts are not in the public feed, so its validators still hold.
+        response = self.client.get('/api/posts/', HTTP_IF_NONE_MATCH=posts_etag)
+        self.assertEqual(response.status_code, status.HTTP_304_NOT_MODIFIED)
+
+    @override_settings(SHARED_CACHE=False)
+    def test_lists_unvalidated_without_a_shared_cache(self):
+        for url in ('/api/articles/', '/api/posts/', '/api/editorials/'):
+            self.assertNotIn('ETag', self.client.get(url))
+        self.assertIn('ETag', self.client.get(self.detail))
+
+    def test_missing_publication(self):
+        response = self.client.get('/api/articles/missing/', HTTP_IF_NONE_MATCH='"anything"')
+        self.assertEqual(response.status_code, status.HTTP_404_NOT_FOUND)
+
+    @override_settings(RESPONSE_CACHE_TTL=60)
+    def test_cached_validators_answer_without_queries(self):
+        etag = self.client.get('/api/posts/')['ETag']
+        with self.assertNumQueries(0):
+            response = self.client.get('/api/posts/', HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, status.HTTP_304_NOT_MODIFIED)
+        self.assertEqual(response['X-Cache'], 'HIT')
+        self.assertEqual(self.client.get('/api/posts/')['ETag'], etag)
+
+
+@modify_settings(MIDDLEWARE={'remove': ['logs.middleware.RequestLoggingMiddleware']})
+class FieldSelectionTests(TestCase):
+    def setUp(self):
+        self.client = APIClient()
+        self.author = User.objects.create_user(
+            email='author@example.com',
+            password='password',
+            role=User.Role.AUTHOR,
+            first_name='Author',
+            last_name='User'
+        )
+        for i in range(3):
+            article = Article.objects.create(title=f"Article {i}", content="Content", published=True,
+                                             published_on=timezone.now() - timedelta(days=i), created_by=self.author)
+            article.authors.set([self.author.id])
+
+    def get(self, url):
+        with CaptureQueriesContext(connection) as context:
+            response = self.client.get(url)
+        self.assertEqual(response.status_code, status.HTTP_200_OK, url)
+        return response, context.captured_queries
+
+    def test_fields_narrow_the_query(self):
+        response, queries = self.get('/api/articles/?fields=slug,title,published_on&page_size=2')
+        self.assertEqual(set(response.data['results'][0]), {'slug', 'title', 'published_on'})
+        # One narrow SELECT without joins or prefetches.
+        self.assertEqual(len(queries), 1)
+        sql = queries[-1]['sql']
+        self.assertNotIn('excerpt', sql)
+        self.assertNotIn('JOIN', sql)
+
+        # The cursor is built from the loaded ordering fields, without extra queries.
+        response, queries = self.get(response.data['next'])
+        self.assertEqual([row['title'] for row in response.data['results']], ['Article 2'])
+        self.assertEqual(len(queries), 1)
+
+    def test_exclude_skips_nested_serializers(self):
+        response, queries = self.get('/api/articles/?exclude=authors,created_by,excerpt')
+        self.assertNotIn('authors', response.data['results'][0])
+        self.assertIn('title', response.data['results'][0])
+        self.assertEqual(len(queries), 1)
+
+    def test_detail_and_cards(self):
+        slug = Article.objects.first().slug
+        response, _ = self.get(f'/api/posts/{slug}/?fields=slug,content')
+        self.assertEqual(response.data, {'slug': slug, 'content': 'Content'})
+        response, _ = self.get('/api/posts/?fields=id,slug')
+        self.assertEqual(set(response.data['results'][0]), {'id', 'slug'})
+
+    def test_user_role_lists(self):
+        for i in range(3):
+            User.objects.create_user(email=f'reader{i}@example.com', password='password', role=User.Role.READER,
+                                     first_name='Reader', last_name=str(i))
+            User.objects.create_user(email=f'author{i}@example.com', password='password', role=User.Role.AUTHOR,
+                                     first_name='Author', last_name=str(i))
+        for url in ('/api/users/authors/', '/api/users/readers/'):
+            with self.subTest(url=url):
+                response, queries = self.get(f'{url}?fields=id,email')
+                self.assertEqual(len(response.data), 4 if 'authors' in url else 3)
+                self.assertEqual(set(response.data[0]), {'id', 'email'})
+                self.assertEqual(len(queries), 1)
+
+    def test_unknown_field(self):
+        response = self.client.get('/api/articles/?fields=slug,secret')
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertIn('secret', str(response.data['fields']))
+
+
+@override_settings(STORAGES={
+    'default': {'BACKEND': 'django.core.files.storage.InMemoryStorage'},
+    'staticfiles': {'BACKEND': 'django.contrib.staticfiles.storage.StaticFilesStorage'},
+})
+@modify_settings(MIDDLEWARE={'remove': ['logs.middleware.RequestLoggingMiddleware']})
+class FastListParityTests(TestCase):
+    """api.fast must render list pages byte for byte like the DRF serializers."""
+
+    def setUp(self):
+        self.client = APIClient()
+        self.author = User.objects.create_user(email='author@example.com', password='password', role=User.Role.AUTHOR,
+                                               first_name='Author', last_name='User')
+        self.editor = User.objects.create_user(email='editor@example.com', password='password', role=User.Role.EDITOR,
+                                               first_name='Édith', last_name='Éditor ', profile_img='')
+        now = timezone.now()
+        for i, model in enumerate((Article, Editorial) * 3):
+            publication = model.objects.create(
+                title=f"{model.__name__} «{i}»",
+                content=f'<p>Body {i}</p><img src="/media/images/{i}.png">' if i % 2 else '',
+                published=True,
+                published_on=now - timedelta(hours=i, microseconds=i) if i != 4 else None,
+                publication_type=model.__name__.upper(),
+                created_by=self.author,
+                approved_by=self.editor if i % 3 else None,
+                approved_on=now if i % 3 else None,
+                thumbnail=f'images/thumb-{i}.png' if i % 2 else None,
+            )
+            publication.authors.set([self.editor.id, self.author.id] if i % 2 else [self.author.id])
+        Publication.objects.filter(thumbnail='images/thumb-1.png').update(thumbnail_derivatives={
+            'source': 'images/thumb-1.png',
+            'images': [{'width': 320, 'format': fmt, 'name': f'images/thumb-1.w320.{ext}'}
+                       for fmt, ext in (('webp', 'webp'), ('jpeg', 'jpg'))],
+        })
+        cards.refresh(Publication.objects.values_list('pk', flat=True))
+        self.staff = User.objects.create_user(email='staff@example.com', password='password', is_staff=True,
+                                              first_name='Staff', last_name='User')
+
+    def assertParity(self, url):
+        for viewset in (ArticleViewSet, EditorialViewSet, PostReadOnlyViewSet):
+            self.assertTrue(viewset.fast_lists)
+        fast = self.client.get(url)
+        with patch.object(ArticleViewSet, 'fast_lists', False), \
+                patch.object(EditorialViewSet, 'fast_lists', False), \
+                patch.object(PostReadOnlyViewSet, 'fast_lists', False):
+            slow = self.client.get(url)
+        self.assertEqual(fast.status_code, status.HTTP_200_OK, url)
+        self.assertTrue(fast.data['results'], url)
+        self.assertEqual(fast.content, slow.content, url)
+
+    def test_public_lists(self):
+        for url in (
+            '/api/articles/',
+            '/api/editorials/',
+            '/api/posts/',
+            '/api/posts/articles/published/',
+            '/api/posts/articles/all/',
+            '/api/posts/articles/approved/',
+            '/api/posts/published/current-year/',
+        ):
+            with self.subTest(url=url):
+                self.assertParity(url)
+
+    def test_thumbnail_srcset(self):
+        for url in ('/api/editorials/', '/api/posts/'):
+            with self.subTest(url=url):
+                srcsets = [row['thumbnail_srcset'] for row in self.client.get(url).data['results']]
+                self.assertIn({
+                    'webp': 'http://testserver/media/images/thumb-1.w320.webp 320w',
+                    'jpeg': 'http://testserver/media/images/thumb-1.w320.jpg 320w',
+                }, srcsets)
+
+    def test_field_selections(self):
+        for query in (
+            'fields=id,content,created_by,approved_by,created_on,hide,thumbnail_url',
+            'fields=slug,published_on&page_size=2',
+            'exclude=authors,excerpt',
+            'fields=authors',
+        ):
+            with self.subTest(query=query):
+                self.assertParity(f'/api/articles/?{query}')
+                self.assertParity(f'/api/posts/articles/all/?{query}')
+
+    def test_pages(self):
+        url = '/api/articles/?page_size=1'
+        while url:
+            self.assertParity(url)
+            url = self.client.get(url).data['next']
+
+    def test_unsupported_serializer_falls_back(self):
+        serializer = ArticleSerializer(context={'request': None})
+        self.assertIsNotNone(get_fast_serializer(serializer))
+        serializer.fields['created_by'].source = '*'
+        self.assertIsNone(get_fast_serializer(serializer))
+
+
+class RendererTests(TestCase):
+    data = {
+        'title': 'Line\u2028separated «quotes» \U0001f426',
+        'published_on': timezone.now(),
+        'day': timezone.now().date(),
+        'rating': Decimal('4.50'),
+        'label': gettext_lazy('Published'),
+        'nested': [{'id': 1, 'tags': ('a', 'b')}, None, 1.5, True],
+        1: 'integer key',
+    }
+
+    def assertSameJSON(self, data, accepted_media_type=None):
+        expected = StdlibJSONRenderer().render(data, accepted_media_type)
+        self.assertEqual(renderers.JSONRenderer().render(data, accepted_media_type), expected)
+
+    def test_json_matches_stdlib_renderer(self):
+        self.assertIsNotNone(renderers.orjson)
+        self.assertSameJSON(self.data)
+        self.assertSameJSON(self.data, 'application/json; indent=4')
+        self.assertSameJSON({'big': 2 ** 70})
+        self.assertEqual(renderers.JSONRenderer().render(None), b'')
+
+    def test_json_without_orjson(self):
+        with patch.object(renderers, 'orjson', None):
+            self.assertSameJSON(self.data)
+
+    def test_api_responses(self):
+        response = APIClient().get('/api/articles/', HTTP_ACCEPT='application/json')
+        self.assertEqual(response.content, StdlibJSONRenderer().render(response.data))
+
+    def test_json_parser(self):
+        body = '{"title": "«Crow»", "ids": [1, 2], "draft": false}'.encode()
+        self.assertEqual(JSONParser().parse(BytesIO(body)), json.loads(body))
+        for invalid in (b'{"title": ', b'{"score": NaN}'):
+            with self.subTest(body=invalid), self.assertRaises(ParseError):
+                JSONParser().parse(BytesIO(invalid))
+
+    @unittest.skipIf(renderers.msgpack is None, 'msgpack is not installed')
+    def test_msgpack_negotiation(self):
+        from .parsers import MessagePackParser
+
+        author = User.objects.create_user(email='author@example.com', password='password', role=User.Role.AUTHOR,
+                                          first_name='Author', last_name='User', profile_img='')
+        article = Article.objects.create(title='Packed', content='<p>Body</p>', published=True,
+                                         published_on=timezone.now(), created_by=author)
+        article.authors.set([author.id])
+        response = APIClient().get('/api/articles/', HTTP_ACCEPT='application/msgpack')
+        self.assertEqual(response['Content-Type'], 'application/msgpack')
+        self.assertEqual(
+            MessagePackParser().parse(BytesIO(response.content)),
+            json.loads(APIClient().get('/api/articles/').content),
+        )
+
+    @unittest.skipIf(renderers.msgpack is not None, 'msgpack is installed')
+    def test_msgpack_not_offered_without_msgpack(self):
+        response = APIClient().get('/api/articles/', HTTP_ACCEPT='application/msgpack')
+        self.assertEqual(response.status_code, status.HTTP_406_NOT_ACCEPTABLE)
+
+
+@modify_settings(MIDDLEWARE={'remove': ['logs.middleware.RequestLoggingMiddleware']})
+class BulkActionTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.client = APIClient()
+        self.author = User.objects.create_user(email='author@example.com', password='password', role=User.Role.AUTHOR,
+                                               first_name='Author', last_name='User', profile_img='')
+        self.editor = User.objects.create_user(email='editor@example.com', password='password', role=User.Role.EDITOR,
+                                               first_name='Editor', last_name='User', profile_img='')
+        self.client.force_authenticate(self.editor)
+
+    def create(self, title, **kwargs):
+        article = Article.objects.create(title=title, content='<p>Body</p>', created_by=self.author, **kwargs)
+        article.authors.set([self.author.id])
+        return article
+
+    def post(self, action, expected_status=status.HTTP_200_OK, **data):
+        response = self.client.post(f'/api/publications/bulk/{action}/', data, format='json')
+        self.assertEqual(response.status_code, expected_status, response.content)
+        return response
+
+    def assertStatsConsistent(self):
+        self.assertEqual(publication_stats.find_drift(), [])
+
+    def test_approve(self):
+        pending = self.create("Pending")
+        approved = self.create("Approved", approved_by=self.editor, approved_on=timezone.now())
+        hidden = self.create("Hidden", hide=True)
+
+        response = self.post('approve', ids=[pending.pk, approved.pk, 0], slugs=[hidden.slug, pending.slug, 'missing'])
+        self.assertEqual(response.data['updated'], 2)
+        self.assertEqual([(result.get('id'), result['status']) for result in response.data['results']], [
+            (pending.pk, 'updated'), (approved.pk, 'rejected'), (0, 'not_found'),
+            (hidden.pk, 'rejected'), (pending.pk, 'updated'), (None, 'not_found'),
+        ])
+        self.assertEqual(response.data['results'][1]['detail'], "This publication was already approved.")
+
+        pending.refresh_from_db()
+        self.assertEqual(pending.approved_by_id, self.editor.pk)
+        self.assertIsNotNone(pending.approved_on)
+        self.assertStatsConsistent()
+
+    def test_publish_requires_approval(self):
+        unapproved = self.create("Unapproved")
+        approved = self.create("Approved", approved_by=self.editor, approved_on=timezone.now())
+        published = self.create("Published", approved_by=self.editor, published=True, published_on=timezone.now())
+
+        response = self.post('publish', ids=[unapproved.pk, approved.pk, published.pk])
+        self.assertEqual([result['status'] for result in response.data['results']], ['rejected', 'updated', 'unchanged'])
+        self.assertEqual(response.data['results'][0]['detail'], "Article must be approved before publishing.")
+
+        approved.refresh_from_db()
+        unapproved.refresh_from_db()
+        self.assertTrue(approved.published)
+        self.assertIsNotNone(approved.published_on)
+        self.assertEqual(approved.card.status, 'PUBLISHED')
+        self.assertFalse(unapproved.published)
+        self.assertStatsConsistent()
+
+        response = self.post('unpublish', ids=[approved.pk, unapproved.pk])
+        self.assertEqual([result['status'] for result in response.data['results']], ['updated', 'unchanged'])
+        approved.refresh_from_db()
+        self.assertFalse(approved.published)
+        self.assertIsNone(approved.published_on)
+        self.assertStatsConsistent()
+
+    @override_settings(RESPONSE_CACHE_TTL=60)
+    def test_hide_refreshes_cards_and_cached_lists(self):
+        article = self.create("Visible", approved_by=self.editor, published=True, published_on=timezone.now())
+        self.client.force_authenticate(None)
+        self.assertEqual(len(self.client.get('/api/posts/').data['results']), 1)
+
+        self.client.force_authenticate(self.editor)
+        with self.captureOnCommitCallbacks(execute=True):
+            self.post('hide', slugs=[article.slug])
+
+        self.client.force_authenticate(None)
+        response = self.client.get('/api/posts/')
+        self.assertEqual(response['X-Cache'], 'MISS')
+        self.assertEqual(response.data['results'], [])
+        article.refresh_from_db()
+        self.assertEqual(article.card.status, 'HIDDEN')
+        self.assertStatsConsistent()
+
+    def test_query_count_does_not_grow_with_items(self):
+        articles = [self.create(f"Pending {i}") for i in range(30)]
+        with CaptureQueriesContext(connection) as few:
+            self.post('approve', ids=[article.pk for article in articles[:3]])
+        with CaptureQueriesContext(connection) as many:
+            self.post('approve', ids=[article.pk for article in articles[3:]])
+        self.assertEqual(len(many), len(few))
+        self.assertStatsConsistent()
+
+    @override_settings(BULK_ACTION_MAX_ITEMS=2)
+    def test_validation(self):
+        self.post('approve', status.HTTP_400_BAD_REQUEST)
+        self.post('approve', status.HTTP_400_BAD_REQUEST, ids=[1, 2], slugs=['three'])
+        self.post('approve', status.HTTP_400_BAD_REQUEST, ids=['one'])
+        self.post('delete', status.HTTP_404_NOT_FOUND, ids=[1])
+
+    def test_only_editors(self):
+        self.client.force_authenticate(self.author)
+        self.post('approve', status.HTTP_403_FORBIDDEN, ids=[1])
+        self.client.force_authenticate(None)
+        self.post('approve', status.HTTP_401_UNAUTHORIZED, ids=[1])
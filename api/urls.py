@@ -5,7 +5,8 @@ from .views import (
     EditorialViewSet,
     PostReadOnlyViewSet,
     StatsView,
-    UserViewSet, PublicationUpdateView, AuthorArticleView, AuthorPublicationView,
+    MediaStatsView,
+    UserViewSet, PublicationUpdateView, PublicationBulkActionView, AuthorArticleView, AuthorPublicationView,
 )
 
 router = DefaultRouter()
@@ -16,8 +17,10 @@ router.register(r'users', UserViewSet, basename='user')
 
 urlpatterns = [
     path('', include(router.urls)),
+    path('publications/bulk/<str:action>/', PublicationBulkActionView.as_view(), name='publication-bulk'),
     path('publications/<str:slug>/', PublicationUpdateView.as_view(), name='publication'),
     path('myarticles', AuthorArticleView.as_view(), name='myarticles'),
     path('author/<int:id>', AuthorPublicationView.as_view(), name='authorpublication'),
     path('stats/', StatsView.as_view(), name='stats'),
+    path('stats/media/', MediaStatsView.as_view(), name='media-stats'),
 ]
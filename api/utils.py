@@ -1,3 +1,4 @@
+from users.cache import get_cached_user
 from users.models import User
 from rest_framework import exceptions
 from rest_framework_simplejwt.exceptions import TokenError
@@ -10,7 +11,7 @@ def get_user_from_token(authorization):
         try:
             access_token = AccessToken(token)
             user_id = access_token['user_id']
-            user = User.objects.get(id=user_id)
+            user = get_cached_user(user_id)
             return user
         except TokenError:
             raise exceptions.AuthenticationFailed("Session expired. Login again to continue.")
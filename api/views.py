@@ -1,10 +1,13 @@
-from django.db.models import Q, Count
+from datetime import timedelta
+from functools import partial
+
+from django.db.models import F
 from django.shortcuts import get_object_or_404
 from django.utils import timezone
 from rest_framework import status, exceptions, mixins
 from rest_framework.decorators import action
-from rest_framework.exceptions import ValidationError
-from rest_framework.permissions import IsAuthenticated, AllowAny, OR
+from rest_framework.exceptions import NotFound, ValidationError
+from rest_framework.permissions import IsAuthenticated, AllowAny, OR, SAFE_METHODS
 from rest_framework.response import Response
 from rest_framework.views import APIView
 from rest_framework.viewsets import GenericViewSet, ReadOnlyModelViewSet
@@ -15,16 +18,26 @@ from .serializer import (
     UserSerializer,
     StatisticsSerializer,
     ArticleSerializer,
-    PublicationApproveSerializer, PublicationSerializer
+    PublicationApproveSerializer, PublicationSerializer, PublicationCardSerializer, BulkActionSerializer
 )
+from .cache import ARTICLES, EDITORIALS, POSTS, article_group, cache_response, version_validators
+from .conditional import conditional, detail_validators
+from .fast import get_fast_serializer
 from .permissions import IsStaff, IsEditor, IsAuthor
+from .stats import get_stats
+from .streaming import get_stream_format, streaming_response
+from . import workflow
 from users.models import User
-from blog.models import Article, Editorial, Publication
+from blog import stats as publication_stats
+from blog.models import Article, Editorial, Publication, PublicationCard
+from blog.storage import get_dedup_stats
 
 
 class AuthorArticleView(APIView):
     def get(self, request):
-        queryset = Article.objects.filter(authors=request.user).distinct()
+        queryset = ArticleSerializer().optimize_queryset(
+            Article.objects.filter(authors=request.user).distinct()
+        )
         serializer = ArticleSerializer(queryset, many=True, context={'request': request})
         return Response(serializer.data)
 
@@ -34,17 +47,91 @@ class AuthorPublicationView(APIView):
 
     def get(self, request, id):
         user = get_object_or_404(User, id=id)
-        queryset = Publication.objects.filter(
-            published=True,
-            authors=user
-        ).distinct()
+        queryset = PublicationSerializer().optimize_queryset(
+            Publication.objects.filter(
+                published=True,
+                authors=user
+            ).distinct()
+        )
 
         serializer = PublicationSerializer(queryset, many=True, context={'request': request})
         return Response(serializer.data)
 
 
-class ArticleViewSet(GenericViewSet):
+class OptimizedQuerysetMixin:
+    """
+    Loads querysets the way the view's serializer renders them and pages lists.
+
+    Only read actions go through :meth:`optimize_queryset`; instances loaded for
+    writes keep every column so ``save()`` never runs against deferred fields.
+    Read requests may narrow the representation with ``?fields=a,b`` and
+    ``?exclude=c``, which narrows the SELECT, joins and prefetches with it.
+    Lists render the serializer's compact ``list_fields`` on ``?view=compact``.
+    """
+    fields_query_param = 'fields'
+    exclude_query_param = 'exclude'
+    view_query_param = 'view'
+    # Render list pages from values() rows through api.fast when the serializer allows it.
+    fast_lists = False
+
+    def get_field_selection(self):
+        """The ``fields``/``exclude`` serializer kwargs asked for in the query string."""
+        request = getattr(self, 'request', None)
+        if request is None or request.method not in SAFE_METHODS:
+            return {}
+        if not hasattr(self, '_field_selection'):
+            selection = {}
+            known = None
+            for kwarg, param in (('fields', self.fields_query_param), ('exclude', self.exclude_query_param)):
+                names = [name.strip() for name in request.query_params.get(param, '').split(',') if name.strip()]
+                if not names:
+                    continue
+                if known is None:
+                    known = set(self.get_serializer_class()(context=self.get_serializer_context()).fields)
+                unknown = sorted(set(names) - known)
+                if unknown:
+                    raise ValidationError({param: f"Unknown field(s): {', '.join(unknown)}"})
+                selection[kwarg] = names
+            self._field_selection = selection
+        return self._field_selection
+
+    def get_serializer(self, *args, **kwargs):
+        kwargs.update(self.get_field_selection())
+        return super().get_serializer(*args, **kwargs)
+
+    def optimize_queryset(self, queryset):
+        return self.get_serializer().optimize_queryset(queryset)
+
+    def get_list_serializer(self, *args, **kwargs):
+        """The view's serializer, restricted to its compact ``list_fields`` if the request asks for them."""
+        list_fields = getattr(self.get_serializer_class(), 'list_fields', None)
+        if list_fields and self.request.query_params.get(self.view_query_param) == 'compact':
+            kwargs.setdefault('fields', list_fields)
+        return self.get_serializer(*args, **kwargs)
+
+    def get_list_response(self, queryset):
+        required_fields = getattr(self.paginator, 'cursor_fields', ())
+        serializer = self.get_list_serializer()
+        fast = get_fast_serializer(serializer) if self.fast_lists else None
+        if fast is not None:
+            queryset = fast.get_queryset(queryset, required_fields)
+            page = self.paginate_queryset(queryset)
+            if page is not None:
+                return self.get_paginated_response(fast.to_representation(page))
+            return Response(fast.to_representation(queryset), status=status.HTTP_200_OK)
+
+        queryset = serializer.optimize_queryset(queryset, required_fields)
+        page = self.paginate_queryset(queryset)
+        if page is not None:
+            serializer = self.get_list_serializer(page, many=True)
+            return self.get_paginated_response(serializer.data)
+        serializer = self.get_list_serializer(queryset, many=True)
+        return Response(serializer.data, status=status.HTTP_200_OK)
+
+
+class ArticleViewSet(OptimizedQuerysetMixin, GenericViewSet):
     serializer_class = ArticleSerializer
+    fast_lists = True
     lookup_field = 'slug'
 
     def get_permissions(self):
@@ -56,13 +143,17 @@ class ArticleViewSet(GenericViewSet):
         queryset = Article.objects.all()
         if self.action in ['list', 'retrieve']:
             queryset = queryset.filter(hide=False)
+        if self.action == 'retrieve':
+            queryset = self.optimize_queryset(queryset)
         return queryset
 
+    @conditional(version_validators(ARTICLES))
     def list(self, request):
         queryset = self.filter_queryset(self.get_queryset())
-        serializer = self.get_serializer(queryset, many=True)
-        return Response(serializer.data, status=status.HTTP_200_OK)
+        return self.get_list_response(queryset)
 
+    @cache_response(article_group('{slug}'))
+    @conditional(detail_validators)
     def retrieve(self, request, slug=None):
         instance = self.get_object()
         serializer = self.get_serializer(instance)
@@ -115,8 +206,9 @@ class ArticleViewSet(GenericViewSet):
         return Response({"detail": "Authors updated successfully."})
 
 
-class EditorialViewSet(GenericViewSet):
+class EditorialViewSet(OptimizedQuerysetMixin, GenericViewSet):
     serializer_class = EditorialSerializer
+    fast_lists = True
     lookup_field = 'slug'
     queryset = Editorial.objects.filter(published=True)
 
@@ -127,11 +219,19 @@ class EditorialViewSet(GenericViewSet):
             return [IsEditor()]
         return [IsStaff()]
 
+    def get_queryset(self):
+        queryset = super().get_queryset()
+        if self.action == 'retrieve':
+            queryset = self.optimize_queryset(queryset)
+        return queryset
+
+    @cache_response(EDITORIALS)
+    @conditional(version_validators(EDITORIALS))
     def list(self, request):
         queryset = self.filter_queryset(self.get_queryset())
-        serializer = self.get_serializer(queryset, many=True)
-        return Response(serializer.data, status=status.HTTP_200_OK)
+        return self.get_list_response(queryset)
 
+    @conditional(detail_validators)
     def retrieve(self, request, *args, **kwargs):
         instance = self.get_object()
         serializer = self.get_serializer(instance)
@@ -164,6 +264,12 @@ class PublicationUpdateView(RetrieveUpdateAPIView):
     queryset = Publication.objects.filter(hide=False)
     lookup_field = 'slug'
 
+    def get_queryset(self):
+        queryset = super().get_queryset()
+        if self.request.method == 'GET':
+            queryset = self.get_serializer().optimize_queryset(queryset)
+        return queryset
+
     def perform_update(self, serializer):
         instance = serializer.instance
         if 'approved_by' in serializer.validated_data:
@@ -174,7 +280,28 @@ class PublicationUpdateView(RetrieveUpdateAPIView):
                 raise ValidationError("This publication was already approved.")
 
 
-class UserViewSet(GenericViewSet):
+class PublicationBulkActionView(APIView):
+    """
+    ``POST publications/bulk/<action>/`` with ``{"ids": [...], "slugs": [...]}``
+    approves, publishes, unpublishes or hides up to ``BULK_ACTION_MAX_ITEMS``
+    publications in one transaction and reports the outcome of each.
+    """
+    permission_classes = [IsAuthenticated, IsEditor]
+
+    def post(self, request, action):
+        if action not in workflow.ACTIONS:
+            raise NotFound(f"Unknown action {action!r}.")
+        serializer = BulkActionSerializer(data=request.data)
+        serializer.is_valid(raise_exception=True)
+        results = workflow.apply(action, request.user, **serializer.validated_data)
+        return Response({
+            'action': action,
+            'updated': sum(result['status'] == workflow.UPDATED for result in results),
+            'results': results,
+        })
+
+
+class UserViewSet(OptimizedQuerysetMixin, GenericViewSet):
     queryset = User.objects.filter(is_active=True)
     serializer_class = UserSerializer
 
@@ -185,8 +312,14 @@ class UserViewSet(GenericViewSet):
             return [IsAuthenticated()]
         return [AllowAny()]
 
+    def get_queryset(self):
+        queryset = super().get_queryset()
+        if self.action == 'retrieve':
+            queryset = self.optimize_queryset(queryset)
+        return queryset
+
     def list(self, request):
-        queryset = User.objects.all()
+        queryset = self.optimize_queryset(User.objects.all())
         serializer = self.get_serializer(queryset, many=True)
         return Response(serializer.data)
 
@@ -223,14 +356,14 @@ class UserViewSet(GenericViewSet):
 
     @action(detail=False, url_path='authors')
     def active_authors(self, request):
-        users = User.objects.filter(role=User.Role.AUTHOR, is_active=True)
-        serializer = UserSerializer(users, many=True)
+        users = self.optimize_queryset(User.objects.filter(role=User.Role.AUTHOR, is_active=True))
+        serializer = self.get_serializer(users, many=True)
         return Response(serializer.data)
 
     @action(detail=False, url_path='readers')
     def active_readers(self, request):
-        users = User.objects.filter(role=User.Role.READER, is_active=True)
-        serializer = UserSerializer(users, many=True)
+        users = self.optimize_queryset(User.objects.filter(role=User.Role.READER, is_active=True))
+        serializer = self.get_serializer(users, many=True)
         return Response(serializer.data)
 
 
@@ -238,87 +371,102 @@ class StatsView(ListAPIView):
     permission_classes = [IsStaff]
 
     def list(self, request, *args, **kwargs):
-        now = timezone.now()
-        today = now.date()
-        month_start = now.replace(day=1, hour=0, minute=0, second=0, microsecond=0)
-        year_start = now.replace(month=1, day=1, hour=0, minute=0, second=0, microsecond=0)
-
-        article_stats = {
-            "total_articles": Article.objects.count(),
-            "total_published": Article.objects.filter(published=True).count(),
-            "total_scheduled": Article.objects.filter(published_on__gt=now).count(),
-            "asking_approval": Article.objects.filter(approved_by__isnull=True).count(),
-            "total_approved": Article.objects.filter(approved_by__isnull=False).count(),
-            "total_unapproved": Article.objects.filter(approved_by__isnull=True).count(),
-            "today_published": Article.objects.filter(published_on__date=today).count(),
-            "this_month_published": Article.objects.filter(published_on__gte=month_start).count(),
-            "this_year_published": Article.objects.filter(published_on__gte=year_start).count(),
-        }
-
-        user_stats = {
-            "active_authors": User.objects.filter(role=User.Role.AUTHOR, is_active=True).count(),
-            "active_readers": User.objects.filter(role=User.Role.READER, is_active=True).count(),
-        }
+        return Response(get_stats())
 
-        return Response({
-            "article": article_stats,
-            "user_stats": user_stats,
-        })
+
+class MediaStatsView(APIView):
+    """How much content-addressed storage saves, see ``blog.storage.get_dedup_stats``."""
+    permission_classes = [IsStaff]
+
+    def get(self, request):
+        return Response(get_dedup_stats())
 
 
-class PostReadOnlyViewSet(ReadOnlyModelViewSet):
+class PostReadOnlyViewSet(OptimizedQuerysetMixin, ReadOnlyModelViewSet):
     queryset = Publication.objects.filter(hide=False, published=True)
     serializer_class = ArticleSerializer
     permission_classes = [AllowAny]
     lookup_field = 'slug'
+    fast_lists = True
+    # Public feeds, served from the PublicationCard read model.
+    card_actions = ('list', 'published')
+
+    def get_queryset(self):
+        if self.action in self.card_actions:
+            return PublicationCard.objects.filter(status=PublicationCard.Status.PUBLISHED)
+        queryset = super().get_queryset()
+        if self.action == 'retrieve':
+            queryset = self.optimize_queryset(queryset)
+        return queryset
+
+    def get_serializer_class(self):
+        if self.action in self.card_actions:
+            return PublicationCardSerializer
+        return super().get_serializer_class()
+
+    @cache_response(POSTS)
+    @conditional(version_validators(POSTS))
+    def list(self, request, *args, **kwargs):
+        queryset = self.filter_queryset(self.get_queryset())
+        return self.get_list_response(queryset)
 
     @action(detail=False, url_path='articles/all')
     def all_articles(self, request):
-        queryset = Article.objects.defer('content')
-        serializer = self.get_serializer(queryset, many=True)
-        return Response(serializer.data)
+        queryset = Article.objects.all()
+        stream_format = get_stream_format(request)
+        if stream_format:
+            serializer = self.get_list_serializer()
+            queryset = serializer.optimize_queryset(queryset).order_by(F('published_on').desc(nulls_last=True), '-id')
+            serializer_class = partial(self.get_serializer_class(), fields=list(serializer.fields))
+            return streaming_response(queryset, serializer_class, self.get_serializer_context(), stream_format)
+        return self.get_list_response(queryset)
 
     @action(detail=False, url_path='articles/published')
     def published(self, request):
-        queryset = Article.objects.filter(published=True, hide=False)
-        serializer = self.get_serializer(queryset, many=True)
-        return Response(serializer.data)
+        queryset = self.get_queryset().filter(publication_type=Publication.PublicationType.Article)
+        return self.get_list_response(queryset)
 
     @action(detail=False, url_path='articles/scheduled')
     def scheduled(self, request):
-        queryset = Article.objects.filter(published_on__gt=timezone.now())
-        serializer = self.get_serializer(queryset, many=True)
-        return Response(serializer.data)
+        # blog.scheduler publishes articles when their time comes, so the flag is enough.
+        queryset = Article.objects.filter(published=False, published_on__isnull=False)
+        return self.get_list_response(queryset)
 
     @action(detail=False, url_path='articles/unapproved')
     def asking_approval(self, request):
         queryset = Article.objects.filter(published=True, approved_by__isnull=True)
-        serializer = self.get_serializer(queryset, many=True)
-        return Response(serializer.data)
+        return self.get_list_response(queryset)
 
     @action(detail=False, url_path='articles/approved')
     def approved(self, request):
         queryset = Article.objects.filter(approved_by__isnull=False)
-        serializer = self.get_serializer(queryset, many=True)
-        return Response(serializer.data)
+        return self.get_list_response(queryset)
+
+    def get_published_between_response(self, queryset, start, end):
+        response = self.get_list_response(queryset)
+        if isinstance(response.data, dict):
+            response.data['count'] = publication_stats.count_published_between(
+                Publication.PublicationType.Article, start, end
+            )
+        return response
 
     @action(detail=False, url_path='published/today')
     def published_today(self, request):
-        today = timezone.now().date()
+        today = timezone.localdate()
         queryset = Article.objects.filter(published_on__date=today)
-        serializer = self.get_serializer(queryset, many=True)
-        return Response(serializer.data)
+        return self.get_published_between_response(queryset, today, today + timedelta(days=1))
 
     @action(detail=False, url_path='published/current-month')
     def published_this_month(self, request):
         now = timezone.now()
         queryset = Article.objects.filter(published_on__year=now.year, published_on__month=now.month)
-        serializer = self.get_serializer(queryset, many=True)
-        return Response(serializer.data)
+        month_start = timezone.localdate(now).replace(day=1)
+        next_month = (month_start + timedelta(days=32)).replace(day=1)
+        return self.get_published_between_response(queryset, month_start, next_month)
 
     @action(detail=False, url_path='published/current-year')
     def published_this_year(self, request):
         now = timezone.now()
         queryset = Article.objects.filter(published_on__year=now.year)
-        serializer = self.get_serializer(queryset, many=True)
-        return Response(serializer.data)
+        year_start = timezone.localdate(now).replace(month=1, day=1)
+        return self.get_published_between_response(queryset, year_start, year_start.replace(year=year_start.year + 1))
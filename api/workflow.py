@@ -0,0 +1,97 @@
+"""
+Editorial workflow actions applied to many publications at once.
+
+:func:`apply` locks the requested publications with one query, checks each one
+against the rules of the single-item endpoints (no second approval, no
+publishing before approval) and writes every allowed change with a single
+``UPDATE``. ``QuerySet.update`` bypasses ``Publication.save`` and its signals,
+so the stats rollup and the cards are updated here, in the same transaction,
+and :data:`publications_updated` is sent for the response cache.
+"""
+from django.db import transaction
+from django.db.models import Q
+from django.dispatch import Signal
+from django.utils import timezone
+
+from blog import cards, stats
+from blog.models import Publication
+
+APPROVE, PUBLISH, UNPUBLISH, HIDE = 'approve', 'publish', 'unpublish', 'hide'
+ACTIONS = (APPROVE, PUBLISH, UNPUBLISH, HIDE)
+
+UPDATED, UNCHANGED, REJECTED, NOT_FOUND = 'updated', 'unchanged', 'rejected', 'not_found'
+
+READ_FIELDS = ('pk', 'slug', *stats.TRACKED_FIELDS)
+
+# Sent inside the action's transaction with ``rows``, the values() rows of the
+# changed publications as they were before, and ``values``, the columns written.
+publications_updated = Signal()
+
+
+def check(action, row):
+    """``(status, detail)`` of applying ``action`` to the publication ``row``."""
+    if action == APPROVE:
+        if row['hide']:
+            return REJECTED, "This publication is hidden."
+        if row['approved_by_id'] is not None:
+            return REJECTED, "This publication was already approved."
+    elif action == PUBLISH:
+        if row['approved_by_id'] is None:
+            return REJECTED, "Article must be approved before publishing."
+        if row['published']:
+            return UNCHANGED, None
+    elif action == UNPUBLISH and not row['published']:
+        return UNCHANGED, None
+    elif action == HIDE and row['hide']:
+        return UNCHANGED, None
+    return UPDATED, None
+
+
+def get_values(action, user, now):
+    """The columns ``action`` writes, keyed like ``stats.TRACKED_FIELDS``."""
+    return {
+        APPROVE: {'approved_by_id': user.pk, 'approved_on': now},
+        PUBLISH: {'published': True, 'published_on': now},
+        UNPUBLISH: {'published': False, 'published_on': None},
+        HIDE: {'hide': True},
+    }[action]
+
+
+def apply(action, user, ids=(), slugs=()):
+    """
+    Apply ``action`` as ``user`` to the publications in ``ids`` and ``slugs``.
+
+    Returns one result per requested id, then per slug, in request order; a
+    publication named twice is only changed once.
+    """
+    now = timezone.now()
+    values = get_values(action, user, now)
+    with transaction.atomic():
+        rows = list(Publication.objects.select_for_update().filter(Q(pk__in=ids) | Q(slug__in=slugs))
+                    .order_by('pk').values(*READ_FIELDS))
+        by_key = {**{('id', row['pk']): row for row in rows}, **{('slug', row['slug']): row for row in rows}}
+
+        outcomes, changed, results = {}, {}, []
+        for key in [('id', pk) for pk in ids] + [('slug', slug) for slug in slugs]:
+            row = by_key.get(key)
+            if row is None:
+                results.append({key[0]: key[1], 'status': NOT_FOUND})
+                continue
+            if row['pk'] not in outcomes:
+                outcomes[row['pk']] = check(action, row)
+                if outcomes[row['pk']][0] == UPDATED:
+                    changed[row['pk']] = row
+            status, detail = outcomes[row['pk']]
+            result = {'id': row['pk'], 'slug': row['slug'], 'status': status}
+            if detail:
+                result['detail'] = detail
+            results.append(result)
+
+        if changed:
+            Publication.objects.filter(pk__in=changed).update(**values, updated_on=now)
+            stats.apply_changes(
+                (stats.get_row_state(row), stats.get_row_state({**row, **values})) for row in changed.values()
+            )
+            cards.refresh(changed)
+            publications_updated.send(sender=Publication, rows=list(changed.values()), values=values)
+    return results
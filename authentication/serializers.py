@@ -1,5 +1,10 @@
 from rest_framework import serializers
+from rest_framework_simplejwt.exceptions import AuthenticationFailed, InvalidToken
+from rest_framework_simplejwt.serializers import TokenRefreshSerializer
+from rest_framework_simplejwt.settings import api_settings
+from rest_framework_simplejwt.tokens import AccessToken
 from users.models import User
+from .tokens import TOKEN_VERSION_CLAIM, ClaimsRefreshToken, add_user_claims
 from django.core.exceptions import ValidationError
 from django.contrib.auth.hashers import make_password
 
@@ -54,3 +59,26 @@ class PasswordResetSerializer(serializers.ModelSerializer):
         extra_kwargs = {
             'password': {'write_only': True},
         }
+
+
+class ClaimsTokenRefreshSerializer(TokenRefreshSerializer):
+    """
+    Refreshes tokens with the user's current claims instead of copying the old ones.
+
+    A refresh token issued before the user's ``token_version`` changed is rejected.
+    """
+    token_class = ClaimsRefreshToken
+
+    def validate(self, attrs):
+        refresh = self.token_class(attrs['refresh'])
+        user = User.objects.filter(pk=refresh.payload.get(api_settings.USER_ID_CLAIM)).first()
+        if user is None or not api_settings.USER_AUTHENTICATION_RULE(user):
+            raise AuthenticationFailed(self.error_messages['no_active_account'], 'no_active_account')
+        if refresh.payload.get(TOKEN_VERSION_CLAIM, user.token_version) != user.token_version:
+            raise InvalidToken("Token has been revoked")
+
+        data = super().validate(attrs)
+        data['access'] = str(add_user_claims(AccessToken(data['access']), user))
+        if 'refresh' in data:
+            data['refresh'] = str(add_user_claims(self.token_class(data['refresh'], verify=False), user))
+        return data
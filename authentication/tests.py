@@ -1,3 +1,119 @@
-from django.test import TestCase
+from django.core.cache import cache
+from django.db.models import F
+from django.test import TestCase, modify_settings, override_settings
+from rest_framework.test import APIClient, APIRequestFactory
+from rest_framework_simplejwt.tokens import AccessToken
 
-# Create your tests here.
+from api.permissions import IsAuthor, IsEditor, IsStaff
+from blog.models import Article
+from users.models import User
+from .tokens import ClaimsRefreshToken, ClaimsUser
+
+
+@override_settings(USER_CACHE_TTL=60)
+@modify_settings(MIDDLEWARE={'remove': ['logs.middleware.RequestLoggingMiddleware']})
+class TokenClaimsTest(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.client = APIClient()
+        self.user = User.objects.create_user(email='editor@example.com', password='password', first_name='Edi',
+                                             last_name='Tor', role=User.Role.EDITOR, display_name='The Editor')
+
+    def login(self):
+        response = self.client.post('/auth/login/', {'email': 'editor@example.com', 'password': 'password'})
+        self.assertEqual(response.status_code, 200)
+        return response
+
+    def refresh(self):
+        return self.client.post('/auth/token/refresh/')
+
+    def commit(self, func, *args):
+        with self.captureOnCommitCallbacks(execute=True):
+            func(*args)
+
+    def test_login_issues_claims(self):
+        token = AccessToken(self.login().cookies['access'].value)
+        self.assertEqual(token['role'], User.Role.EDITOR)
+        self.assertFalse(token['is_staff'])
+        self.assertEqual(token['name'], 'The Editor')
+        self.assertEqual(token['email'], 'editor@example.com')
+        self.assertEqual(token['token_version'], 0)
+
+    def test_current_user_without_database(self):
+        self.login()
+        self.client.get('/auth/user')
+        with self.assertNumQueries(0):
+            response = self.client.get('/auth/user')
+        self.assertEqual(response.data, {'id': self.user.id, 'username': None, 'email': 'editor@example.com',
+                                         'role': User.Role.EDITOR})
+
+    def test_permissions_read_claims(self):
+        request = APIRequestFactory().get('/')
+        request.user = ClaimsUser(AccessToken(self.login().cookies['access'].value))
+        with self.assertNumQueries(0):
+            self.assertTrue(IsEditor().has_permission(request, None))
+            self.assertFalse(IsAuthor().has_permission(request, None))
+            self.assertFalse(IsStaff().has_permission(request, None))
+
+    def test_claims_user_loads_real_user_when_needed(self):
+        user = ClaimsUser(ClaimsRefreshToken.for_user(self.user).access_token)
+        article = Article(title="Claims", content="Content", created_by=user)
+        self.assertEqual(article.created_by_id, self.user.id)
+        self.assertEqual(user.last_name, 'Tor')
+        self.assertEqual(user, self.user)
+
+    def test_revoke_tokens_locks_out_immediately(self):
+        self.login()
+        self.assertEqual(self.client.get('/auth/user').status_code, 200)
+        self.commit(User.objects.get(pk=self.user.pk).revoke_tokens)
+        self.assertEqual(self.client.get('/auth/user').status_code, 401)
+        self.client.cookies.pop('access')
+        self.assertEqual(self.refresh().status_code, 401)
+
+    @override_settings(SHARED_CACHE=False)
+    def test_unshared_cache_reads_the_token_version(self):
+        self.login()
+        self.assertEqual(self.client.get('/auth/user').status_code, 200)
+        # Revoked by another process, whose cache this one doesn't see.
+        User.objects.filter(pk=self.user.pk).update(token_version=F('token_version') + 1)
+        self.assertEqual(self.client.get('/auth/user').status_code, 401)
+
+    def test_role_change_revokes_and_refresh_reissues(self):
+        self.login()
+        user = User.objects.get(pk=self.user.pk)
+        user.role = User.Role.AUTHOR
+        self.commit(user.save)
+        self.assertEqual(self.client.get('/auth/user').status_code, 401)
+
+        self.user.refresh_from_db()
+        self.client.cookies['refresh'] = str(ClaimsRefreshToken.for_user(self.user))
+        response = self.refresh()
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(AccessToken(response.data['access'])['role'], User.Role.AUTHOR)
+        self.assertEqual(self.client.get('/auth/user').data['role'], User.Role.AUTHOR)
+
+    def test_refresh_picks_up_profile_changes(self):
+        self.login()
+        user = User.objects.get(pk=self.user.pk)
+        user.display_name = 'Renamed'
+        self.commit(user.save)
+        self.assertEqual(self.client.get('/auth/user').status_code, 200)
+        self.assertEqual(AccessToken(self.refresh().data['access'])['name'], 'Renamed')
+
+    def test_password_change_and_deactivation_bump_version(self):
+        user = User.objects.get(pk=self.user.pk)
+        user.set_password('changed-password')
+        user.save()
+        user = User.objects.get(pk=self.user.pk)
+        self.assertEqual(user.token_version, 1)
+        user.is_active = False
+        user.save(update_fields=['is_active'])
+        self.assertEqual(User.objects.get(pk=self.user.pk).token_version, 2)
+
+        user.first_name = 'Renamed'
+        user.save()
+        self.assertEqual(User.objects.get(pk=self.user.pk).token_version, 2)
+
+    def test_tokens_without_claims_still_authenticate(self):
+        self.client.credentials(HTTP_AUTHORIZATION=f'Bearer {AccessToken.for_user(self.user)}')
+        self.assertEqual(self.client.get('/auth/user').data['role'], User.Role.EDITOR)
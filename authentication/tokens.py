@@ -0,0 +1,76 @@
+from django.utils.functional import SimpleLazyObject
+from rest_framework_simplejwt.settings import api_settings
+from rest_framework_simplejwt.tokens import RefreshToken
+
+from users.cache import get_cached_user
+from users.models import User
+
+TOKEN_VERSION_CLAIM = 'token_version'
+
+
+def add_user_claims(token, user):
+    """Sign what permission checks and /auth/user need into ``token``."""
+    token['role'] = user.role
+    token['is_staff'] = user.is_staff
+    token['email'] = user.email
+    token['name'] = user.get_display_name()
+    token[TOKEN_VERSION_CLAIM] = user.token_version
+    return token
+
+
+def has_user_claims(token):
+    return TOKEN_VERSION_CLAIM in token
+
+
+class ClaimsRefreshToken(RefreshToken):
+    """A refresh token whose access tokens carry the user's claims."""
+
+    @classmethod
+    def for_user(cls, user):
+        return add_user_claims(super().for_user(user), user)
+
+
+class ClaimsUser(SimpleLazyObject):
+    """
+    ``request.user`` for an access token that carries its user's claims.
+
+    Identity, role, staff flag, email and display name are answered from the
+    token. Anything else, including saving the user or assigning it to a
+    foreign key, loads the real ``User`` through ``users.cache`` first.
+    """
+    username = None
+    is_active = True
+    is_authenticated = True
+    is_anonymous = False
+
+    def __init__(self, token):
+        user_id = token[api_settings.USER_ID_CLAIM]
+        super().__init__(lambda: get_cached_user(user_id))
+        self.__dict__['claims'] = token
+
+    def __bool__(self):
+        return True
+
+    @property
+    def id(self):
+        # simplejwt stores the id claim as a string.
+        return User._meta.pk.to_python(self.claims[api_settings.USER_ID_CLAIM])
+
+    @property
+    def pk(self):
+        return self.id
+
+    @property
+    def role(self):
+        return self.claims['role']
+
+    @property
+    def is_staff(self):
+        return self.claims['is_staff']
+
+    @property
+    def email(self):
+        return self.claims['email']
+
+    def get_display_name(self):
+        return self.claims['name']
@@ -1,7 +1,7 @@
-from rest_framework_simplejwt.tokens import RefreshToken
+from .tokens import ClaimsRefreshToken
 
 
 def get_tokens_for_user(user):
-    refresh = RefreshToken.for_user(user)
+    refresh = ClaimsRefreshToken.for_user(user)
 
     return str(refresh), str(refresh.access_token)
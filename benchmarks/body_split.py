@@ -0,0 +1,74 @@
+"""
+Cost of list queries with the body in the publication row vs. in PublicationBody.
+
+A "wide" scan joins the body back in, which reads exactly what every list query
+read while ``content`` was a column of the publication. The "narrow" scan reads
+the publication row alone, as list endpoints do now. Bytes are the sum of the
+column values returned per query.
+
+Usage: ``python -m benchmarks.body_split [row_count]`` (default 5000).
+"""
+import sys
+from datetime import timedelta
+
+from benchmarks.utils import bulk_create_publications, measure, report, seed_author, setup, test_database
+
+BODY = "<p>Lorem ipsum dolor sit amet, consectetur adipiscing elit.</p>" * 80
+
+
+def seed(author, count):
+    from django.utils import timezone
+    from blog.models import Article
+
+    now = timezone.now()
+    bulk_create_publications(
+        Article,
+        [
+            Article(
+                title=f"Benchmark article {i}",
+                slug=f"benchmark-article-{i}",
+                content=BODY,
+                published=True,
+                published_on=now - timedelta(minutes=i),
+                created_by=author,
+            )
+            for i in range(count)
+        ],
+    )
+
+
+def fetched_bytes(queryset):
+    from django.db import connection
+
+    sql, params = queryset.query.sql_with_params()
+    with connection.cursor() as cursor:
+        cursor.execute(sql, params)
+        return sum(len(str(value)) for row in cursor.fetchall() for value in row if value is not None)
+
+
+def main(count=5000):
+    from blog.models import Article
+
+    with test_database():
+        seed(seed_author(), count)
+        cases = [
+            ('wide (body in row)', Article.objects.select_related('body')),
+            ('narrow (PublicationBody)', Article.objects.all()),
+        ]
+
+        rows = []
+        for name, queryset in cases:
+            size = fetched_bytes(queryset)
+            median, p95 = measure(lambda: list(queryset.all()), repeat=10)
+            rows.append((name, size // 1024, size // count, f"{median:.2f}", f"{p95:.2f}"))
+
+        report(
+            f"Full scan of {count} articles",
+            rows,
+            ('row layout', 'KiB read', 'bytes/row', 'median ms', 'p95 ms'),
+        )
+
+
+if __name__ == '__main__':
+    setup()
+    main(*(int(arg) for arg in sys.argv[1:2]))
@@ -0,0 +1,49 @@
+"""
+Compressed size and CPU time of a 500-article list per encoding.
+
+The body is the JSON of ``ArticleSerializer`` output with every field, as in
+``benchmarks.renderers``. "compress" is what ``CompressionMiddleware`` spends
+per response; a response cache hit sends the stored bytes instead. brotli is
+skipped when the package is not installed.
+
+Usage: ``python -m benchmarks.compression [row_count]`` (default 500).
+"""
+import sys
+
+from benchmarks.serializers import STORAGES, seed
+from benchmarks.utils import measure, report, setup, test_database
+
+
+def main(count=500):
+    from django.test import override_settings
+    from rest_framework.test import APIRequestFactory
+
+    from api import compression
+    from api.renderers import JSONRenderer
+    from api.serializer import ArticleSerializer
+    from blog.models import Article
+
+    with test_database(), override_settings(STORAGES=STORAGES):
+        seed(count)
+        request = APIRequestFactory().get('/api/articles/')
+        serializer = ArticleSerializer(many=True, context={'request': request})
+        queryset = serializer.child.optimize_queryset(Article.objects.order_by('-published_on', '-pk'))
+        content = JSONRenderer().render({'next': None, 'previous': None,
+                                         'results': serializer.to_representation(queryset)})
+
+        rows = [('identity', '-', '-', len(content) // 1024, '1.0000')]
+        for encoding, compress in compression.get_compressors().items():
+            size = len(compress(content))
+            median, p95 = measure(lambda: compress(content), repeat=20)
+            rows.append((encoding, f"{median:.2f}", f"{p95:.2f}", size // 1024, f"{size / len(content):.4f}"))
+
+        report(
+            f"Compressing a {count}-article list",
+            rows,
+            ('encoding', 'compress median ms', 'p95 ms', 'KiB', 'ratio'),
+        )
+
+
+if __name__ == '__main__':
+    setup()
+    main(*(int(arg) for arg in sys.argv[1:2]))
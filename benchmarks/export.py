@@ -0,0 +1,89 @@
+"""
+Peak memory of exporting every article: buffered JSON vs. the streaming export.
+
+Usage: ``python -m benchmarks.export [row_count ...]`` (default 1000 4000 16000).
+Peak memory is measured with tracemalloc while the response body is produced;
+the script fails if the streaming peak grows with the row count.
+"""
+import sys
+import tracemalloc
+from datetime import timedelta
+
+from rest_framework.request import Request
+
+from benchmarks.utils import bulk_create_publications, report, seed_author, setup, test_database
+
+# Streaming keeps one chunk alive, so the largest export may only peak this much
+# above the smallest one.
+MAX_STREAMING_GROWTH = 1.5
+
+
+def seed(author, start, count):
+    from django.utils import timezone
+    from blog.models import Article
+
+    now = timezone.now()
+    bulk_create_publications(
+        Article,
+        [
+            Article(
+                title=f"Benchmark article {i}",
+                slug=f"benchmark-article-{i}",
+                content="<p>Lorem ipsum dolor sit amet, consectetur adipiscing elit.</p>" * 40,
+                published=True,
+                published_on=now - timedelta(minutes=i),
+                created_by=author,
+            )
+            for i in range(start, start + count)
+        ],
+    )
+
+
+def peak_kib(func):
+    tracemalloc.start()
+    try:
+        size = func()
+        return size, tracemalloc.get_traced_memory()[1] // 1024
+    finally:
+        tracemalloc.stop()
+
+
+def main(*counts):
+    from rest_framework.renderers import JSONRenderer
+    from rest_framework.test import APIRequestFactory
+    from api.streaming import iter_serialized
+    from api.serializer import ArticleSerializer
+    from blog.models import Article
+
+    counts = counts or (1000, 4000, 16000)
+    factory = APIRequestFactory()
+    request = factory.get('/api/posts/articles/all/')
+    context = {'request': Request(request)}
+
+    with test_database():
+        author = seed_author()
+        rows, seeded = [], 0
+        for count in sorted(counts):
+            seed(author, seeded, count - seeded)
+            seeded = count
+            queryset = ArticleSerializer().optimize_queryset(Article.objects.all())
+
+            def buffered():
+                data = ArticleSerializer(queryset.all(), many=True, context=context).data
+                return len(JSONRenderer().render(data))
+
+            def streamed():
+                return sum(len(part) for part in iter_serialized(queryset.all(), ArticleSerializer, context, 'json', 500))
+
+            for name, func in (('buffered', buffered), ('streaming', streamed)):
+                size, peak = peak_kib(func)
+                rows.append((count, name, size // 1024, peak))
+
+        report("Article export memory", rows, ('rows', 'mode', 'body KiB', 'peak KiB'))
+        streaming = [peak for count, mode, size, peak in rows if mode == 'streaming']
+        assert streaming[-1] <= streaming[0] * MAX_STREAMING_GROWTH, streaming
+
+
+if __name__ == '__main__':
+    setup()
+    main(*(int(arg) for arg in sys.argv[1:]))
@@ -0,0 +1,82 @@
+"""
+Latency of the public article list at page 1 and page 1000.
+
+Compares the keyset cursor paginator used by the API with offset pagination
+over the same queryset. Usage: ``python -m benchmarks.pagination [page_size]``.
+"""
+import sys
+from datetime import timedelta
+
+from benchmarks.utils import bulk_create_publications, measure, report, seed_author, setup, test_database
+
+DEEP_PAGE = 1000
+
+
+def seed(author, count):
+    from django.utils import timezone
+    from blog import cards
+    from blog.models import Article
+
+    now = timezone.now()
+    bulk_create_publications(
+        Article,
+        [
+            Article(
+                title=f"Benchmark article {i}",
+                slug=f"benchmark-article-{i}",
+                content="<p>Lorem ipsum dolor sit amet.</p>" * 20,
+                published=True,
+                published_on=now - timedelta(minutes=i),
+                created_by=author,
+            )
+            for i in range(count)
+        ],
+    )
+    # The published list reads cards, which bulk_create does not write either.
+    cards.rebuild()
+
+
+def main(page_size=20):
+    from rest_framework.pagination import LimitOffsetPagination
+    from rest_framework.test import APIRequestFactory
+    from api.pagination import PublicationCursorPagination
+    from api.views import PostReadOnlyViewSet
+    from blog.models import Article
+
+    with test_database():
+        seed(seed_author(), page_size * (DEEP_PAGE + 1))
+        factory = APIRequestFactory()
+        path = '/api/posts/articles/published/'
+
+        keyset_view = PostReadOnlyViewSet.as_view({'get': 'published'})
+        offset_view = PostReadOnlyViewSet.as_view({'get': 'published'}, pagination_class=LimitOffsetPagination)
+
+        paginator = PublicationCursorPagination()
+        paginator.base_url = path
+        boundary = Article.objects.order_by('-published_on', '-id')[(DEEP_PAGE - 1) * page_size - 1]
+        deep_cursor_url = paginator.encode_cursor(boundary)
+
+        cases = [
+            ('keyset', 1, keyset_view, f'{path}?page_size={page_size}'),
+            ('keyset', DEEP_PAGE, keyset_view, f'{deep_cursor_url}&page_size={page_size}'),
+            ('offset', 1, offset_view, f'{path}?limit={page_size}'),
+            ('offset', DEEP_PAGE, offset_view, f'{path}?limit={page_size}&offset={(DEEP_PAGE - 1) * page_size}'),
+        ]
+
+        rows = []
+        for name, page, view, url in cases:
+            response = view(factory.get(url))
+            assert response.status_code == 200 and len(response.data['results']) == page_size, url
+            median, p95 = measure(lambda: view(factory.get(url)))
+            rows.append((name, page, f"{median:.2f}", f"{p95:.2f}"))
+
+        report(
+            f"{Article.objects.count()} articles, page_size={page_size}",
+            rows,
+            ('pagination', 'page', 'median ms', 'p95 ms'),
+        )
+
+
+if __name__ == '__main__':
+    setup()
+    main(*(int(arg) for arg in sys.argv[1:2]))
@@ -0,0 +1,53 @@
+"""
+Render time and payload size of a 500-article list per renderer.
+
+The payload is ``ArticleSerializer`` output with every field, as served by
+``/api/articles/?fields=...``. DRF's stdlib ``JSONRenderer`` is the baseline
+for ``api.renderers.JSONRenderer`` (orjson) and ``MessagePackRenderer``; the
+MessagePack row is skipped when ``msgpack`` is not installed.
+
+Usage: ``python -m benchmarks.renderers [row_count]`` (default 500).
+"""
+import sys
+
+from benchmarks.serializers import STORAGES, seed
+from benchmarks.utils import measure, report, setup, test_database
+
+
+def main(count=500):
+    from django.test import override_settings
+    from rest_framework.renderers import JSONRenderer
+    from rest_framework.test import APIRequestFactory
+
+    from api import renderers
+    from api.serializer import ArticleSerializer
+    from blog.models import Article
+
+    with test_database(), override_settings(STORAGES=STORAGES):
+        seed(count)
+        request = APIRequestFactory().get('/api/articles/')
+        queryset = Article.objects.order_by('-published_on', '-pk')
+        serializer = ArticleSerializer(many=True, context={'request': request})
+        data = {'next': None, 'previous': None,
+                'results': serializer.to_representation(serializer.child.optimize_queryset(queryset))}
+
+        cases = [('stdlib json', JSONRenderer()), ('orjson', renderers.JSONRenderer())]
+        if renderers.msgpack is not None:
+            cases.append(('msgpack', renderers.MessagePackRenderer()))
+
+        rows = []
+        for name, renderer in cases:
+            size = len(renderer.render(data))
+            median, p95 = measure(lambda: renderer.render(data), repeat=50)
+            rows.append((name, f"{median:.2f}", f"{p95:.2f}", size // 1024, size // count))
+
+        report(
+            f"Rendering a {count}-article list",
+            rows,
+            ('renderer', 'median ms', 'p95 ms', 'KiB', 'bytes/article'),
+        )
+
+
+if __name__ == '__main__':
+    setup()
+    main(*(int(arg) for arg in sys.argv[1:2]))
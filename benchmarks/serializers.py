@@ -0,0 +1,93 @@
+"""
+Rows per second rendered by the DRF list serializer vs. ``api.fast``.
+
+Both paths render the same page of articles, each with two authors and an
+approving editor, once with the compact list fields and once with every field.
+The DRF path reads model instances through ``optimize_queryset``; the fast path
+reads ``values()`` rows. Query time is included in both.
+
+Usage: ``python -m benchmarks.serializers [row_count]`` (default 1000).
+"""
+import sys
+from datetime import timedelta
+
+from benchmarks.utils import bulk_create_publications, measure, report, seed_author, setup, test_database
+
+BODY = "<p>Lorem ipsum dolor sit amet, consectetur adipiscing elit.</p>" * 20
+STORAGES = {
+    'default': {'BACKEND': 'django.core.files.storage.InMemoryStorage'},
+    'staticfiles': {'BACKEND': 'django.contrib.staticfiles.storage.StaticFilesStorage'},
+}
+
+
+def seed(count):
+    from django.utils import timezone
+    from blog.models import Article, PublicationAuthor
+    from users.models import User
+
+    author = seed_author()
+    co_author = seed_author('bench-co-author@example.com')
+    editor = User.objects.create_user(email='bench-editor@example.com', password='password', role=User.Role.EDITOR,
+                                      first_name='Bench', last_name='Editor')
+    now = timezone.now()
+    articles = bulk_create_publications(
+        Article,
+        [
+            Article(
+                title=f"Benchmark article {i}",
+                slug=f"benchmark-article-{i}",
+                content=BODY,
+                excerpt=BODY[:200],
+                thumbnail=f'images/benchmark-{i}.png',
+                published=True,
+                published_on=now - timedelta(minutes=i),
+                created_by=author,
+                approved_by=editor,
+                approved_on=now,
+            )
+            for i in range(count)
+        ],
+    )
+    PublicationAuthor.objects.bulk_create([
+        PublicationAuthor(publication_id=article.pk, user_id=writer.pk)
+        for article in articles
+        for writer in (author, co_author)
+    ])
+
+
+def main(count=1000):
+    from django.test import override_settings
+    from rest_framework.test import APIRequestFactory
+
+    from api.fast import get_fast_serializer
+    from api.serializer import ArticleSerializer
+    from blog.models import Article
+
+    with test_database(), override_settings(STORAGES=STORAGES):
+        seed(count)
+        request = APIRequestFactory().get('/api/articles/')
+        queryset = Article.objects.order_by('-published_on', '-pk')
+
+        rows = []
+        for name, fields in (('compact', ArticleSerializer.list_fields), ('full', None)):
+            serializer = ArticleSerializer(many=True, fields=fields, context={'request': request})
+            fast = get_fast_serializer(serializer.child)
+            cases = [
+                ('DRF', lambda: serializer.to_representation(serializer.child.optimize_queryset(queryset))),
+                ('api.fast', lambda: fast.to_representation(fast.get_queryset(queryset))),
+            ]
+            assert cases[0][1]() == cases[1][1]()
+            for path, render in cases:
+                median, p95 = measure(render, repeat=10)
+                rows.append((name, path, f"{median:.2f}", f"{p95:.2f}", f"{count / median * 1000:,.0f}"))
+
+        report(
+            f"Rendering {count} articles",
+            rows,
+            ('fields', 'path', 'median ms', 'p95 ms', 'rows/s'),
+        )
+
+
+if __name__ == '__main__':
+    setup()
+    main(*(int(arg) for arg in sys.argv[1:2]))
@@ -0,0 +1,105 @@
+"""
+StatsView cost: eleven COUNT queries vs. a conditional-aggregate recount vs. the rollup.
+
+Usage: ``python -m benchmarks.stats [publication_count]`` (default 100000).
+"""
+import sys
+from datetime import timedelta
+
+from benchmarks.utils import measure, report, seed_author, setup, test_database
+
+
+def seed(count):
+    from django.utils import timezone
+    from blog.stats import rebuild
+    from blog.models import Article
+    from users.models import User
+
+    author = seed_author()
+    editor = User.objects.create_user(
+        email='bench-editor@example.com', password='password', role=User.Role.EDITOR,
+        first_name='Bench', last_name='Editor',
+    )
+    now = timezone.now()
+    batch = []
+    for i in range(count):
+        published_on = now - timedelta(hours=i % 9000) if i % 5 else now + timedelta(days=1 + i % 30)
+        batch.append(Article(
+            title=f"Benchmark article {i}",
+            slug=f"benchmark-article-{i}",
+            content="<p>Lorem ipsum dolor sit amet.</p>",
+            published=bool(i % 5),
+            published_on=published_on,
+            approved_by=editor if i % 3 else None,
+            created_by=author,
+        ))
+        if len(batch) == 5000:
+            Article.objects.bulk_create(batch)
+            batch = []
+    Article.objects.bulk_create(batch)
+    # bulk_create skips Publication.save, so fill the rollup in one pass.
+    rebuild()
+
+
+def legacy_stats():
+    """The per-counter queries StatsView used to run."""
+    from django.utils import timezone
+    from blog.models import Article
+    from users.models import User
+
+    now = timezone.now()
+    today = now.date()
+    month_start = now.replace(day=1, hour=0, minute=0, second=0, microsecond=0)
+    year_start = now.replace(month=1, day=1, hour=0, minute=0, second=0, microsecond=0)
+    return {
+        "article": {
+            "total_articles": Article.objects.count(),
+            "total_published": Article.objects.filter(published=True).count(),
+            "total_scheduled": Article.objects.filter(published=False, published_on__isnull=False).count(),
+            "asking_approval": Article.objects.filter(approved_by__isnull=True).count(),
+            "total_approved": Article.objects.filter(approved_by__isnull=False).count(),
+            "total_unapproved": Article.objects.filter(approved_by__isnull=True).count(),
+            "today_published": Article.objects.filter(published_on__date=today).count(),
+            "this_month_published": Article.objects.filter(published_on__gte=month_start).count(),
+            "this_year_published": Article.objects.filter(published_on__gte=year_start).count(),
+        },
+        "user_stats": {
+            "active_authors": User.objects.filter(role=User.Role.AUTHOR, is_active=True).count(),
+            "active_readers": User.objects.filter(role=User.Role.READER, is_active=True).count(),
+        },
+    }
+
+
+def main(count=100000):
+    from django.core.cache import cache
+    from django.db import connection
+    from django.test.utils import CaptureQueriesContext, override_settings
+    from api.stats import compute_stats, get_stats
+    from blog.stats import compute_rollup
+
+    with test_database():
+        seed(count)
+        assert legacy_stats() == compute_stats()
+
+        rows = []
+        cases = [
+            ('11 COUNT queries', legacy_stats),
+            ('aggregate recount', compute_rollup),
+            ('rollup tables', compute_stats),
+        ]
+        with override_settings(STATS_CACHE_TTL=60):
+            cache.clear()
+            cases.append(('cached snapshot', get_stats))
+            for name, func in cases:
+                func()
+                with CaptureQueriesContext(connection) as queries:
+                    func()
+                median, p95 = measure(func, repeat=10, warmup=1)
+                rows.append((name, len(queries), f"{median:.2f}", f"{p95:.2f}"))
+
+        report(f"StatsView over {count} publications", rows, ('strategy', 'queries', 'median ms', 'p95 ms'))
+
+
+if __name__ == '__main__':
+    setup()
+    main(*(int(arg) for arg in sys.argv[1:2]))
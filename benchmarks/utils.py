@@ -0,0 +1,82 @@
+"""
+Shared helpers for the scripts in this package.
+
+Every benchmark runs against a throwaway test database created from the
+configured ``DATABASES['default']``, so it never touches real data. Run them
+from the project root, e.g. ``python -m benchmarks.pagination``.
+"""
+import os
+import statistics
+import time
+from contextlib import contextmanager
+
+import django
+
+
+def setup():
+    os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'crowpro.settings')
+    os.environ.setdefault('ACCESS_TOKEN_LIFETIME', '300')
+    os.environ.setdefault('REFRESH_TOKEN_LIFETIME', '3600')
+    django.setup()
+
+    import logging
+    logging.disable(logging.INFO)
+
+
+@contextmanager
+def test_database():
+    from django.db import connection
+    from django.test.utils import setup_test_environment, teardown_test_environment
+
+    setup_test_environment()
+    old_name = connection.creation.create_test_db(verbosity=0, autoclobber=True)
+    try:
+        yield connection
+    finally:
+        connection.creation.destroy_test_db(old_name, verbosity=0)
+        teardown_test_environment()
+
+
+def measure(func, repeat=20, warmup=2):
+    """Return the median and p95 wall time of ``func()`` in milliseconds."""
+    for _ in range(warmup):
+        func()
+    samples = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        func()
+        samples.append((time.perf_counter() - start) * 1000)
+    samples.sort()
+    return statistics.median(samples), samples[int(len(samples) * 0.95) - 1]
+
+
+def seed_author(email='bench-author@example.com'):
+    from users.models import User
+
+    return User.objects.create_user(
+        email=email,
+        password='password',
+        role=User.Role.AUTHOR,
+        first_name='Bench',
+        last_name='Author',
+    )
+
+
+def bulk_create_publications(model, publications, batch_size=2000):
+    """``bulk_create`` skips ``Publication.save``, so write the bodies alongside."""
+    from blog.models import PublicationBody
+
+    publications = model.objects.bulk_create(publications, batch_size=batch_size)
+    PublicationBody.objects.bulk_create(
+        [PublicationBody(publication_id=publication.pk, content=publication.content) for publication in publications],
+        batch_size=batch_size,
+    )
+    return publications
+
+
+def report(title, rows, headers):
+    widths = [max(len(str(v)) for v in column) for column in zip(headers, *rows)]
+    print(f"\n{title}")
+    print("  ".join(str(h).ljust(w) for h, w in zip(headers, widths)))
+    for row in rows:
+        print("  ".join(str(v).ljust(w) for v, w in zip(row, widths)))
@@ -1,10 +1,14 @@
 from django.contrib import admin
-from .models import Article, Editorial, PublicationAuthor, PublicationSeries
+from .forms import PublicationBodyForm
+from .summary import SUMMARY_FIELDS
+from .models import Article, Editorial, PublicationAuthor, PublicationSeries, Upload
 
 
 class ArticleAdmin(admin.ModelAdmin):
     list_display = ('created_by', 'title', 'get_authors', 'published_on', 'approved_on', 'approved_by',)
     model = Article
+    form = PublicationBodyForm
+    readonly_fields = SUMMARY_FIELDS
 
     def get_authors(self, obj):
         return ", ".join([author.get_full_name() or author.email for author in obj.authors.all()])
@@ -14,6 +18,8 @@ class ArticleAdmin(admin.ModelAdmin):
 class EditorialAdmin(admin.ModelAdmin):
     list_display = ('created_by', 'title', 'published_on')
     model = Editorial
+    form = PublicationBodyForm
+    readonly_fields = SUMMARY_FIELDS
 
 
 class PublicationAuthorAdmin(admin.ModelAdmin):
@@ -26,7 +32,15 @@ class PublicationAuthorAdmin(admin.ModelAdmin):
         return obj.user
 
 
+class UploadAdmin(admin.ModelAdmin):
+    list_display = ('file_name', 'status', 'size', 'created_by', 'created_on', 'stored_on')
+    list_filter = ('status',)
+    search_fields = ('file_name', 'token', 'sha256')
+    readonly_fields = ('token', 'sha256', 'size', 'storage_name', 'url', 'stored_on')
+
+
 admin.site.register(Article, ArticleAdmin)
 admin.site.register(Editorial, EditorialAdmin)
 admin.site.register(PublicationAuthor, PublicationAuthorAdmin)
 admin.site.register(PublicationSeries)
+admin.site.register(Upload, UploadAdmin)
@@ -0,0 +1,108 @@
+"""
+Maintenance of the PublicationCard read model.
+
+``blog.signals`` calls :func:`refresh` whenever a publication, its author list
+or an author's name changes, inside the same transaction as the change.
+Anything that writes publications without ``save()`` (``bulk_create``,
+``QuerySet.update``) must call :func:`refresh` itself or rebuild the table
+with ``manage.py rebuild_cards``.
+"""
+from django.apps import apps
+from django.db import transaction
+from django.db.models import Prefetch
+
+from blog import thumbnails
+
+CARD_FIELDS = (
+    'publication_type', 'status', 'slug', 'title', 'excerpt', 'thumbnail', 'thumbnail_derivatives',
+    'published_on', 'approved_on', 'authors',
+)
+
+AUTHOR_FIELDS = ('id', 'email', 'first_name', 'last_name', 'profile_img')
+STATUS_DRAFT, STATUS_PUBLISHED, STATUS_HIDDEN = 'DRAFT', 'PUBLISHED', 'HIDDEN'
+
+
+def _models():
+    return (
+        apps.get_model('blog', 'Publication'),
+        apps.get_model('blog', 'PublicationCard'),
+        apps.get_model('users', 'User'),
+    )
+
+
+def get_status(publication):
+    if publication.hide:
+        return STATUS_HIDDEN
+    if publication.published:
+        return STATUS_PUBLISHED
+    return STATUS_DRAFT
+
+
+def render_authors(authors):
+    # The shape UserSerializer gives authors, with the picture's storage name for its URL.
+    return [
+        {
+            'id': author.id,
+            'email': author.email,
+            'full_name': author.get_full_name(),
+            'profile_img': author.profile_img.name or None,
+        }
+        for author in authors
+    ]
+
+
+def build_card(PublicationCard, publication):
+    """A card for ``publication``, whose ``authors`` must be prefetched."""
+    return PublicationCard(
+        publication_id=publication.pk,
+        publication_type=publication.publication_type,
+        status=get_status(publication),
+        slug=publication.slug,
+        title=publication.title,
+        excerpt=publication.excerpt,
+        thumbnail=publication.thumbnail.name or '',
+        thumbnail_derivatives=thumbnails.get_current(publication.thumbnail.name, publication.thumbnail_derivatives),
+        published_on=publication.published_on,
+        approved_on=publication.approved_on,
+        authors=render_authors(publication.authors.all()),
+    )
+
+
+def _card_sources():
+    Publication, _, User = _models()
+    return Publication.objects.prefetch_related(
+        Prefetch('authors', queryset=User.objects.only(*AUTHOR_FIELDS).order_by('id'))
+    ).order_by('pk')
+
+
+def refresh(pks):
+    """Bring the cards of the publications in ``pks`` in line with their rows."""
+    pks = set(pks)
+    if not pks:
+        return
+    PublicationCard = _models()[1]
+    cards = [build_card(PublicationCard, publication) for publication in _card_sources().filter(pk__in=pks)]
+    if cards:
+        PublicationCard.objects.bulk_create(
+            cards,
+            update_conflicts=True,
+            unique_fields=['publication'],
+            update_fields=[*CARD_FIELDS, 'updated_on'],
+        )
+
+
+def rebuild(batch_size=500):
+    """Recreate every card, ``batch_size`` publications at a time. Returns the number of cards written."""
+    PublicationCard = _models()[1]
+    count = 0
+    with transaction.atomic():
+        PublicationCard.objects.all().delete()
+        batch = []
+        for publication in _card_sources().iterator(chunk_size=batch_size):
+            batch.append(build_card(PublicationCard, publication))
+            if len(batch) == batch_size:
+                PublicationCard.objects.bulk_create(batch)
+                count += len(batch)
+                batch = []
+        PublicationCard.objects.bulk_create(batch)
+    return count + len(batch)
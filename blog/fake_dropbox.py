@@ -0,0 +1,102 @@
+"""
+In-memory stand-in for ``dropbox.Dropbox`` covering the calls the storages make.
+
+Use it to exercise uploads and shared links offline::
+
+    storage = ModifiedDropboxStorage(client=FakeDropboxClient())
+"""
+from collections import Counter
+from types import SimpleNamespace
+
+from dropbox.exceptions import ApiError
+from dropbox.files import DeleteError, FileMetadata, FolderMetadata, GetMetadataError, LookupError
+from dropbox.sharing import CreateSharedLinkWithSettingsError, SharedLinkMetadata
+
+
+class FakeDropboxClient:
+    link_prefix = 'https://www.dropbox.com/scl/fi/fake'
+
+    def __init__(self):
+        self.files = {}
+        self.links = {}
+        self.calls = Counter()
+        self._sessions = {}
+
+    def _api_error(self, error):
+        return ApiError('fake-request', error, None, None)
+
+    def files_upload(self, f, path, mode=None, **kwargs):
+        self.calls['files_upload'] += 1
+        self.files[path] = bytes(f)
+        return FileMetadata(name=path.rsplit('/', 1)[-1], path_lower=path.lower(), size=len(f))
+
+    def files_upload_session_start(self, f, **kwargs):
+        self.calls['files_upload_session_start'] += 1
+        session_id = str(len(self._sessions) + 1)
+        self._sessions[session_id] = bytearray(f)
+        return SimpleNamespace(session_id=session_id)
+
+    def files_upload_session_append_v2(self, f, cursor, **kwargs):
+        self.calls['files_upload_session_append_v2'] += 1
+        self._sessions[cursor.session_id] += f
+
+    def files_upload_session_finish(self, f, cursor, commit):
+        self.calls['files_upload_session_finish'] += 1
+        data = self._sessions.pop(cursor.session_id) + f
+        return self.files_upload(data, commit.path)
+
+    def files_download(self, path, **kwargs):
+        self.calls['files_download'] += 1
+        if path not in self.files:
+            raise self._api_error(GetMetadataError.path(LookupError.not_found))
+        content = self.files[path]
+        return FileMetadata(name=path.rsplit('/', 1)[-1], size=len(content)), SimpleNamespace(
+            status_code=200, content=content
+        )
+
+    def files_get_metadata(self, path, **kwargs):
+        self.calls['files_get_metadata'] += 1
+        if path in self.files:
+            return FileMetadata(name=path.rsplit('/', 1)[-1], size=len(self.files[path]))
+        if any(name.startswith(path.rstrip('/') + '/') for name in self.files):
+            return FolderMetadata(name=path.rsplit('/', 1)[-1])
+        raise self._api_error(GetMetadataError.path(LookupError.not_found))
+
+    def files_delete(self, path, **kwargs):
+        self.calls['files_delete'] += 1
+        if self.files.pop(path, None) is None:
+            raise self._api_error(DeleteError.path_lookup(LookupError.not_found))
+        self.links.pop(path, None)
+
+    def files_list_folder(self, path, **kwargs):
+        self.calls['files_list_folder'] += 1
+        prefix = path.rstrip('/') + '/'
+        entries, folders = [], set()
+        for name, content in self.files.items():
+            if not name.startswith(prefix):
+                continue
+            head, _, tail = name[len(prefix):].partition('/')
+            if tail:
+                folders.add(head)
+            else:
+                entries.append(FileMetadata(name=head, size=len(content)))
+        entries += [FolderMetadata(name=folder) for folder in sorted(folders)]
+        return SimpleNamespace(entries=entries, has_more=False)
+
+    def files_get_temporary_link(self, path):
+        self.calls['files_get_temporary_link'] += 1
+        return SimpleNamespace(link=f'https://dl.dropboxusercontent.com/fake{path}')
+
+    def sharing_create_shared_link_with_settings(self, path, settings=None):
+        self.calls['sharing_create_shared_link_with_settings'] += 1
+        if path not in self.files:
+            raise self._api_error(CreateSharedLinkWithSettingsError.path(LookupError.not_found))
+        if path in self.links:
+            raise self._api_error(CreateSharedLinkWithSettingsError.shared_link_already_exists(None))
+        self.links[path] = SharedLinkMetadata(url=f'{self.link_prefix}{path}?dl=0', path_lower=path.lower())
+        return self.links[path]
+
+    def sharing_list_shared_links(self, path=None, cursor=None, direct_only=None):
+        self.calls['sharing_list_shared_links'] += 1
+        links = [self.links[path]] if path in self.links else []
+        return SimpleNamespace(links=links, has_more=False, cursor=None)
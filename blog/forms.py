@@ -1,8 +1,22 @@
 from django.forms import ModelForm
-from .models import Article, Editorial
+from .models import Article, Editorial, PublicationBody
 
 
-class ArticleForm(ModelForm):
+class PublicationBodyForm(ModelForm):
+    """A publication form that also edits the body stored in :class:`PublicationBody`."""
+    content = PublicationBody._meta.get_field('content').formfield()
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        if self.instance.pk is not None:
+            self.initial.setdefault('content', self.instance.content)
+
+    def save(self, commit=True):
+        self.instance.content = self.cleaned_data['content']
+        return super().save(commit)
+
+
+class ArticleForm(PublicationBodyForm):
     class Meta:
         model = Article
         fields = (
@@ -12,7 +26,7 @@ class ArticleForm(ModelForm):
         )
 
 
-class EditorialForm(ModelForm):
+class EditorialForm(PublicationBodyForm):
     class Meta:
         model = Editorial
         fields = (
@@ -0,0 +1,21 @@
+from django.core.management.base import BaseCommand
+
+from blog import summary
+
+
+class Command(BaseCommand):
+    help = "Compute the stored excerpt, word count, reading time and first image of existing publications."
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--batch-size', type=int, default=500,
+            help="Publications loaded and written per batch.",
+        )
+        parser.add_argument(
+            '--missing-only', action='store_true',
+            help="Only publications without a stored word count.",
+        )
+
+    def handle(self, *args, **options):
+        count = summary.backfill(batch_size=options['batch_size'], only_missing=options['missing_only'])
+        self.stdout.write(self.style.SUCCESS(f"Updated the summaries of {count} publication(s)."))
@@ -0,0 +1,32 @@
+from django.conf import settings
+from django.core.management.base import BaseCommand
+
+from blog import scheduler
+
+
+class Command(BaseCommand):
+    help = "Publish scheduled publications when their publish time arrives, polling until stopped."
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--interval', type=float, default=settings.SCHEDULED_PUBLISHING_INTERVAL,
+            help="Seconds between polls.",
+        )
+        parser.add_argument(
+            '--batch-size', type=int, default=500,
+            help="Publications claimed and published per transaction.",
+        )
+        parser.add_argument(
+            '--once', action='store_true',
+            help="Publish what is due now and exit.",
+        )
+
+    def handle(self, *args, **options):
+        if options['once']:
+            count = scheduler.publish_due(batch_size=options['batch_size'])
+            self.stdout.write(self.style.SUCCESS(f"Published {count} scheduled publication(s)."))
+            return
+        try:
+            scheduler.run(options['interval'], batch_size=options['batch_size'], stdout=self.stdout)
+        except KeyboardInterrupt:
+            pass
@@ -0,0 +1,17 @@
+from django.core.management.base import BaseCommand
+
+from blog import cards
+
+
+class Command(BaseCommand):
+    help = "Recreate the publication card table from the publications and their authors."
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--batch-size', type=int, default=500,
+            help="Publications loaded and written per batch.",
+        )
+
+    def handle(self, *args, **options):
+        count = cards.rebuild(batch_size=options['batch_size'])
+        self.stdout.write(self.style.SUCCESS(f"Rebuilt {count} publication card(s)."))
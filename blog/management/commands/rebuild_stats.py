@@ -0,0 +1,27 @@
+from django.core.management.base import BaseCommand, CommandError
+
+from blog import stats
+
+
+class Command(BaseCommand):
+    help = "Recompute the publication statistics rollup from scratch and report drift."
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--check', action='store_true',
+            help="Only report drift; exit with an error instead of rebuilding.",
+        )
+
+    def handle(self, *args, **options):
+        drift = stats.find_drift()
+        for key, stored, actual in drift:
+            self.stdout.write(f"{key}: stored={stored} actual={actual}")
+
+        if options['check']:
+            if drift:
+                raise CommandError(f"Publication stats rollup has drifted in {len(drift)} place(s).")
+            self.stdout.write(self.style.SUCCESS("Publication stats rollup is consistent."))
+            return
+
+        stats.rebuild()
+        self.stdout.write(self.style.SUCCESS(f"Rebuilt publication stats rollup ({len(drift)} value(s) corrected)."))
@@ -0,0 +1,18 @@
+# Generated by Django 5.2.18 on 2026-10-18 06:30
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('blog', '0012_remove_publicationseries_chapter_and_more'),
+        ('users', '0006_writer'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='publication',
+            index=models.Index(fields=['-published_on', '-id'], name='publication_published_idx'),
+        ),
+    ]
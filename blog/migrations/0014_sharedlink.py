@@ -0,0 +1,22 @@
+# Generated by Django 5.2.18 on 2026-10-18 06:34
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('blog', '0013_publication_published_idx'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='SharedLink',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('name', models.CharField(max_length=255, unique=True)),
+                ('url', models.URLField(max_length=1024)),
+                ('created_on', models.DateTimeField(auto_now_add=True)),
+            ],
+        ),
+    ]
@@ -0,0 +1,66 @@
+# Generated by Django 5.2.18 on 2026-10-18 06:40
+
+from django.db import migrations, models
+from django.db.models import Count, Q
+from django.db.models.functions import TruncDate
+
+
+def backfill_rollup(apps, schema_editor):
+    Publication = apps.get_model('blog', 'Publication')
+    PublicationStats = apps.get_model('blog', 'PublicationStats')
+    DailyPublicationCount = apps.get_model('blog', 'DailyPublicationCount')
+
+    PublicationStats.objects.bulk_create(
+        PublicationStats(**row)
+        for row in Publication.objects.values('publication_type').annotate(
+            total=Count('id'),
+            # Ahead of ``published``, whose annotation would shadow the field.
+            scheduled=Count('id', filter=Q(published=False, published_on__isnull=False)),
+            published=Count('id', filter=Q(published=True)),
+            approved=Count('id', filter=Q(approved_by__isnull=False)),
+            hidden=Count('id', filter=Q(hide=True)),
+        ).order_by()
+    )
+    DailyPublicationCount.objects.bulk_create(
+        DailyPublicationCount(**row)
+        for row in Publication.objects.filter(published_on__isnull=False)
+        .annotate(day=TruncDate('published_on'))
+        .values('publication_type', 'day')
+        .annotate(count=Count('id'))
+        .order_by()
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('blog', '0014_sharedlink'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='PublicationStats',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('publication_type', models.TextField(choices=[('EDITORIAL', 'Editorial'), ('ARTICLE', 'Article')], unique=True)),
+                ('total', models.IntegerField(default=0)),
+                ('published', models.IntegerField(default=0)),
+                ('approved', models.IntegerField(default=0)),
+                ('hidden', models.IntegerField(default=0)),
+                ('scheduled', models.IntegerField(default=0)),
+            ],
+        ),
+        migrations.CreateModel(
+            name='DailyPublicationCount',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('publication_type', models.TextField(choices=[('EDITORIAL', 'Editorial'), ('ARTICLE', 'Article')])),
+                ('day', models.DateField()),
+                ('count', models.IntegerField(default=0)),
+            ],
+            options={
+                'constraints': [models.UniqueConstraint(fields=('publication_type', 'day'), name='daily_publication_count_unique')],
+            },
+        ),
+        migrations.RunPython(backfill_rollup, migrations.RunPython.noop),
+    ]
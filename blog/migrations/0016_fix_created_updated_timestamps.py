@@ -0,0 +1,51 @@
+# Generated by Django 5.2.18 on 2026-10-18 06:49
+
+from django.db import migrations, models
+
+
+def swap_timestamps(apps, schema_editor, batch_size=500):
+    # The columns were filled the wrong way round: created_on tracked the last
+    # save and updated_on the insert. The swap reads the old values in Python,
+    # because MySQL assigns SET clauses left to right, so a single
+    # "SET created_on = updated_on, updated_on = created_on" sees the new value.
+    for name in ('Publication', 'PublicationSeries'):
+        model = apps.get_model('blog', name)
+        batch = []
+        for instance in model.objects.only('created_on', 'updated_on').iterator(chunk_size=batch_size):
+            instance.created_on, instance.updated_on = instance.updated_on, instance.created_on
+            batch.append(instance)
+            if len(batch) == batch_size:
+                model.objects.bulk_update(batch, ['created_on', 'updated_on'])
+                batch = []
+        model.objects.bulk_update(batch, ['created_on', 'updated_on'])
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('blog', '0015_publication_stats_rollup'),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name='publication',
+            name='created_on',
+            field=models.DateTimeField(auto_now_add=True),
+        ),
+        migrations.AlterField(
+            model_name='publication',
+            name='updated_on',
+            field=models.DateTimeField(auto_now=True),
+        ),
+        migrations.AlterField(
+            model_name='publicationseries',
+            name='created_on',
+            field=models.DateField(auto_now_add=True),
+        ),
+        migrations.AlterField(
+            model_name='publicationseries',
+            name='updated_on',
+            field=models.DateField(auto_now=True),
+        ),
+        migrations.RunPython(swap_timestamps, swap_timestamps),
+    ]
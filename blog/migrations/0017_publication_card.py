@@ -0,0 +1,84 @@
+# Generated by Django 5.2.18 on 2026-10-18 07:00
+
+import django.db.models.deletion
+from django.db import migrations, models
+from django.db.models import Prefetch
+from django.utils.html import strip_tags
+from django.utils.text import Truncator
+
+BATCH_SIZE = 500
+
+
+def get_status(publication):
+    if publication.hide:
+        return 'HIDDEN'
+    return 'PUBLISHED' if publication.published else 'DRAFT'
+
+
+def backfill_cards(apps, schema_editor):
+    # An approximation of blog.summary's excerpt; manage.py backfill_summaries
+    # rewrites the cards with the exact one.
+    Publication = apps.get_model('blog', 'Publication')
+    PublicationCard = apps.get_model('blog', 'PublicationCard')
+    User = apps.get_model('users', 'User')
+    publications = Publication.objects.prefetch_related(
+        Prefetch('authors', queryset=User.objects.only(
+            'id', 'email', 'first_name', 'last_name', 'profile_img',
+        ).order_by('id'))
+    ).order_by('pk')
+    batch = []
+    for publication in publications.iterator(chunk_size=BATCH_SIZE):
+        batch.append(PublicationCard(
+            publication_id=publication.pk,
+            publication_type=publication.publication_type,
+            status=get_status(publication),
+            slug=publication.slug,
+            title=publication.title,
+            excerpt=Truncator(' '.join(strip_tags(publication.content).split())).words(40),
+            thumbnail=publication.thumbnail.name or '',
+            published_on=publication.published_on,
+            approved_on=publication.approved_on,
+            authors=[
+                {
+                    'id': author.id,
+                    'email': author.email,
+                    'full_name': f'{author.first_name} {author.last_name}'.strip(),
+                    'profile_img': author.profile_img.name or None,
+                }
+                for author in publication.authors.all()
+            ],
+        ))
+        if len(batch) == BATCH_SIZE:
+            PublicationCard.objects.bulk_create(batch)
+            batch = []
+    PublicationCard.objects.bulk_create(batch)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('blog', '0016_fix_created_updated_timestamps'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='PublicationCard',
+            fields=[
+                ('publication', models.OneToOneField(on_delete=django.db.models.deletion.CASCADE, primary_key=True, related_name='card', serialize=False, to='blog.publication')),
+                ('publication_type', models.TextField(choices=[('EDITORIAL', 'Editorial'), ('ARTICLE', 'Article')])),
+                ('status', models.CharField(choices=[('DRAFT', 'Draft'), ('PUBLISHED', 'Published'), ('HIDDEN', 'Hidden')], max_length=16)),
+                ('slug', models.SlugField(blank=True, max_length=128, null=True)),
+                ('title', models.CharField(default='', max_length=128)),
+                ('excerpt', models.TextField(blank=True, default='')),
+                ('thumbnail', models.CharField(blank=True, default='', max_length=100)),
+                ('published_on', models.DateTimeField(blank=True, null=True)),
+                ('approved_on', models.DateTimeField(blank=True, null=True)),
+                ('authors', models.JSONField(default=list)),
+                ('updated_on', models.DateTimeField(auto_now=True)),
+            ],
+            options={
+                'indexes': [models.Index(fields=['status', 'published_on', 'publication'], name='publication_card_feed_idx'), models.Index(fields=['publication_type', 'status', 'published_on', 'publication'], name='publication_card_type_idx')],
+            },
+        ),
+        migrations.RunPython(backfill_cards, migrations.RunPython.noop),
+    ]
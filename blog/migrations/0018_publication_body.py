@@ -0,0 +1,55 @@
+# Generated by Django 5.2.18 on 2026-10-18 07:06
+
+import django.db.models.deletion
+import django_ckeditor_5.fields
+from django.db import migrations, models
+
+BATCH_SIZE = 500
+
+
+def move_content_to_bodies(apps, schema_editor):
+    Publication = apps.get_model('blog', 'Publication')
+    PublicationBody = apps.get_model('blog', 'PublicationBody')
+    rows = Publication.objects.order_by('pk').values_list('pk', 'content').iterator(chunk_size=BATCH_SIZE)
+    batch = []
+    for pk, content in rows:
+        batch.append(PublicationBody(publication_id=pk, content=content))
+        if len(batch) == BATCH_SIZE:
+            PublicationBody.objects.bulk_create(batch)
+            batch = []
+    PublicationBody.objects.bulk_create(batch)
+
+
+def move_bodies_to_content(apps, schema_editor):
+    Publication = apps.get_model('blog', 'Publication')
+    PublicationBody = apps.get_model('blog', 'PublicationBody')
+    for body in PublicationBody.objects.iterator(chunk_size=BATCH_SIZE):
+        Publication.objects.filter(pk=body.publication_id).update(content=body.content)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('blog', '0017_publication_card'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='PublicationBody',
+            fields=[
+                ('publication', models.OneToOneField(on_delete=django.db.models.deletion.CASCADE, primary_key=True, related_name='body', serialize=False, to='blog.publication')),
+                ('content', django_ckeditor_5.fields.CKEditor5Field()),
+            ],
+        ),
+        migrations.RunPython(move_content_to_bodies, move_bodies_to_content),
+        # Lets the column be re-added to existing rows when migrating backwards.
+        migrations.AlterField(
+            model_name='publication',
+            name='content',
+            field=django_ckeditor_5.fields.CKEditor5Field(default=''),
+        ),
+        migrations.RemoveField(
+            model_name='publication',
+            name='content',
+        ),
+    ]
@@ -0,0 +1,33 @@
+# Generated by Django 5.2.18 on 2026-10-18 07:11
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('blog', '0018_publication_body'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='publication',
+            name='excerpt',
+            field=models.TextField(blank=True, default=''),
+        ),
+        migrations.AddField(
+            model_name='publication',
+            name='first_image_url',
+            field=models.CharField(blank=True, default='', max_length=1024),
+        ),
+        migrations.AddField(
+            model_name='publication',
+            name='reading_time',
+            field=models.PositiveSmallIntegerField(default=0, help_text='Minutes'),
+        ),
+        migrations.AddField(
+            model_name='publication',
+            name='word_count',
+            field=models.PositiveIntegerField(default=0),
+        ),
+    ]
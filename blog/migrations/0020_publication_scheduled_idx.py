@@ -0,0 +1,18 @@
+# Generated by Django 5.2.18 on 2026-10-18 07:39
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('blog', '0019_publication_summary'),
+        ('users', '0007_user_token_version'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='publication',
+            index=models.Index(condition=models.Q(('published', False)), fields=['published_on'], name='publication_scheduled_idx'),
+        ),
+    ]
@@ -0,0 +1,33 @@
+# Generated by Django 5.2.18 on 2026-10-18 07:49
+
+import django.db.models.deletion
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('blog', '0020_publication_scheduled_idx'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='Upload',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('token', models.CharField(max_length=32, unique=True)),
+                ('file_name', models.CharField(max_length=255)),
+                ('content_type', models.CharField(blank=True, default='', max_length=255)),
+                ('size', models.PositiveBigIntegerField()),
+                ('sha256', models.CharField(db_index=True, max_length=64)),
+                ('status', models.CharField(choices=[('STAGED', 'Staged'), ('STORED', 'Stored')], default='STAGED', max_length=16)),
+                ('storage_name', models.CharField(blank=True, default='', max_length=255)),
+                ('url', models.URLField(blank=True, default='', max_length=1024)),
+                ('created_on', models.DateTimeField(auto_now_add=True)),
+                ('stored_on', models.DateTimeField(blank=True, null=True)),
+                ('created_by', models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='+', to=settings.AUTH_USER_MODEL)),
+            ],
+        ),
+    ]
@@ -0,0 +1,23 @@
+# Generated by Django 5.2.18 on 2026-10-18 07:57
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('blog', '0022_media_blob'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='publication',
+            name='thumbnail_derivatives',
+            field=models.JSONField(blank=True, default=dict, editable=False),
+        ),
+        migrations.AddField(
+            model_name='publicationcard',
+            name='thumbnail_derivatives',
+            field=models.JSONField(blank=True, default=dict),
+        ),
+    ]
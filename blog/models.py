@@ -1,11 +1,12 @@
 from django.core.validators import FileExtensionValidator
-from django.db import models
+from django.db import models, transaction
 from django.utils.text import slugify
 from django.utils.text import gettext_lazy as _
 from django.core.exceptions import ValidationError
 
 from django_ckeditor_5.fields import CKEditor5Field
 
+from blog import stats, summary
 from blog.managers import ArticleManager, EditorialManager
 from users.models import Author, Editor, User, Writer
 
@@ -18,9 +19,15 @@ class Publication(models.Model):
     publication_type = models.TextField(choices=PublicationType.choices, default=PublicationType.Article)
     title = models.CharField(max_length=128, default='')
     published_on = models.DateTimeField(null=True, blank=True)
-    content = CKEditor5Field()
+    # Derived from content by Publication.save, see blog.summary.
+    excerpt = models.TextField(blank=True, default='')
+    word_count = models.PositiveIntegerField(default=0)
+    reading_time = models.PositiveSmallIntegerField(default=0, help_text=_('Minutes'))
+    first_image_url = models.CharField(max_length=1024, blank=True, default='')
     thumbnail = models.ImageField(upload_to="images/", null=True, blank=True,
                                   validators=[FileExtensionValidator(['jpg', 'jpeg', 'png'])])
+    # Resized copies of the thumbnail, written by blog.thumbnails.
+    thumbnail_derivatives = models.JSONField(default=dict, blank=True, editable=False)
     hide = models.BooleanField(default=False)
     published = models.BooleanField(default=False)
     slug = models.SlugField(max_length=128, unique=True, blank=True, null=True)
@@ -29,24 +36,101 @@ class Publication(models.Model):
     approved_by = models.ForeignKey(to=Editor, on_delete=models.DO_NOTHING, null=True, blank=True,
                                     related_name='approved_by')
     approved_on = models.DateTimeField(null=True, blank=True)
-    created_on = models.DateTimeField(auto_now=True)
-    updated_on = models.DateTimeField(auto_now_add=True)
+    created_on = models.DateTimeField(auto_now_add=True)
+    updated_on = models.DateTimeField(auto_now=True)
+
+    class Meta:
+        indexes = [
+            # Matches PublicationCursorPagination's ordering, so pages are read off the index in order.
+            models.Index(fields=['-published_on', '-id'], name='publication_published_idx'),
+            # The scheduled queue polled by blog.scheduler.
+            models.Index(fields=['published_on'], condition=models.Q(published=False),
+                         name='publication_scheduled_idx'),
+        ]
 
     def __str__(self):
         return self.title
 
+    @property
+    def content(self):
+        """
+        The body HTML, kept in :class:`PublicationBody` so list queries never read it.
+
+        Assigned values are written to the body when the publication is saved.
+        Loading it costs a query unless ``body`` was joined with ``select_related``.
+        """
+        pending = self.__dict__.get('_pending_content')
+        if pending is not None:
+            return pending
+        try:
+            return self.body.content
+        except PublicationBody.DoesNotExist:
+            return ''
+
+    @content.setter
+    def content(self, value):
+        self._pending_content = value
+
+    @classmethod
+    def from_db(cls, db, field_names, values):
+        instance = super().from_db(db, field_names, values)
+        instance._stats_state = stats.get_state(instance) if stats.is_tracked(instance) else None
+        instance._loaded_slug = instance.__dict__.get('slug')
+        return instance
+
     def save(self, *args, **kwargs):
-        if self.slug:
-            super().save(*args, **kwargs)
-        else:
-            self.slug = slugify(self.title)
-            super().save(*args, **kwargs)
+        with transaction.atomic():
+            previous = getattr(self, '_stats_state', None) if not self._state.adding else None
+            if previous is None and not self._state.adding:
+                previous = stats.get_stored_state(self.pk)
+
+            content = self.__dict__.get('_pending_content')
+            if content is not None:
+                self.set_summary(content)
+                if kwargs.get('update_fields') is not None:
+                    kwargs['update_fields'] = {*kwargs['update_fields'], *summary.SUMMARY_FIELDS}
+
+            if self.slug:
+                super().save(*args, **kwargs)
+            else:
+                self.slug = slugify(self.title)
+                super().save(*args, **kwargs)
+            self._save_body()
+
+            self._stats_state = stats.get_state(self)
+            stats.apply_change(previous, self._stats_state)
+
+    def set_summary(self, content):
+        for name, value in summary.summarize(content).items():
+            setattr(self, name, value)
+
+    def _save_body(self):
+        content = self.__dict__.pop('_pending_content', None)
+        if content is None:
+            return
+        self.body, _ = PublicationBody.objects.update_or_create(publication=self, defaults={'content': content})
+
+    def delete(self, *args, **kwargs):
+        with transaction.atomic():
+            previous = stats.get_stored_state(self.pk)
+            result = super().delete(*args, **kwargs)
+            stats.apply_change(previous, None)
+        return result
 
     def clean(self):
         if self.created_by.role not in [User.Role.EDITOR, User.Role.AUTHOR]:
             raise PermissionError()
 
 
+class PublicationBody(models.Model):
+    """The CKEditor HTML of a publication, split off so its row stays narrow."""
+    publication = models.OneToOneField(Publication, on_delete=models.CASCADE, primary_key=True, related_name='body')
+    content = CKEditor5Field()
+
+    def __str__(self):
+        return str(self.publication)
+
+
 class PublicationAuthor(models.Model):
     publication = models.ForeignKey('Publication', on_delete=models.CASCADE)
     user = models.ForeignKey(Writer, on_delete=models.CASCADE)
@@ -72,8 +156,8 @@ class Editorial(Publication):
 
 class PublicationSeries(models.Model):
     title = models.CharField(max_length=255,)
-    created_on = models.DateField(auto_now=True)
-    updated_on = models.DateField(auto_now_add=True)
+    created_on = models.DateField(auto_now_add=True)
+    updated_on = models.DateField(auto_now=True)
 
 
 class PublicationSeriesChapter(models.Model):
@@ -81,3 +165,124 @@ class PublicationSeriesChapter(models.Model):
     chapter = models.ForeignKey(Publication, on_delete=models.CASCADE)
 
 
+class SharedLink(models.Model):
+    """Public shared link of a file kept in remote storage, keyed by its storage name."""
+    name = models.CharField(max_length=255, unique=True)
+    url = models.URLField(max_length=1024)
+    created_on = models.DateTimeField(auto_now_add=True)
+
+    def __str__(self):
+        return self.name
+
+
+class MediaBlob(models.Model):
+    """
+    A file kept in remote storage, keyed by the SHA-256 of its bytes.
+
+    ``references`` counts the saves that resolved to it; see
+    ``ModifiedDropboxStorage.save``.
+    """
+    sha256 = models.CharField(max_length=64, unique=True)
+    name = models.CharField(max_length=255, unique=True)
+    size = models.PositiveBigIntegerField()
+    references = models.PositiveIntegerField(default=1)
+    created_on = models.DateTimeField(auto_now_add=True)
+
+    def __str__(self):
+        return self.name
+
+
+class Upload(models.Model):
+    """
+    A file uploaded through the editor, served from ``blog/uploads/<token>/``.
+
+    The file is staged on local disk under its token, with its SHA-256 recorded,
+    until a task pushes it to storage; see ``blog.uploads``.
+    """
+
+    class Status(models.TextChoices):
+        STAGED = 'STAGED', _('Staged')
+        STORED = 'STORED', _('Stored')
+
+    token = models.CharField(max_length=32, unique=True)
+    file_name = models.CharField(max_length=255)
+    content_type = models.CharField(max_length=255, blank=True, default='')
+    size = models.PositiveBigIntegerField()
+    sha256 = models.CharField(max_length=64, db_index=True)
+    status = models.CharField(max_length=16, choices=Status.choices, default=Status.STAGED)
+    storage_name = models.CharField(max_length=255, blank=True, default='')
+    url = models.URLField(max_length=1024, blank=True, default='')
+    created_by = models.ForeignKey(User, on_delete=models.SET_NULL, null=True, blank=True, related_name='+')
+    created_on = models.DateTimeField(auto_now_add=True)
+    stored_on = models.DateTimeField(null=True, blank=True)
+
+    def __str__(self):
+        return self.file_name
+
+
+class PublicationStats(models.Model):
+    """Running publication counters per type, kept in step by ``Publication.save``."""
+    publication_type = models.TextField(choices=Publication.PublicationType.choices, unique=True)
+    total = models.IntegerField(default=0)
+    published = models.IntegerField(default=0)
+    approved = models.IntegerField(default=0)
+    hidden = models.IntegerField(default=0)
+    scheduled = models.IntegerField(default=0)
+
+    def __str__(self):
+        return self.publication_type
+
+
+class DailyPublicationCount(models.Model):
+    """Number of publications whose ``published_on`` falls on ``day``."""
+    publication_type = models.TextField(choices=Publication.PublicationType.choices)
+    day = models.DateField()
+    count = models.IntegerField(default=0)
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(fields=['publication_type', 'day'], name='daily_publication_count_unique'),
+        ]
+
+    def __str__(self):
+        return f"{self.publication_type} {self.day}"
+
+
+class PublicationCard(models.Model):
+    """
+    Read model of a publication as list endpoints show it, kept in step by ``blog.signals``.
+
+    Everything a card needs is copied here, authors included, so a feed page is
+    a single scan of this table in (published_on, publication) order.
+    """
+    class Status(models.TextChoices):
+        DRAFT = "DRAFT", _('Draft')
+        PUBLISHED = "PUBLISHED", _('Published')
+        HIDDEN = "HIDDEN", _('Hidden')
+
+    publication = models.OneToOneField(Publication, on_delete=models.CASCADE, primary_key=True, related_name='card')
+    publication_type = models.TextField(choices=Publication.PublicationType.choices)
+    status = models.CharField(max_length=16, choices=Status.choices)
+    slug = models.SlugField(max_length=128, blank=True, null=True)
+    title = models.CharField(max_length=128, default='')
+    excerpt = models.TextField(blank=True, default='')
+    # Storage names, of the thumbnail and of each author's profile_img, are
+    # resolved to URLs when the card is rendered.
+    thumbnail = models.CharField(max_length=100, blank=True, default='')
+    thumbnail_derivatives = models.JSONField(default=dict, blank=True)
+    published_on = models.DateTimeField(null=True, blank=True)
+    approved_on = models.DateTimeField(null=True, blank=True)
+    authors = models.JSONField(default=list)
+    updated_on = models.DateTimeField(auto_now=True)
+
+    class Meta:
+        indexes = [
+            models.Index(fields=['status', 'published_on', 'publication'], name='publication_card_feed_idx'),
+            models.Index(
+                fields=['publication_type', 'status', 'published_on', 'publication'],
+                name='publication_card_type_idx',
+            ),
+        ]
+
+    def __str__(self):
+        return self.title
@@ -0,0 +1,104 @@
+"""
+Publishing of scheduled publications once their ``published_on`` arrives.
+
+A publication is scheduled while it is unpublished with a ``published_on``;
+``manage.py publish_scheduled`` calls :func:`publish_due` in a loop, which
+flips the visible ones whose time has come to ``published=True`` in batches.
+Articles also need an editor's approval and stay scheduled until they get it;
+editorials are never approved.
+
+Several workers may run the loop at once. Each batch claims its rows with
+``SELECT ... FOR UPDATE SKIP LOCKED`` where the database supports it, and the
+``UPDATE`` only matches rows that are still unpublished; if another worker got
+to a row first the batch is rolled back and claimed again, so every
+publication is published, and counted, exactly once.
+
+``QuerySet.update`` skips ``Publication.save``, so each batch applies its stats
+deltas and refreshes its cards itself, then sends :data:`publications_published`
+for the response cache.
+"""
+import time
+
+from django.db import connection, transaction
+from django.db.models import Q
+from django.dispatch import Signal
+from django.utils import timezone
+
+from blog import cards, stats
+from blog.models import Publication
+
+READ_FIELDS = ('pk', 'slug', *stats.TRACKED_FIELDS)
+
+# Sent inside the batch's transaction with ``rows``: the values() rows of the
+# publications just published, as they were before.
+publications_published = Signal()
+
+
+class ClaimLost(Exception):
+    """Another worker published part of the batch first."""
+
+
+def due(now=None):
+    """Scheduled publications that may go live at ``now``."""
+    return Publication.objects.filter(
+        Q(approved_by__isnull=False) | ~Q(publication_type=Publication.PublicationType.Article),
+        published=False,
+        published_on__lte=now or timezone.now(),
+        hide=False,
+    )
+
+
+def claim(now, batch_size):
+    queryset = due(now).order_by('published_on', 'pk')
+    if connection.features.has_select_for_update_skip_locked:
+        queryset = queryset.select_for_update(skip_locked=True)
+    return list(queryset.values(*READ_FIELDS)[:batch_size])
+
+
+def publish_batch(now, batch_size):
+    """Publish up to ``batch_size`` due publications in one transaction; returns how many."""
+    with transaction.atomic():
+        rows = claim(now, batch_size)
+        if not rows:
+            return 0
+        pks = [row['pk'] for row in rows]
+        updated = Publication.objects.filter(pk__in=pks, published=False).update(
+            published=True, updated_on=timezone.now(),
+        )
+        if updated != len(rows):
+            raise ClaimLost()
+        stats.apply_changes((stats.get_row_state(row), stats.get_row_state({**row, 'published': True}))
+                            for row in rows)
+        cards.refresh(pks)
+        publications_published.send(sender=Publication, rows=rows)
+    return len(rows)
+
+
+def publish_due(now=None, batch_size=500, max_retries=5):
+    """Publish every publication due at ``now``, ``batch_size`` at a time; returns how many."""
+    now = now or timezone.now()
+    count = retries = 0
+    while True:
+        try:
+            published = publish_batch(now, batch_size)
+        except ClaimLost:
+            retries += 1
+            if retries > max_retries:
+                # The rest is picked up on the next call.
+                return count
+            continue
+        count += published
+        if published < batch_size:
+            return count
+
+
+def run(interval, batch_size=500, stdout=None, iterations=None):
+    """Call :func:`publish_due` every ``interval`` seconds, ``iterations`` times or forever."""
+    iteration = 0
+    while iterations is None or iteration < iterations:
+        count = publish_due(batch_size=batch_size)
+        if count and stdout is not None:
+            stdout.write(f"Published {count} scheduled publication(s).")
+        iteration += 1
+        if iterations is None or iteration < iterations:
+            time.sleep(interval)
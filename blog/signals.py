@@ -0,0 +1,81 @@
+from django.db import transaction
+from django.db.models.signals import m2m_changed, post_delete, post_save
+from django.dispatch import receiver
+
+from blog import cards, thumbnails
+from blog.models import Article, Editorial, Publication, PublicationAuthor
+from users.models import Admin, Author, Editor, Moderator, Reader, User, Writer
+
+AUTHOR_CARD_FIELDS = {'email', 'first_name', 'last_name', 'profile_img'}
+
+
+@receiver(post_save, sender=Publication)
+@receiver(post_save, sender=Article)
+@receiver(post_save, sender=Editorial)
+def refresh_publication_card(sender, instance, **kwargs):
+    cards.refresh([instance.pk])
+
+
+@receiver(post_save, sender=Publication)
+@receiver(post_save, sender=Article)
+@receiver(post_save, sender=Editorial)
+def queue_thumbnail_derivatives(sender, instance, update_fields=None, **kwargs):
+    thumbnails.queue_derivatives(instance, 'thumbnail', update_fields)
+
+
+@receiver(post_save, sender=PublicationAuthor)
+def refresh_card_for_author_row(sender, instance, **kwargs):
+    cards.refresh([instance.publication_id])
+
+
+@receiver(post_delete, sender=PublicationAuthor)
+def refresh_card_for_deleted_author_row(sender, instance, **kwargs):
+    # Once committed: the row may be deleted along with its publication, whose
+    # card would otherwise be written again before the publication is gone.
+    publication_id = instance.publication_id
+    transaction.on_commit(lambda: cards.refresh([publication_id]))
+
+
+@receiver(m2m_changed, sender=PublicationAuthor)
+def refresh_cards_for_authors(sender, instance, action, reverse, pk_set, **kwargs):
+    if reverse and action == 'pre_clear':
+        instance._card_publication_ids = set(
+            PublicationAuthor.objects.filter(user=instance.pk).values_list('publication_id', flat=True)
+        )
+        return
+    if action not in ('post_add', 'post_remove', 'post_clear'):
+        return
+
+    if not reverse:
+        cards.refresh([instance.pk])
+    elif action == 'post_clear':
+        cards.refresh(instance.__dict__.pop('_card_publication_ids', set()))
+    else:
+        cards.refresh(pk_set)
+
+
+@receiver(post_save, sender=User)
+@receiver(post_save, sender=Author)
+@receiver(post_save, sender=Editor)
+@receiver(post_save, sender=Moderator)
+@receiver(post_save, sender=Admin)
+@receiver(post_save, sender=Reader)
+@receiver(post_save, sender=Writer)
+def refresh_cards_for_user(sender, instance, created, update_fields=None, **kwargs):
+    """Cards copy their authors' names and pictures, so changing them rewrites those cards."""
+    if created:
+        return
+    if update_fields is not None and not AUTHOR_CARD_FIELDS & set(update_fields):
+        return
+    cards.refresh(PublicationAuthor.objects.filter(user=instance.pk).values_list('publication_id', flat=True))
+
+
+@receiver(post_save, sender=User)
+@receiver(post_save, sender=Author)
+@receiver(post_save, sender=Editor)
+@receiver(post_save, sender=Moderator)
+@receiver(post_save, sender=Admin)
+@receiver(post_save, sender=Reader)
+@receiver(post_save, sender=Writer)
+def queue_profile_img_derivatives(sender, instance, update_fields=None, **kwargs):
+    thumbnails.queue_derivatives(instance, 'profile_img', update_fields)
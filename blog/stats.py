@@ -0,0 +1,232 @@
+"""
+Publication counters kept in the PublicationStats and DailyPublicationCount rollups.
+
+``Publication.save`` and ``Publication.delete`` pass the before/after state of
+a row to :func:`apply_change` inside their transaction, so reading the
+counters costs a handful of rows instead of a scan of the publication table.
+Anything that writes publications without ``save()`` (``bulk_create``,
+``QuerySet.update``) must call :func:`apply_changes` itself or rebuild the
+rollup with ``manage.py rebuild_stats``.
+"""
+from collections import Counter, defaultdict, namedtuple
+
+from django.apps import apps
+from django.db import transaction
+from django.db.models import Count, F, Q, Sum
+from django.db.models.functions import TruncDate
+from django.utils import timezone
+
+State = namedtuple('State', 'publication_type published approved hidden day')
+
+TRACKED_FIELDS = ('publication_type', 'published', 'approved_by_id', 'hide', 'published_on')
+COUNTERS = ('total', 'published', 'approved', 'hidden', 'scheduled')
+
+
+def _models():
+    return (
+        apps.get_model('blog', 'Publication'),
+        apps.get_model('blog', 'PublicationStats'),
+        apps.get_model('blog', 'DailyPublicationCount'),
+    )
+
+
+def _day(value):
+    if value is None:
+        return None
+    if timezone.is_aware(value):
+        value = timezone.localtime(value)
+    return value.date()
+
+
+def is_tracked(instance):
+    deferred = instance.get_deferred_fields()
+    return not any(field in deferred for field in TRACKED_FIELDS)
+
+
+def get_state(instance):
+    return State(
+        instance.publication_type,
+        bool(instance.published),
+        instance.approved_by_id is not None,
+        bool(instance.hide),
+        _day(instance.published_on),
+    )
+
+
+def get_stored_state(pk):
+    Publication = _models()[0]
+    row = Publication.objects.filter(pk=pk).values(*TRACKED_FIELDS).first()
+    return None if row is None else get_row_state(row)
+
+
+def get_row_state(row):
+    """The state of a ``values()`` row holding ``TRACKED_FIELDS``."""
+    return State(
+        row['publication_type'],
+        row['published'],
+        row['approved_by_id'] is not None,
+        row['hide'],
+        _day(row['published_on']),
+    )
+
+
+def apply_change(previous, current):
+    """Move one publication from ``previous`` to ``current`` state; ``None`` means absent."""
+    apply_changes([(previous, current)])
+
+
+def apply_changes(changes):
+    """
+    Apply many ``(previous, current)`` moves at once, e.g. after a ``QuerySet.update``.
+
+    The deltas are summed first, so each counter row is written once however
+    many publications moved.
+    """
+    _, PublicationStats, DailyPublicationCount = _models()
+
+    counters = defaultdict(Counter)
+    days = Counter()
+    for previous, current in changes:
+        if previous == current:
+            continue
+        for state, sign in ((previous, -1), (current, 1)):
+            if state is None:
+                continue
+            deltas = counters[state.publication_type]
+            deltas['total'] += sign
+            deltas['published'] += sign if state.published else 0
+            deltas['approved'] += sign if state.approved else 0
+            deltas['hidden'] += sign if state.hidden else 0
+            # Unpublished with a publish date, as blog.scheduler and articles/scheduled see it.
+            deltas['scheduled'] += sign if not state.published and state.day is not None else 0
+            if state.day is not None:
+                days[state.publication_type, state.day] += sign
+
+    for publication_type, deltas in counters.items():
+        updates = {name: F(name) + delta for name, delta in deltas.items() if delta}
+        if updates:
+            PublicationStats.objects.get_or_create(publication_type=publication_type)
+            PublicationStats.objects.filter(publication_type=publication_type).update(**updates)
+
+    for (publication_type, day), delta in days.items():
+        if delta:
+            DailyPublicationCount.objects.get_or_create(publication_type=publication_type, day=day)
+            DailyPublicationCount.objects.filter(publication_type=publication_type, day=day).update(
+                count=F('count') + delta
+            )
+
+
+def get_counts(publication_type, now=None):
+    """The StatsView article counters, read from the rollup."""
+    _, PublicationStats, DailyPublicationCount = _models()
+    now = now or timezone.now()
+    today = _day(now)
+    month_start = today.replace(day=1)
+    year_start = today.replace(month=1, day=1)
+
+    row = PublicationStats.objects.filter(publication_type=publication_type).first()
+    totals = {name: getattr(row, name) if row else 0 for name in COUNTERS}
+
+    days = DailyPublicationCount.objects.filter(publication_type=publication_type, day__gte=year_start).aggregate(
+        today=Sum('count', filter=Q(day=today)),
+        month=Sum('count', filter=Q(day__gte=month_start)),
+        year=Sum('count'),
+    )
+
+    unapproved = totals['total'] - totals['approved']
+    return {
+        "total_articles": totals['total'],
+        "total_published": totals['published'],
+        "total_scheduled": totals['scheduled'],
+        "asking_approval": unapproved,
+        "total_approved": totals['approved'],
+        "total_unapproved": unapproved,
+        "today_published": days['today'] or 0,
+        "this_month_published": days['month'] or 0,
+        "this_year_published": days['year'] or 0,
+    }
+
+
+def count_published_between(publication_type, start, end):
+    """Publications whose ``published_on`` date falls in ``[start, end)``."""
+    DailyPublicationCount = _models()[2]
+    total = DailyPublicationCount.objects.filter(
+        publication_type=publication_type, day__gte=start, day__lt=end
+    ).aggregate(total=Sum('count'))['total']
+    return total or 0
+
+
+def compute_rollup():
+    """Recount every rollup row from the publication table."""
+    Publication = _models()[0]
+    totals = {
+        row.pop('publication_type'): row
+        for row in Publication.objects.values('publication_type').annotate(
+            total=Count('id'),
+            # Ahead of ``published``, whose annotation would shadow the field.
+            scheduled=Count('id', filter=Q(published=False, published_on__isnull=False)),
+            published=Count('id', filter=Q(published=True)),
+            approved=Count('id', filter=Q(approved_by__isnull=False)),
+            hidden=Count('id', filter=Q(hide=True)),
+        ).order_by()
+    }
+    days = {
+        (row['publication_type'], row['day']): row['count']
+        for row in Publication.objects.filter(published_on__isnull=False)
+        .annotate(day=TruncDate('published_on'))
+        .values('publication_type', 'day')
+        .annotate(count=Count('id'))
+        .order_by()
+    }
+    return totals, days
+
+
+def stored_rollup():
+    _, PublicationStats, DailyPublicationCount = _models()
+    totals = {
+        row.pop('publication_type'): row
+        for row in PublicationStats.objects.values('publication_type', *COUNTERS)
+    }
+    days = {
+        (row['publication_type'], row['day']): row['count']
+        for row in DailyPublicationCount.objects.values('publication_type', 'day', 'count')
+    }
+    return totals, days
+
+
+def find_drift():
+    """Return ``(key, stored, actual)`` for every rollup value that disagrees with a recount."""
+    drift = []
+    actual_totals, actual_days = compute_rollup()
+    stored_totals, stored_days = stored_rollup()
+
+    zero = dict.fromkeys(COUNTERS, 0)
+    for publication_type in sorted(set(actual_totals) | set(stored_totals)):
+        stored = stored_totals.get(publication_type, zero)
+        actual = actual_totals.get(publication_type, zero)
+        for name in COUNTERS:
+            if stored[name] != actual[name]:
+                drift.append(((publication_type, name), stored[name], actual[name]))
+
+    for key in sorted(set(actual_days) | set(stored_days)):
+        stored, actual = stored_days.get(key, 0), actual_days.get(key, 0)
+        if stored != actual:
+            drift.append((key, stored, actual))
+    return drift
+
+
+def rebuild():
+    """Replace the rollup with a recount."""
+    _, PublicationStats, DailyPublicationCount = _models()
+    with transaction.atomic():
+        totals, days = compute_rollup()
+        PublicationStats.objects.all().delete()
+        DailyPublicationCount.objects.all().delete()
+        PublicationStats.objects.bulk_create(
+            PublicationStats(publication_type=publication_type, **counters)
+            for publication_type, counters in totals.items()
+        )
+        DailyPublicationCount.objects.bulk_create(
+            DailyPublicationCount(publication_type=publication_type, day=day, count=count)
+            for (publication_type, day), count in days.items()
+        )
@@ -1,8 +1,52 @@
+import hashlib
 import os
 from urllib.parse import urljoin
 
 from django.conf import settings
+from django.core.files import File
 from django.core.files.storage import FileSystemStorage
+from django.db import IntegrityError, transaction
+from django.db.models import BigIntegerField, Count, ExpressionWrapper, F, Sum
+from django.db.models.functions import Coalesce
+from dropbox.exceptions import ApiError
+from storages.base import BaseStorage
+from storages.backends.dropbox import DropboxStorage
+
+from blog.models import MediaBlob, SharedLink
+from crowpro.lru import LRUCache
+
+# Process-wide front for the SharedLink table, shared by every storage instance.
+shared_links = LRUCache(maxsize=settings.DROPBOX_SHARED_LINK_CACHE_SIZE)
+
+
+def hash_content(content):
+    """``(sha256, size)`` of ``content`` read chunk by chunk, or None if it cannot be rewound."""
+    if not content.seekable():
+        return None
+    digest = hashlib.sha256()
+    size = 0
+    for chunk in content.chunks():
+        digest.update(chunk)
+        size += len(chunk)
+    content.seek(0)
+    return digest.hexdigest(), size
+
+
+def get_dedup_stats():
+    """
+    How much storage deduplication saves: ``ratio`` is saves per stored file and
+    ``saved_bytes`` what the duplicate saves would have stored.
+    """
+    totals = MediaBlob.objects.aggregate(
+        files=Coalesce(Count('pk'), 0),
+        saves=Coalesce(Sum('references'), 0),
+        stored_bytes=Coalesce(Sum('size'), 0),
+        saved_bytes=Coalesce(Sum(ExpressionWrapper(
+            F('size') * (F('references') - 1), output_field=BigIntegerField(),
+        )), 0),
+    )
+    totals['ratio'] = round(totals['saves'] / totals['files'], 2) if totals['files'] else 1.0
+    return totals
 
 
 class CustomStorage(FileSystemStorage):
@@ -10,3 +54,104 @@ class CustomStorage(FileSystemStorage):
     location = os.path.join(settings.MEDIA_ROOT, "uploads")
     base_url = urljoin(settings.MEDIA_URL, "uploads/")
     full_url = urljoin("https://www.dropbox.com/home/Apps/crowpro/", base_url)
+
+
+class ModifiedDropboxStorage(DropboxStorage):
+    """
+    Dropbox storage that serves permanent shared links instead of temporary ones.
+
+    Links are created once, when the file is saved, and kept in the SharedLink
+    table with an in-process LRU in front of it, so ``url()`` never calls Dropbox
+    on the hot path. Pass ``client`` to run against a fake Dropbox client.
+
+    Files are stored once per content: ``save`` hashes the file as it reads it
+    and, when a MediaBlob has the same hash, returns that file's name without
+    uploading, so its link is reused too. ``delete`` only removes the file once
+    the last save that resolved to it is deleted.
+    """
+
+    def __init__(self, oauth2_access_token=None, client=None, **settings):
+        if client is None:
+            super().__init__(oauth2_access_token, **settings)
+        else:
+            BaseStorage.__init__(self, **settings)
+            self.client = client
+
+    def url(self, name):
+        link = shared_links.get(name)
+        if link is not None:
+            return link
+
+        link = SharedLink.objects.filter(name=name).values_list('url', flat=True).first()
+        if link is None:
+            link = self._store_shared_link(name)
+        shared_links.set(name, link)
+        return link
+
+    def save(self, name, content, max_length=None):
+        if name is None:
+            name = content.name
+        if not hasattr(content, 'chunks'):
+            content = File(content, name)
+        digest = hash_content(content)
+        if digest is None:
+            return super().save(name, content, max_length=max_length)
+
+        sha256, size = digest
+        stored = self._reuse_blob(sha256)
+        if stored is not None:
+            return stored
+        name = super().save(name, content, max_length=max_length)
+        try:
+            with transaction.atomic():
+                MediaBlob.objects.create(sha256=sha256, name=name, size=size)
+        except IntegrityError:
+            # Another worker stored the same bytes first; keep theirs.
+            stored = self._reuse_blob(sha256)
+            if stored is None:
+                raise
+            self._delete_file(name)
+            return stored
+        return name
+
+    def _reuse_blob(self, sha256):
+        if not MediaBlob.objects.filter(sha256=sha256).update(references=F('references') + 1):
+            return None
+        return MediaBlob.objects.filter(sha256=sha256).values_list('name', flat=True).first()
+
+    def _save(self, name, content):
+        name = super()._save(name, content)
+        shared_links.set(name, self._store_shared_link(name))
+        return name
+
+    def delete(self, name):
+        # Other saves of the same bytes still use the file.
+        if MediaBlob.objects.filter(name=name, references__gt=1).update(references=F('references') - 1):
+            return
+        self._delete_file(name)
+        MediaBlob.objects.filter(name=name).delete()
+
+    def _delete_file(self, name):
+        super().delete(name)
+        SharedLink.objects.filter(name=name).delete()
+        shared_links.delete(name)
+
+    def _store_shared_link(self, name):
+        link = self._create_shared_link(name)
+        try:
+            SharedLink.objects.update_or_create(name=name, defaults={'url': link})
+        except IntegrityError:
+            # Another worker stored the same file's link first.
+            pass
+        return link
+
+    def _create_shared_link(self, name):
+        # Get or create a shared link for the file to avoid temporary URL expiration
+        full_path = self._full_path(name)
+        try:
+            shared_link_metadata = self.client.sharing_create_shared_link_with_settings(full_path)
+        except ApiError as e:
+            if not e.error.is_shared_link_already_exists():
+                raise
+            shared_link_metadata = self.client.sharing_list_shared_links(full_path, direct_only=True).links[0]
+        return shared_link_metadata.url.replace('dl=0', 'dl=1')
@@ -0,0 +1,102 @@
+"""
+Plain-text summaries of publication bodies.
+
+``Publication.save`` runs :func:`summarize` whenever ``content`` is assigned and
+stores the result on the publication row, so lists can show a teaser without
+loading the body. ``manage.py backfill_summaries`` fills in rows saved before
+the summary columns existed.
+"""
+import math
+from html.parser import HTMLParser
+
+from django.db import transaction
+from django.utils.text import Truncator
+
+EXCERPT_WORDS = 40
+WORDS_PER_MINUTE = 200
+SUMMARY_FIELDS = ('excerpt', 'word_count', 'reading_time', 'first_image_url')
+
+# Elements whose text is never shown to readers.
+SKIPPED_TAGS = {'script', 'style', 'template'}
+# Elements that end a run of text; their boundaries separate words.
+BLOCK_TAGS = {
+    'address', 'article', 'aside', 'blockquote', 'br', 'dd', 'div', 'dl', 'dt', 'figcaption', 'figure',
+    'footer', 'h1', 'h2', 'h3', 'h4', 'h5', 'h6', 'header', 'hr', 'li', 'ol', 'p', 'pre', 'section',
+    'table', 'td', 'th', 'tr', 'ul',
+}
+
+
+class TextExtractor(HTMLParser):
+    """Collects the visible text and the first image source of an HTML fragment."""
+
+    def __init__(self):
+        super().__init__(convert_charrefs=True)
+        self.parts = []
+        self.first_image_url = ''
+        self.skipping = 0
+
+    def handle_starttag(self, tag, attrs):
+        if tag in SKIPPED_TAGS:
+            self.skipping += 1
+        elif tag in BLOCK_TAGS:
+            self.parts.append(' ')
+        elif tag == 'img' and not self.first_image_url:
+            self.first_image_url = dict(attrs).get('src') or ''
+
+    def handle_endtag(self, tag):
+        if tag in SKIPPED_TAGS:
+            self.skipping = max(self.skipping - 1, 0)
+        elif tag in BLOCK_TAGS:
+            self.parts.append(' ')
+
+    def handle_data(self, data):
+        if not self.skipping:
+            self.parts.append(data)
+
+    @property
+    def words(self):
+        return ''.join(self.parts).split()
+
+
+def summarize(html):
+    """The summary columns of a publication whose body is ``html``."""
+    parser = TextExtractor()
+    parser.feed(html or '')
+    parser.close()
+    words = parser.words
+    return {
+        'excerpt': Truncator(' '.join(words)).words(EXCERPT_WORDS),
+        'word_count': len(words),
+        'reading_time': math.ceil(len(words) / WORDS_PER_MINUTE),
+        'first_image_url': parser.first_image_url[:1024],
+    }
+
+
+def backfill(batch_size=500, only_missing=False):
+    """
+    Recompute the stored summaries of existing publications, ``batch_size`` at a time.
+
+    Each batch is written with one ``bulk_update`` and refreshes its cards;
+    ``updated_on`` is left alone because the content did not change.
+    Returns the number of publications updated.
+    """
+    from blog import cards
+    from blog.models import Publication
+
+    queryset = Publication.objects.select_related('body').order_by('pk')
+    if only_missing:
+        queryset = queryset.filter(word_count=0)
+
+    count, last_pk = 0, None
+    while True:
+        batch_queryset = queryset if last_pk is None else queryset.filter(pk__gt=last_pk)
+        batch = list(batch_queryset[:batch_size])
+        if not batch:
+            return count
+        with transaction.atomic():
+            for publication in batch:
+                publication.set_summary(publication.content)
+            Publication.objects.bulk_update(batch, SUMMARY_FIELDS)
+            cards.refresh(publication.pk for publication in batch)
+        count += len(batch)
+        last_pk = batch[-1].pk
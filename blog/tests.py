@@ -1,3 +1,552 @@
-from django.test import TestCase
+import hashlib
+import os
+import tempfile
+from datetime import timedelta
+from io import BytesIO, StringIO
+from unittest.mock import patch
 
-# Create your tests here.
+from django.conf import settings
+from django.core.files.base import ContentFile
+from django.core.files.storage import default_storage
+from django.core.files.storage import InMemoryStorage
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.core.management import call_command
+from django.test import TestCase, override_settings
+from django.utils import timezone
+from PIL import Image
+from rest_framework.test import APIClient
+
+from tasks import queue
+from tasks.models import Task
+from users.models import User, Writer
+from . import scheduler, stats, thumbnails, uploads
+from .fake_dropbox import FakeDropboxClient
+from .forms import ArticleForm
+from .models import (Article, Editorial, MediaBlob, Publication, PublicationAuthor, PublicationBody, PublicationCard,
+                     SharedLink, Upload)
+from .storage import ModifiedDropboxStorage, get_dedup_stats, shared_links
+from .summary import summarize
+
+
+class SharedLinkCacheTests(TestCase):
+    def setUp(self):
+        shared_links.clear()
+        self.client = FakeDropboxClient()
+        self.storage = ModifiedDropboxStorage(client=self.client)
+
+    def test_link_is_created_on_upload(self):
+        name = self.storage.save('images/logo.png', ContentFile(b'png'))
+        self.assertEqual(self.client.calls['sharing_create_shared_link_with_settings'], 1)
+        self.assertTrue(SharedLink.objects.filter(name=name).exists())
+        self.assertTrue(self.storage.url(name).endswith('/images/logo.png?dl=1'))
+
+    def test_url_does_not_call_dropbox_after_upload(self):
+        name = self.storage.save('images/logo.png', ContentFile(b'png'))
+        self.client.calls.clear()
+        with self.assertNumQueries(0):
+            for _ in range(50):
+                self.storage.url(name)
+        self.assertEqual(sum(self.client.calls.values()), 0)
+
+    def test_url_falls_back_to_table_then_dropbox(self):
+        name = self.storage.save('images/logo.png', ContentFile(b'png'))
+        shared_links.clear()
+        with self.assertNumQueries(1):
+            url = self.storage.url(name)
+        self.assertEqual(url, SharedLink.objects.get(name=name).url)
+
+        SharedLink.objects.all().delete()
+        shared_links.clear()
+        self.assertEqual(self.storage.url(name), url)
+        self.assertEqual(self.client.calls['sharing_list_shared_links'], 1)
+
+    def test_delete_invalidates_link(self):
+        name = self.storage.save('images/logo.png', ContentFile(b'png'))
+        self.storage.delete(name)
+        self.assertFalse(SharedLink.objects.filter(name=name).exists())
+        self.assertNotIn(name, shared_links)
+
+
+class MediaDedupTests(TestCase):
+    def setUp(self):
+        shared_links.clear()
+        self.client = FakeDropboxClient()
+        self.storage = ModifiedDropboxStorage(client=self.client)
+
+    def test_duplicate_reuses_stored_file_and_link(self):
+        name = self.storage.save('images/logo.png', ContentFile(b'png'))
+        url = self.storage.url(name)
+        self.client.calls.clear()
+
+        self.assertEqual(self.storage.save('images/logo-copy.png', ContentFile(b'png')), name)
+        self.assertEqual(self.storage.url(name), url)
+        self.assertEqual(sum(self.client.calls.values()), 0)
+        self.assertEqual(MediaBlob.objects.get().references, 2)
+
+        other = self.storage.save('images/logo.png', ContentFile(b'gif'))
+        self.assertNotEqual(other, name)
+        self.assertEqual(self.client.calls['files_upload'], 1)
+
+    def test_file_is_deleted_with_its_last_reference(self):
+        name = self.storage.save('images/logo.png', ContentFile(b'png'))
+        self.storage.save('images/logo.png', ContentFile(b'png'))
+        self.storage.delete(name)
+        self.assertTrue(self.storage.exists(name))
+        self.storage.delete(name)
+        self.assertFalse(self.storage.exists(name))
+        self.assertFalse(MediaBlob.objects.exists())
+
+    def test_lost_race_keeps_the_first_copy(self):
+        name = self.storage.save('images/logo.png', ContentFile(b'png'))
+        reuse = self.storage._reuse_blob
+        lookups = []
+
+        def racing_reuse(sha256):
+            # The first lookup misses, as if the other worker had not committed yet.
+            lookups.append(sha256)
+            return None if len(lookups) == 1 else reuse(sha256)
+
+        with patch.object(self.storage, '_reuse_blob', racing_reuse):
+            self.assertEqual(self.storage.save('images/other.png', ContentFile(b'png')), name)
+        self.assertEqual(list(self.client.files), [f'/{name}'])
+        self.assertEqual(MediaBlob.objects.get().references, 2)
+
+    def test_dedup_stats(self):
+        self.assertEqual(get_dedup_stats()['ratio'], 1.0)
+        for _ in range(3):
+            self.storage.save('images/logo.png', ContentFile(b'x' * 100))
+        self.storage.save('images/icon.png', ContentFile(b'y' * 10))
+        self.assertEqual(get_dedup_stats(), {
+            'files': 2, 'saves': 4, 'stored_bytes': 110, 'saved_bytes': 200, 'ratio': 2.0,
+        })
+
+
+class PublicationCardTests(TestCase):
+    def setUp(self):
+        self.author = User.objects.create_user(
+            email='author@example.com', password='password', role=User.Role.AUTHOR,
+            first_name='Ada', last_name='Lovelace',
+        )
+        self.article = Article.objects.create(
+            title='Engines', content='<p>The <b>analytical</b> engine &amp; its notes.</p>',
+            published=True, published_on=timezone.now(), created_by=self.author,
+        )
+        self.article.authors.set([self.author.id])
+
+    def card(self):
+        return PublicationCard.objects.get(publication=self.article)
+
+    def test_card_follows_publication(self):
+        card = self.card()
+        self.assertEqual(card.status, PublicationCard.Status.PUBLISHED)
+        self.assertEqual(card.excerpt, 'The analytical engine & its notes.')
+        self.assertEqual([author['full_name'] for author in card.authors], ['Ada Lovelace'])
+
+        self.article.hide = True
+        self.article.title = 'Engines, revised'
+        self.article.save()
+        card = self.card()
+        self.assertEqual(card.status, PublicationCard.Status.HIDDEN)
+        self.assertEqual(card.title, 'Engines, revised')
+
+        self.article.delete()
+        self.assertFalse(PublicationCard.objects.exists())
+
+    def test_card_follows_authors(self):
+        coauthor = User.objects.create_user(
+            email='coauthor@example.com', password='password', role=User.Role.AUTHOR,
+            first_name='Charles', last_name='Babbage',
+        )
+        self.article.authors.add(coauthor.id)
+        self.assertEqual([author['id'] for author in self.card().authors], [self.author.id, coauthor.id])
+
+        coauthor.last_name = 'B.'
+        coauthor.save(update_fields=['last_name'])
+        self.assertEqual(self.card().authors[1]['full_name'], 'Charles B.')
+
+        Writer.objects.get(pk=coauthor.pk).publications.clear()
+        self.assertEqual([author['id'] for author in self.card().authors], [self.author.id])
+
+    def test_deleted_author_rows_leave_the_card(self):
+        coauthor = User.objects.create_user(
+            email='coauthor@example.com', password='password', role=User.Role.AUTHOR,
+            first_name='Charles', last_name='Babbage',
+        )
+        self.article.authors.add(coauthor.id)
+        with self.captureOnCommitCallbacks(execute=True):
+            PublicationAuthor.objects.get(publication=self.article, user=self.author).delete()
+        self.assertEqual([author['id'] for author in self.card().authors], [coauthor.id])
+
+        # Deleting the user cascades to their author rows.
+        with self.captureOnCommitCallbacks(execute=True):
+            coauthor.delete()
+        self.assertEqual(self.card().authors, [])
+
+        # Deleting the publication cascades to its author rows too.
+        self.article.authors.add(self.author.id)
+        with self.captureOnCommitCallbacks(execute=True):
+            self.article.delete()
+        self.assertFalse(PublicationCard.objects.exists())
+
+    def test_rebuild_command(self):
+        Editorial.objects.create(title='Draft', content='', created_by=self.author)
+        PublicationCard.objects.all().delete()
+        out = StringIO()
+        call_command('rebuild_cards', batch_size=1, stdout=out)
+        self.assertIn('Rebuilt 2 publication card(s).', out.getvalue())
+        self.assertEqual(
+            sorted(PublicationCard.objects.values_list('status', flat=True)),
+            [PublicationCard.Status.DRAFT, PublicationCard.Status.PUBLISHED],
+        )
+
+    def test_feed_reads_cards(self):
+        Editorial.objects.create(title='Draft', content='', created_by=self.author)
+        response = APIClient().get('/api/posts/')
+        self.assertEqual(response.status_code, 200)
+        [entry] = response.data['results']
+        self.assertEqual(entry['id'], self.article.id)
+        self.assertEqual(entry['slug'], self.article.slug)
+        self.assertEqual(entry['authors'][0]['full_name'], 'Ada Lovelace')
+        self.assertNotIn('content', entry)
+
+    def test_feed_renders_stored_names_like_articles(self):
+        self.assertEqual(self.card().authors[0]['profile_img'], 'placeholder.png')
+        client = APIClient()
+        [entry] = client.get('/api/posts/').data['results']
+        [article] = client.get('/api/articles/').data['results']
+        self.assertEqual(entry['authors'], article['authors'])
+        self.assertEqual(entry['authors'][0]['profile_img'], 'http://testserver/media/placeholder.png')
+
+
+class PublicationBodyTests(TestCase):
+    def setUp(self):
+        self.author = User.objects.create_user(
+            email='author@example.com', password='password', role=User.Role.AUTHOR,
+            first_name='Ada', last_name='Lovelace',
+        )
+        self.article = Article.objects.create(title='Engines', content='<p>Notes</p>', created_by=self.author)
+
+    def test_content_is_stored_in_body(self):
+        self.assertEqual(PublicationBody.objects.get(publication=self.article).content, '<p>Notes</p>')
+        self.article.content = '<p>More notes</p>'
+        self.article.save()
+        self.assertEqual(Article.objects.get(pk=self.article.pk).content, '<p>More notes</p>')
+
+    def test_publication_queries_skip_content(self):
+        article = Article.objects.get(pk=self.article.pk)
+        with self.assertNumQueries(1):
+            self.assertEqual(article.content, '<p>Notes</p>')
+        article = Article.objects.select_related('body').get(pk=self.article.pk)
+        with self.assertNumQueries(0):
+            self.assertEqual(article.content, '<p>Notes</p>')
+
+    def test_form_edits_body(self):
+        form = ArticleForm(instance=Article.objects.get(pk=self.article.pk))
+        self.assertEqual(form.initial['content'], '<p>Notes</p>')
+
+        form = ArticleForm({'title': 'Engines', 'content': '<p>Revised</p>'}, instance=self.article)
+        self.assertTrue(form.is_valid(), form.errors)
+        form.save()
+        self.assertEqual(PublicationBody.objects.get(publication=self.article).content, '<p>Revised</p>')
+        self.assertIn('Revised', PublicationCard.objects.get(publication=self.article).excerpt)
+
+
+class PublicationSummaryTests(TestCase):
+    def setUp(self):
+        self.author = User.objects.create_user(
+            email='author@example.com', password='password', role=User.Role.AUTHOR,
+            first_name='Ada', last_name='Lovelace',
+        )
+
+    def test_summarize(self):
+        html = (
+            '<h2>Notes</h2><p>On the <b>analytical</b>&nbsp;engine.</p><script>var x = 1;</script>'
+            '<figure><img src="/media/images/engine.png"><figcaption>The engine</figcaption></figure>'
+            '<img src="/media/images/second.png">'
+        )
+        self.assertEqual(summarize(html), {
+            'excerpt': 'Notes On the analytical engine. The engine',
+            'word_count': 7,
+            'reading_time': 1,
+            'first_image_url': '/media/images/engine.png',
+        })
+        self.assertEqual(summarize('')['reading_time'], 0)
+        self.assertEqual(summarize('<p>word</p>' * 401)['reading_time'], 3)
+        self.assertTrue(summarize('<p>word</p>' * 100)['excerpt'].endswith('word…'))
+
+    def test_summary_follows_content(self):
+        article = Article.objects.create(title='Engines', content='<p>One two</p>', created_by=self.author)
+        self.assertEqual((article.excerpt, article.word_count), ('One two', 2))
+
+        article.content = '<p>One two three</p><img src="/a.png">'
+        article.save(update_fields=['title'])
+        article = Publication.objects.get(pk=article.pk)
+        self.assertEqual((article.word_count, article.first_image_url), (3, '/a.png'))
+
+    def test_backfill_command(self):
+        article = Article.objects.create(title='Engines', content='<p>One two</p>', created_by=self.author)
+        Publication.objects.filter(pk=article.pk).update(excerpt='', word_count=0)
+        PublicationCard.objects.filter(publication=article).update(excerpt='')
+
+        out = StringIO()
+        call_command('backfill_summaries', batch_size=1, missing_only=True, stdout=out)
+        self.assertIn('Updated the summaries of 1 publication(s).', out.getvalue())
+        self.assertEqual(Publication.objects.get(pk=article.pk).word_count, 2)
+        self.assertEqual(PublicationCard.objects.get(publication=article).excerpt, 'One two')
+
+
+class SchedulerTests(TestCase):
+    def setUp(self):
+        self.author = User.objects.create_user(email='author@example.com', password='password', role=User.Role.AUTHOR,
+                                               first_name='Author', last_name='User')
+        self.editor = User.objects.create_user(email='editor@example.com', password='password', role=User.Role.EDITOR,
+                                               first_name='Editor', last_name='User')
+        now = timezone.now()
+        self.due = [self.create(f"Due {i}", now - timedelta(minutes=i)) for i in range(3)]
+        self.future = self.create("Future", now + timedelta(hours=1))
+        self.unapproved = self.create("Unapproved", now - timedelta(minutes=1), approved_by=None)
+        self.hidden = self.create("Hidden", now - timedelta(minutes=1), hide=True)
+
+    def create(self, title, published_on, **kwargs):
+        kwargs.setdefault('approved_by', self.editor)
+        return Article.objects.create(title=title, content='<p>Body</p>', created_by=self.author,
+                                      published_on=published_on, **kwargs)
+
+    def published_titles(self):
+        return set(Publication.objects.filter(published=True).values_list('title', flat=True))
+
+    def test_publishes_due_approved_publications_in_batches(self):
+        self.assertEqual(scheduler.publish_due(batch_size=2), 3)
+        self.assertEqual(self.published_titles(), {"Due 0", "Due 1", "Due 2"})
+        self.assertEqual(stats.find_drift(), [])
+        self.assertEqual(PublicationCard.objects.get(pk=self.due[0].pk).status, PublicationCard.Status.PUBLISHED)
+
+        self.due[0].refresh_from_db()
+        self.assertLess(self.due[0].published_on, timezone.now())
+        self.assertEqual(scheduler.publish_due(), 0)
+
+    def test_publishes_future_publications_when_due(self):
+        scheduler.publish_due()
+        scheduler.publish_due(now=timezone.now() + timedelta(hours=2))
+        self.assertIn("Future", self.published_titles())
+        self.assertNotIn("Unapproved", self.published_titles())
+        self.assertNotIn("Hidden", self.published_titles())
+
+    def test_editorials_need_no_approval(self):
+        Editorial.objects.create(title="Editorial", content='<p>Body</p>', created_by=self.editor,
+                                 publication_type=Publication.PublicationType.Editorial,
+                                 published_on=timezone.now() - timedelta(minutes=1))
+        self.assertEqual(scheduler.publish_due(), 4)
+        self.assertIn("Editorial", self.published_titles())
+        self.assertNotIn("Unapproved", self.published_titles())
+
+    def test_rows_published_by_another_worker_are_not_counted_twice(self):
+        # The first claim still holds "Due 0", which another worker has published since.
+        stale = Publication.objects.filter(pk=self.due[0].pk).values(*scheduler.READ_FIELDS).get()
+        self.due[0].published = True
+        self.due[0].save()
+        claim = scheduler.claim
+        claims = []
+
+        def racing_claim(now, batch_size):
+            claims.append(now)
+            rows = claim(now, batch_size)
+            return [stale, *rows] if len(claims) == 1 else rows
+
+        with patch.object(scheduler, 'claim', racing_claim):
+            self.assertEqual(scheduler.publish_due(), 2)
+        self.assertEqual(len(claims), 2)
+        self.assertEqual(self.published_titles(), {"Due 0", "Due 1", "Due 2"})
+        self.assertEqual(stats.find_drift(), [])
+
+    def test_command(self):
+        out = StringIO()
+        call_command('publish_scheduled', '--once', stdout=out)
+        self.assertIn("Published 3 scheduled publication(s).", out.getvalue())
+
+
+class UploadPipelineTests(TestCase):
+    def setUp(self):
+        staging = tempfile.TemporaryDirectory()
+        self.addCleanup(staging.cleanup)
+        self.enterContext(override_settings(UPLOADS={
+            'STAGING_DIR': staging.name, 'STORAGE': 'django.core.files.storage.InMemoryStorage', 'QUEUE': 'default',
+        }))
+        self.storage = InMemoryStorage()
+        self.enterContext(patch.object(uploads, 'get_storage', return_value=self.storage))
+        self.editor = User.objects.create_user(email='editor@example.com', password='password', role=User.Role.EDITOR,
+                                               first_name='Eve', last_name='Editor')
+        self.client.force_login(self.editor)
+        self.png = make_image(4, 4).read()
+
+    def upload(self, content=None, name='logo.png'):
+        response = self.client.post('/blog/upload/', {'upload': SimpleUploadedFile(name, content or self.png)})
+        self.assertTrue(response.json()['uploaded'])
+        return response.json()['url']
+
+    def test_upload_is_staged_without_touching_storage(self):
+        with patch.object(uploads, 'get_storage', side_effect=AssertionError("storage used on the request path")):
+            url = self.upload()
+        upload = Upload.objects.get()
+        self.assertEqual(url, f'http://testserver/blog/uploads/{upload.token}/')
+        self.assertEqual(upload.status, Upload.Status.STAGED)
+        self.assertEqual(upload.sha256, hashlib.sha256(self.png).hexdigest())
+        self.assertEqual((upload.size, upload.content_type), (len(self.png), 'image/png'))
+        self.assertEqual(upload.created_by, self.editor)
+        self.assertEqual(Task.objects.get().name, 'blog.uploads.push')
+
+        response = self.client.get(url)
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(b''.join(response.streaming_content), self.png)
+        self.assertEqual(response['Content-Type'], 'image/png')
+        self.assertEqual(response['Content-Disposition'], 'attachment; filename="logo.png"')
+        self.assertEqual(response['X-Content-Type-Options'], 'nosniff')
+
+    def test_push_swaps_in_the_stored_link(self):
+        url = self.upload()
+        self.assertEqual(queue.run_pending(), 1)
+        upload = Upload.objects.get()
+        self.assertEqual(upload.status, Upload.Status.STORED)
+        self.assertEqual(self.storage.open(upload.storage_name).read(), self.png)
+        self.assertFalse(os.path.exists(uploads.get_staged_path(upload)))
+
+        response = self.client.get(url)
+        self.assertEqual(response.status_code, 302)
+        self.assertEqual(response['Location'], upload.url)
+
+    def test_storage_outage_keeps_serving_the_staged_copy(self):
+        url = self.upload()
+        with patch.object(self.storage, 'save', side_effect=OSError("storage unavailable")):
+            self.assertEqual(queue.run_pending(), 1)
+        task = Task.objects.get()
+        self.assertEqual(task.status, Task.Status.QUEUED)
+        self.assertIn("storage unavailable", task.last_error)
+        self.assertEqual(b''.join(self.client.get(url).streaming_content), self.png)
+
+        Task.objects.update(run_at=timezone.now())
+        queue.run_pending()
+        self.assertEqual(Upload.objects.get().status, Upload.Status.STORED)
+        self.assertEqual(self.client.get(url).status_code, 302)
+
+    def test_unknown_upload(self):
+        self.assertEqual(self.client.get('/blog/uploads/missing/').status_code, 404)
+        self.assertFalse(self.client.post('/blog/upload/').json()['uploaded'])
+
+    def test_anonymous_uploads_are_refused(self):
+        self.client.logout()
+        response = self.client.post('/blog/upload/', {'upload': SimpleUploadedFile('logo.png', self.png)})
+        self.assertEqual(response.status_code, 403)
+        self.assertFalse(response.json()['uploaded'])
+        self.assertFalse(Upload.objects.exists())
+
+    def test_only_images_are_accepted(self):
+        for name, content in [
+            ('logo.png', b'<script>alert(1)</script>'),
+            ('logo.svg', b'<svg xmlns="http://www.w3.org/2000/svg" onload="alert(1)"/>'),
+            ('logo.bmp', make_image(4, 4, fmt='BMP').read()),
+        ]:
+            with self.subTest(name):
+                response = self.client.post('/blog/upload/', {'upload': SimpleUploadedFile(name, content)})
+                self.assertEqual(response.status_code, 400)
+                self.assertFalse(response.json()['uploaded'])
+        self.assertFalse(Upload.objects.exists())
+        self.assertEqual(os.listdir(settings.UPLOADS['STAGING_DIR']), [])
+
+    def test_type_comes_from_the_content(self):
+        self.upload(make_image(4, 4, fmt='JPEG').read(), name='page.html')
+        upload = Upload.objects.get()
+        self.assertEqual((upload.file_name, upload.content_type), ('page.jpg', 'image/jpeg'))
+
+
+def make_image(width, height, mode='RGB', fmt='PNG'):
+    buffer = BytesIO()
+    Image.new(mode, (width, height), 'red').save(buffer, fmt)
+    return ContentFile(buffer.getvalue())
+
+
+@override_settings(
+    STORAGES={
+        'default': {'BACKEND': 'django.core.files.storage.InMemoryStorage'},
+        'staticfiles': {'BACKEND': 'django.contrib.staticfiles.storage.StaticFilesStorage'},
+    },
+    THUMBNAILS={'WIDTHS': [320, 640, 1280], 'FORMATS': ['webp', 'jpeg'], 'QUALITY': 80, 'QUEUE': 'default'},
+)
+class ThumbnailTests(TestCase):
+    def setUp(self):
+        self.author = User.objects.create_user(email='author@example.com', password='password', role=User.Role.AUTHOR,
+                                               first_name='Author', last_name='User', profile_img='')
+        self.article = Article(title='Pictures', content='<p>Body</p>', created_by=self.author)
+        self.article.thumbnail.save('photo.png', make_image(800, 400), save=False)
+        self.article.save()
+
+    def test_derivatives_are_generated_by_a_task(self):
+        self.article.refresh_from_db()
+        self.assertEqual(self.article.thumbnail_derivatives, {'source': self.article.thumbnail.name, 'images': []})
+        self.assertEqual(Task.objects.get().name, 'blog.thumbnails.generate_publication_thumbnails')
+        # Saving again before the task ran doesn't queue it twice.
+        self.article.save()
+        self.assertEqual(Task.objects.count(), 1)
+
+        queue.run_pending()
+        self.article.refresh_from_db()
+        images = self.article.thumbnail_derivatives['images']
+        self.assertEqual([(image['width'], image['format']) for image in images],
+                         [(320, 'webp'), (320, 'jpeg'), (640, 'webp'), (640, 'jpeg')])
+        with default_storage.open(images[0]['name']) as f:
+            image = Image.open(f)
+            self.assertEqual((image.format, image.size), ('WEBP', (320, 160)))
+        self.assertEqual(images[1], {'width': 320, 'format': 'jpeg', 'name': 'images/photo.w320.jpg'})
+
+        card = PublicationCard.objects.get(publication=self.article)
+        self.assertEqual(card.thumbnail, 'images/photo.png')
+        self.assertEqual(card.thumbnail_derivatives, self.article.thumbnail_derivatives)
+        self.assertEqual(thumbnails.get_srcset(card.thumbnail_derivatives, default_storage), {
+            'webp': '/media/images/photo.w320.webp 320w, /media/images/photo.w640.webp 640w',
+            'jpeg': '/media/images/photo.w320.jpg 320w, /media/images/photo.w640.jpg 640w',
+        })
+        # Only names are stored, so the links follow the storage.
+        with override_settings(MEDIA_URL='https://cdn.example.com/media/'):
+            self.assertEqual(thumbnails.get_srcset(card.thumbnail_derivatives, default_storage)['webp'],
+                             'https://cdn.example.com/media/images/photo.w320.webp 320w, '
+                             'https://cdn.example.com/media/images/photo.w640.webp 640w')
+
+    def test_replaced_thumbnail_has_no_srcset_until_its_task_ran(self):
+        queue.run_pending()
+        self.article.refresh_from_db()
+        self.article.thumbnail.save('other.png', make_image(400, 400, mode='RGBA'), save=False)
+        self.article.save()
+        card = PublicationCard.objects.get(publication=self.article)
+        self.assertIsNone(thumbnails.get_srcset(card.thumbnail_derivatives, default_storage))
+
+        queue.run_pending()
+        self.article.refresh_from_db()
+        self.assertEqual(self.article.thumbnail_derivatives['source'], self.article.thumbnail.name)
+        self.assertEqual([image['width'] for image in self.article.thumbnail_derivatives['images']], [320, 320])
+        with default_storage.open('images/other.w320.jpg') as f:
+            self.assertEqual(Image.open(f).mode, 'RGB')
+
+    def test_profile_img_placeholder_and_unchanged_are_not_queued(self):
+        Task.objects.all().delete()
+        reader = User.objects.create_user(email='reader@example.com', password='password',
+                                          first_name='Reader', last_name='User')
+        self.assertEqual(reader.profile_img.name, 'placeholder.png')
+        self.assertFalse(Task.objects.exists())
+
+        # Loaded with a picture whose derivatives were never recorded.
+        User.objects.filter(pk=self.author.pk).update(profile_img='images/old.jpg')
+        author = Writer.objects.get(pk=self.author.pk)
+        author.first_name = 'Renamed'
+        author.save()
+        self.assertFalse(Task.objects.exists())
+
+        author.profile_img = 'images/new.jpg'
+        author.save()
+        author.save()
+        self.assertEqual(Task.objects.get().name, 'blog.thumbnails.generate_profile_img_derivatives')
+
+    def test_profile_img_derivatives(self):
+        self.author.profile_img.save('face.jpg', make_image(700, 700, fmt='JPEG'))
+        queue.run_pending()
+        self.author.refresh_from_db()
+        self.assertEqual([image['width'] for image in self.author.profile_img_derivatives['images']],
+                         [320, 320, 640, 640])
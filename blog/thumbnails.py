@@ -0,0 +1,162 @@
+"""
+Resized copies of publication thumbnails and profile pictures, for ``srcset``.
+
+Saving a publication or user whose image changed queues a task (see
+``blog.signals``), so Pillow never runs on the request path. The task reads the
+original from its storage and writes one derivative per width in
+``THUMBNAILS['WIDTHS']`` narrower than the original, in each of
+``THUMBNAILS['FORMATS']``, next to it: ``images/logo.png`` gets
+``images/logo.w320.webp``, ``images/logo.w320.jpg``, ...
+
+The derivatives are recorded on the row as ``{'source': name, 'images': [...]}``
+in ``<field>_derivatives``, each image as its width, format and storage name;
+URLs are resolved from the storage when a srcset is rendered, like the
+original's. They only describe the image while ``source`` is still its name;
+until the task has run for a new image, there is no srcset.
+"""
+import os
+from io import BytesIO
+
+from django.conf import settings
+from django.core.files.base import ContentFile
+from django.db import transaction
+from django.dispatch import Signal
+from django.utils import timezone
+from PIL import Image, ImageOps
+
+from blog import cards
+from blog.models import Publication
+from tasks import queue
+from users.cache import user_cache
+from users.models import User
+
+# Pillow format and file extension of each supported output format.
+FORMATS = {
+    'webp': ('WEBP', 'webp'),
+    'jpeg': ('JPEG', 'jpg'),
+}
+
+# Sent inside the task's transaction with ``pks``: the publications whose
+# derivatives were just recorded.
+thumbnails_generated = Signal()
+
+
+def get_current(name, derivatives):
+    """``derivatives`` if they were made from the image ``name``, otherwise an empty dict."""
+    if name and derivatives and derivatives.get('source') == name:
+        return derivatives
+    return {}
+
+
+def get_srcset(derivatives, storage, absolute_url=None):
+    """``{format: srcset}`` of recorded ``derivatives`` kept in ``storage``, or None if there are none."""
+    srcset = {}
+    for image in derivatives.get('images', ()):
+        url = storage.url(image['name'])
+        if absolute_url:
+            url = absolute_url(url)
+        srcset.setdefault(image['format'], []).append(f"{url} {image['width']}w")
+    return {fmt: ', '.join(entries) for fmt, entries in srcset.items()} or None
+
+
+def get_derivative_name(name, width, fmt):
+    root, _ = os.path.splitext(name)
+    return f'{root}.w{width}.{FORMATS[fmt][1]}'
+
+
+def render(image, width, fmt):
+    """``image`` scaled down to ``width`` pixels wide, encoded as ``fmt``."""
+    height = max(1, round(image.height * width / image.width))
+    resized = image.resize((width, height), Image.Resampling.LANCZOS)
+    if fmt == 'jpeg' and resized.mode == 'RGBA':
+        # JPEG has no alpha channel: flatten onto white.
+        background = Image.new('RGB', resized.size, 'white')
+        background.paste(resized, mask=resized.getchannel('A'))
+        resized = background
+    buffer = BytesIO()
+    resized.save(buffer, FORMATS[fmt][0], quality=settings.THUMBNAILS['QUALITY'])
+    return buffer.getvalue()
+
+
+def open_image(storage, name):
+    with storage.open(name, 'rb') as f:
+        image = Image.open(f)
+        image = ImageOps.exif_transpose(image)
+        image.load()
+    has_alpha = image.mode in ('RGBA', 'LA', 'PA') or 'transparency' in image.info
+    return image.convert('RGBA' if has_alpha else 'RGB')
+
+
+def generate(name, storage):
+    """
+    Write the derivatives of the image ``name`` kept in ``storage`` and return
+    them as recorded on the row. Derivatives already in storage are reused.
+    """
+    image = open_image(storage, name)
+    images = []
+    for width in sorted(width for width in settings.THUMBNAILS['WIDTHS'] if width < image.width):
+        for fmt in settings.THUMBNAILS['FORMATS']:
+            derivative = get_derivative_name(name, width, fmt)
+            if not storage.exists(derivative):
+                derivative = storage.save(derivative, ContentFile(render(image, width, fmt)))
+            images.append({'width': width, 'format': fmt, 'name': derivative})
+    return {'source': name, 'images': images}
+
+
+def record(model, pk, field, **values):
+    """Generate the derivatives of ``field`` on the ``model`` row ``pk``; returns whether they were recorded."""
+    name = model._base_manager.filter(pk=pk).values_list(field, flat=True).first()
+    if not name:
+        return False
+    derivatives = generate(name, model._meta.get_field(field).storage)
+    # The image may have been replaced meanwhile; the new one has its own task.
+    return bool(model._base_manager.filter(pk=pk, **{field: name}).update(
+        **{f'{field}_derivatives': derivatives}, **values,
+    ))
+
+
+def generate_publication_thumbnails(pk):
+    """Task: derivatives of a publication's thumbnail."""
+    with transaction.atomic():
+        if record(Publication, pk, 'thumbnail', updated_on=timezone.now()):
+            # QuerySet.update skips Publication.save and its signals.
+            cards.refresh([pk])
+            thumbnails_generated.send(sender=Publication, pks=[pk])
+
+
+def generate_profile_img_derivatives(pk):
+    """Task: derivatives of a user's profile picture."""
+    with transaction.atomic():
+        if record(User, pk, 'profile_img'):
+            # Like users.signals does on save, so authenticated requests see them.
+            token_version = User._base_manager.filter(pk=pk).values_list('token_version', flat=True).first()
+            transaction.on_commit(lambda: user_cache.invalidate(pk, token_version))
+
+
+TASKS = {
+    'thumbnail': generate_publication_thumbnails,
+    'profile_img': generate_profile_img_derivatives,
+}
+
+
+def queue_derivatives(instance, field, update_fields=None):
+    """
+    Queue the derivatives of ``instance``'s image in ``field`` unless they are
+    already there or queued, the image is the field's default, or it is the one
+    the row was loaded with, which models record as ``_loaded_<field>``.
+    """
+    if update_fields is not None and field not in update_fields:
+        return
+    name = getattr(instance, field).name
+    derivatives_field = f'{field}_derivatives'
+    if not name or name == instance._meta.get_field(field).default:
+        return
+    if name == getattr(instance, f'_loaded_{field}', None):
+        return
+    if getattr(instance, derivatives_field).get('source') == name:
+        return
+    # Recorded with no images, so saving again before the task runs doesn't queue it twice.
+    pending = {'source': name, 'images': []}
+    type(instance)._base_manager.filter(pk=instance.pk).update(**{derivatives_field: pending})
+    setattr(instance, derivatives_field, pending)
+    queue.enqueue(TASKS[field], args=[instance.pk], queue=settings.THUMBNAILS['QUEUE'])
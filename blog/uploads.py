@@ -0,0 +1,131 @@
+"""
+Editor uploads, answered from local disk and pushed to storage in the background.
+
+:func:`stage` streams the request's file into ``UPLOADS['STAGING_DIR']`` while
+hashing it, records an :class:`~blog.models.Upload` and queues :func:`push`,
+all without talking to storage. The editor gets the upload's own URL,
+``blog/uploads/<token>/``, which serves the staged copy until the task has
+stored the file and recorded its link, and redirects to that link from then on.
+
+Only images are accepted: :func:`get_image_type` reads the file with Pillow and
+refuses anything outside ``IMAGE_FORMATS``, and the upload's content type and
+extension come from what was read, never from the name the client sent.
+
+While storage is unavailable ``push`` fails and the task queue retries it with
+backoff; the staged copy is kept, and served, until a push succeeds.
+"""
+import hashlib
+import mimetypes
+import os
+import tempfile
+from uuid import uuid4
+
+from django.conf import settings
+from django.core.files import File
+from django.db import transaction
+from django.urls import reverse
+from django.utils import timezone
+from django.utils.module_loading import import_string
+from PIL import Image
+
+from blog.models import Upload
+from tasks import queue
+
+UPLOAD_PREFIX = 'images/'
+# Pillow formats editors may upload.
+IMAGE_FORMATS = ['GIF', 'JPEG', 'PNG', 'WEBP']
+
+
+class NotAnImage(ValueError):
+    pass
+
+
+def get_storage():
+    return import_string(settings.UPLOADS['STORAGE'])()
+
+
+def get_staged_path(upload):
+    return os.path.join(settings.UPLOADS['STAGING_DIR'], upload.token)
+
+
+def get_url(upload, request=None):
+    """The stable URL of ``upload``, absolute when ``request`` is given."""
+    url = reverse('uploaded_file', args=[upload.token])
+    return request.build_absolute_uri(url) if request is not None else url
+
+
+def write_staged(file, path):
+    """Copy ``file`` to ``path`` chunk by chunk; returns its ``(sha256, size)``."""
+    directory = os.path.dirname(path)
+    os.makedirs(directory, exist_ok=True)
+    digest = hashlib.sha256()
+    size = 0
+    # Written under a temporary name so a half-written file is never served.
+    with tempfile.NamedTemporaryFile(dir=directory, prefix='.', delete=False) as temp:
+        try:
+            for chunk in file.chunks():
+                digest.update(chunk)
+                temp.write(chunk)
+                size += len(chunk)
+        except BaseException:
+            temp.close()
+            os.unlink(temp.name)
+            raise
+    os.replace(temp.name, path)
+    return digest.hexdigest(), size
+
+
+def get_image_type(file):
+    """The content type of the image in ``file``; raises NotAnImage unless it is one of IMAGE_FORMATS."""
+    try:
+        with Image.open(file, formats=IMAGE_FORMATS) as image:
+            content_type = Image.MIME[image.format]
+            image.verify()
+    except Exception as e:
+        raise NotAnImage("Upload a valid GIF, JPEG, PNG or WebP image.") from e
+    finally:
+        file.seek(0)
+    return content_type
+
+
+def stage(file, user=None):
+    """
+    Stage the uploaded ``file`` and queue its push to storage; returns the Upload.
+
+    Raises NotAnImage, before anything is written, unless ``file`` is an accepted image.
+    """
+    content_type = get_image_type(file)
+    file_name = os.path.basename(file.name)
+    if mimetypes.guess_type(file_name)[0] != content_type:
+        file_name = os.path.splitext(file_name)[0] + mimetypes.guess_extension(content_type)
+    upload = Upload(
+        token=uuid4().hex,
+        file_name=file_name,
+        content_type=content_type,
+        created_by=user,
+    )
+    path = get_staged_path(upload)
+    upload.sha256, upload.size = write_staged(file, path)
+    try:
+        with transaction.atomic():
+            upload.save()
+            queue.enqueue(push, args=[upload.pk], queue=settings.UPLOADS['QUEUE'])
+    except BaseException:
+        os.unlink(path)
+        raise
+    return upload
+
+
+def push(pk):
+    """Task: save a staged upload to storage and record its link. Does nothing once stored."""
+    upload = Upload.objects.filter(pk=pk, status=Upload.Status.STAGED).first()
+    if upload is None:
+        return
+    storage = get_storage()
+    path = get_staged_path(upload)
+    with open(path, 'rb') as f:
+        name = storage.save(f'{UPLOAD_PREFIX}{upload.file_name}', File(f, name=upload.file_name))
+    Upload.objects.filter(pk=pk).update(
+        status=Upload.Status.STORED, storage_name=name, url=storage.url(name), stored_on=timezone.now(),
+    )
+    os.unlink(path)
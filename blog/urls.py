@@ -1,8 +1,9 @@
 from django.conf import settings
 from django.conf.urls.static import static
 from django.urls import path
-from .views import upload_file
+from .views import upload_file, uploaded_file
 
 urlpatterns = [
     path("upload/", upload_file, name="upload_file"),
+    path("uploads/<slug:token>/", uploaded_file, name="uploaded_file"),
 ]
@@ -1,42 +1,36 @@
-import http
+from django.http import FileResponse, Http404, HttpResponseRedirect, JsonResponse
+from django.shortcuts import get_object_or_404
+from django.utils.cache import patch_cache_control
+from django.views.decorators.http import require_safe
 
-from django.http import JsonResponse
-from django.views.decorators.csrf import csrf_exempt
-from rest_framework.exceptions import APIException
-from storages.backends.dropbox import DropboxStorage
-from dropbox.exceptions import ApiError
-from django.utils._os import safe_join
+from . import uploads
+from .models import Upload
 
+# Seconds browsers may reuse the redirect to a stored upload's link, and a staged copy.
+STORED_MAX_AGE = 3600
+STAGED_MAX_AGE = 60
 
-class ModifiedDropboxStorage(DropboxStorage):
 
-    def url(self, name):
-        # Get or create a shared link for the file to avoid temporary URL expiration
-        if name == "/":
-            name = ""
-        full_path = safe_join(self.root_path, name).replace("\\", "/")
-        shared_link_metadata = self.client.sharing_create_shared_link_with_settings(full_path)
-        url = shared_link_metadata.url.replace('dl=0', 'dl=1')
-        return url
-
-
-@csrf_exempt
 def upload_file(request):
-    if request.method == 'POST' or request.method == 'PATCH' and request.FILES.get('file'):
-        uploaded_file = request.FILES['upload']
-
-        storage = ModifiedDropboxStorage()
-        filename = storage.save(f'images/{uploaded_file.name}', uploaded_file)
+    if not request.user.is_authenticated:
+        return JsonResponse({
+            'error': 'Authentication required',
+            'uploaded': False
+        }, status=403)
 
+    uploaded_file = request.FILES.get('upload')
+    if request.method in ('POST', 'PATCH') and uploaded_file:
         try:
-            dbx = storage.client
-        except ApiError as e:
-            return APIException(detail='Failed to connect to cloud', code=http.HTTPStatus.INTERNAL_SERVER_ERROR)
-        file_url = storage.url(filename)
+            upload = uploads.stage(uploaded_file, user=request.user)
+        except uploads.NotAnImage as e:
+            return JsonResponse({
+                'error': str(e),
+                'uploaded': False
+            }, status=400)
 
         return JsonResponse({
-            'url': request.build_absolute_uri(file_url),
-            'file_name': filename,
+            'url': uploads.get_url(upload, request),
+            'file_name': upload.file_name,
             'uploaded': True
         })
 
@@ -44,3 +38,30 @@ def upload_file(request):
         'error': 'No file uploaded',
         'uploaded': False
     })
+
+
+def redirect_to_stored(upload):
+    response = HttpResponseRedirect(upload.url)
+    patch_cache_control(response, public=True, max_age=STORED_MAX_AGE)
+    return response
+
+
+@require_safe
+def uploaded_file(request, token):
+    """Redirect to the stored file of an upload, or serve its staged copy until it is stored."""
+    upload = get_object_or_404(Upload, token=token)
+    if upload.status == Upload.Status.STORED:
+        return redirect_to_stored(upload)
+    try:
+        f = open(uploads.get_staged_path(upload), 'rb')
+    except FileNotFoundError:
+        # Stored, and the staged copy removed, since the row was read.
+        upload.refresh_from_db()
+        if upload.status == Upload.Status.STORED:
+            return redirect_to_stored(upload)
+        raise Http404("The uploaded file is missing.")
+    # Downloaded, never rendered, in case a file still passes for something other than an image.
+    response = FileResponse(f, content_type=upload.content_type, as_attachment=True, filename=upload.file_name)
+    response['X-Content-Type-Options'] = 'nosniff'
+    patch_cache_control(response, public=True, max_age=STAGED_MAX_AGE)
+    return response
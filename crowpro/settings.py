@@ -1,7 +1,9 @@
 from pathlib import Path
 from . import ckeditor_config as ck
 from datetime import timedelta
+from importlib.util import find_spec
 import os
+import sys
 import logging
 from dotenv import load_dotenv
 
@@ -17,8 +19,10 @@ DROPBOX_APP_KEY = os.getenv("DROPBOX_APP_KEY")
 DROPBOX_APP_SECRET = os.getenv("DROPBOX_APP_SECRET")
 DROPBOX_OAUTH2_REFRESH_TOKEN = os.getenv("DROPBOX_OAUTH2_REFRESH_TOKEN")
 DROPBOX_OAUTH2_TOKEN = os.getenv("DROPBOX_OAUTH2_TOKEN")
+DROPBOX_SHARED_LINK_CACHE_SIZE = int(os.getenv("DROPBOX_SHARED_LINK_CACHE_SIZE", 2048))
 
 DEBUG = os.getenv("DEBUG", False) == "True"
+TESTING = sys.argv[1:2] == ['test']
 
 STATIC_ROOT = BASE_DIR / 'staticfiles'
 STATIC_URL = 'static/'
@@ -50,6 +54,7 @@ INSTALLED_APPS = [
     'authentication',
     'blog',
     'logs',
+    'tasks',
     'django_ckeditor_5',
     'rest_framework',
     'rest_framework.authtoken',
@@ -65,6 +70,7 @@ INSTALLED_APPS = [
 MIDDLEWARE = [
     'django.middleware.security.SecurityMiddleware',
     'whitenoise.middleware.WhiteNoiseMiddleware',
+    'api.compression.CompressionMiddleware',
     'corsheaders.middleware.CorsMiddleware',
     'django.contrib.sessions.middleware.SessionMiddleware',
     'django.middleware.common.CommonMiddleware',
@@ -75,6 +81,14 @@ MIDDLEWARE = [
     'logs.middleware.RequestLoggingMiddleware',
 ]
 
+# Request logs are buffered and bulk inserted by a background thread; "sync" writes inline.
+REQUEST_LOG_SINK = {
+    'MODE': os.getenv("REQUEST_LOG_MODE", "sync" if TESTING else "async"),
+    'BATCH_SIZE': int(os.getenv("REQUEST_LOG_BATCH_SIZE", 100)),
+    'FLUSH_INTERVAL': float(os.getenv("REQUEST_LOG_FLUSH_INTERVAL", 1.0)),
+    'MAX_QUEUE': int(os.getenv("REQUEST_LOG_MAX_QUEUE", 10000)),
+}
+
 ROOT_URLCONF = 'crowpro.urls'
 
 TEMPLATE_DIR = BASE_DIR / 'templates'
@@ -104,9 +118,100 @@ REST_FRAMEWORK = {
     ),
     'DEFAULT_PERMISSION_CLASSES': (
         'rest_framework.permissions.IsAuthenticated',
-    )
+    ),
+    'DEFAULT_PAGINATION_CLASS': 'api.pagination.PublicationCursorPagination',
+    'PAGE_SIZE': int(os.getenv("API_PAGE_SIZE", 20)),
+    # api.renderers and api.parsers use orjson when installed; MessagePack is
+    # only negotiated when msgpack is installed.
+    'DEFAULT_RENDERER_CLASSES': [
+        'api.renderers.JSONRenderer',
+        *(['api.renderers.MessagePackRenderer'] if find_spec('msgpack') else []),
+        'rest_framework.renderers.BrowsableAPIRenderer',
+    ],
+    'DEFAULT_PARSER_CLASSES': [
+        'api.parsers.JSONParser',
+        *(['api.parsers.MessagePackParser'] if find_spec('msgpack') else []),
+        'rest_framework.parsers.FormParser',
+        'rest_framework.parsers.MultiPartParser',
+    ],
+}
+
+# Invalidation goes through the cache, so deployments running several workers
+# need the shared Redis backend; the local-memory fallback suits a single process.
+CACHES = {
+    'default': {
+        'BACKEND': 'django.core.cache.backends.redis.RedisCache',
+        'LOCATION': os.getenv("REDIS_URL"),
+    } if os.getenv("REDIS_URL") else {
+        'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
+        'LOCATION': 'crowpro',
+    },
 }
 
+# Whether every process, gunicorn workers, run_worker and publish_scheduled alike,
+# sees the same cache. Cached responses and user snapshots are invalidated through
+# it, so they are only used when it is; the local-memory fallback is only shared
+# by one process.
+SHARED_CACHE = os.getenv("SHARED_CACHE", str(bool(os.getenv("REDIS_URL")) or TESTING)) == "True"
+
+# Seconds an anonymous response of a public publication endpoint is served from
+# the cache; 0 disables the response cache, and so does an unshared cache.
+RESPONSE_CACHE_TTL = int(os.getenv("RESPONSE_CACHE_TTL", 0 if TESTING else 300))
+
+# gzip/brotli for API responses of at least MIN_SIZE bytes; brotli needs the
+# brotli package. Cached responses keep their compressed variants.
+RESPONSE_COMPRESSION = {
+    'MIN_SIZE': int(os.getenv("RESPONSE_COMPRESSION_MIN_SIZE", 1024)),
+    'GZIP_LEVEL': int(os.getenv("RESPONSE_COMPRESSION_GZIP_LEVEL", 6)),
+    'BROTLI_QUALITY': int(os.getenv("RESPONSE_COMPRESSION_BROTLI_QUALITY", 5)),
+}
+
+# Seconds a cached user snapshot may serve JWT authentication; saving the user
+# invalidates it immediately. 0, or an unshared cache, loads the user from the
+# database every request.
+USER_CACHE_TTL = int(os.getenv("USER_CACHE_TTL", 0 if TESTING else 300))
+
+# Rows serialized per batch by streaming exports such as posts/articles/all?stream=ndjson.
+EXPORT_CHUNK_SIZE = int(os.getenv("EXPORT_CHUNK_SIZE", 500))
+
+# Background tasks run by manage.py run_worker, see tasks.queue. Backoffs and
+# timeouts are in seconds; succeeded tasks are deleted unless KEEP_SUCCEEDED.
+TASKS = {
+    'CONCURRENCY': int(os.getenv("TASKS_CONCURRENCY", 4)),
+    'POLL_INTERVAL': float(os.getenv("TASKS_POLL_INTERVAL", 1)),
+    'MAX_ATTEMPTS': int(os.getenv("TASKS_MAX_ATTEMPTS", 5)),
+    'BACKOFF': float(os.getenv("TASKS_BACKOFF", 10)),
+    'MAX_BACKOFF': float(os.getenv("TASKS_MAX_BACKOFF", 3600)),
+    'LOCK_TIMEOUT': float(os.getenv("TASKS_LOCK_TIMEOUT", 600)),
+    'KEEP_SUCCEEDED': os.getenv("TASKS_KEEP_SUCCEEDED", "False") == "True",
+}
+
+# Editor uploads are staged in STAGING_DIR and pushed to STORAGE by a task; the
+# staged copy is served until then. See blog.uploads.
+UPLOADS = {
+    'STAGING_DIR': os.getenv("UPLOADS_STAGING_DIR", os.path.join(BASE_DIR, 'staging')),
+    'STORAGE': os.getenv("UPLOADS_STORAGE", "blog.storage.ModifiedDropboxStorage"),
+    'QUEUE': os.getenv("UPLOADS_QUEUE", "default"),
+}
+
+# Resized copies of publication thumbnails and profile pictures, written next
+# to the original by a task; see blog.thumbnails. FORMATS are webp and/or jpeg.
+THUMBNAILS = {
+    'WIDTHS': [int(width) for width in os.getenv("THUMBNAIL_WIDTHS", "320,640,1280").split(',')],
+    'FORMATS': os.getenv("THUMBNAIL_FORMATS", "webp,jpeg").split(','),
+    'QUALITY': int(os.getenv("THUMBNAIL_QUALITY", 80)),
+    'QUEUE': os.getenv("THUMBNAIL_QUEUE", "default"),
+}
+
+# Seconds between polls of manage.py publish_scheduled.
+SCHEDULED_PUBLISHING_INTERVAL = float(os.getenv("SCHEDULED_PUBLISHING_INTERVAL", 30))
+
+# Publications one request to publications/bulk/<action>/ may change.
+BULK_ACTION_MAX_ITEMS = int(os.getenv("BULK_ACTION_MAX_ITEMS", 500))
+
+# Seconds a StatsView snapshot is reused for; 0 recomputes on every request.
+STATS_CACHE_TTL = int(os.getenv("STATS_CACHE_TTL", 15))
+
 SIMPLE_JWT = {
     "TOKEN_BLACKLIST_ENABLED": True,
     "ACCESS_TOKEN_LIFETIME": timedelta(seconds=float(os.getenv("ACCESS_TOKEN_LIFETIME"))),
@@ -148,4 +253,6 @@ LOGOUT_REDIRECT_URL = '/'
 AUTH_USER_MODEL = 'users.User'
 
 GEOIP_PATH = os.path.join(BASE_DIR, 'geoip')
+REQUEST_LOG_USER_AGENT_CACHE_SIZE = int(os.getenv("REQUEST_LOG_USER_AGENT_CACHE_SIZE", 4096))
+REQUEST_LOG_GEOIP_CACHE_SIZE = int(os.getenv("REQUEST_LOG_GEOIP_CACHE_SIZE", 16384))
 
@@ -1,14 +1,27 @@
+import logging
 import time
+from django.conf import settings
 from django.utils.timezone import now
-from django.contrib.gis.geoip2 import GeoIP2
+from django.contrib.gis.geoip2 import GeoIP2, GeoIP2Exception
+from geoip2.database import MODE_MMAP
 from user_agents import parse as parse_ua
+from crowpro.lru import LRUCache
 from logs.models import RequestLog
+from logs.sink import get_request_log_sink
+
+logger = logging.getLogger(__name__)
+
+# Parsed (device, browser, os) keyed by the raw User-Agent header.
+user_agent_cache = LRUCache(maxsize=settings.REQUEST_LOG_USER_AGENT_CACHE_SIZE)
+# (country, timezone) keyed by client IP.
+geoip_cache = LRUCache(maxsize=settings.REQUEST_LOG_GEOIP_CACHE_SIZE)
 
 
 class RequestLoggingMiddleware:
     def __init__(self, get_response):
         self.get_response = get_response
-        self.geoip = GeoIP2()
+        self.geoip = open_geoip()
+        self.sink = get_request_log_sink()
 
     def __call__(self, request):
         # Start timer
@@ -21,25 +34,10 @@ class RequestLoggingMiddleware:
         remote_addr = get_client_ip(request)
         referrer = request.META.get('HTTP_REFERER', '')
         user_agent_str = request.META.get('HTTP_USER_AGENT', '')
-        user_agent = parse_ua(user_agent_str)
-
-        device = (
-            "Mobile" if user_agent.is_mobile
-            else "Tablet" if user_agent.is_tablet
-            else "PC"
-        )
-        browser = f"{user_agent.browser.family} {user_agent.browser.version_string}"
-        os = f"{user_agent.os.family} {user_agent.os.version_string}"
+        device, browser, os = parse_user_agent(user_agent_str)
 
         # Geolocation
-        country = ''
-        timezone = ''
-        try:
-            geo_data = self.geoip.city(remote_addr)
-            country = geo_data.get('country_name', '')
-            timezone = geo_data.get('time_zone', '')
-        except Exception:
-            pass
+        country, timezone = locate_ip(self.geoip, remote_addr)
 
         # Get user if authenticated
         user = request.user if request.user.is_authenticated else None
@@ -48,8 +46,8 @@ class RequestLoggingMiddleware:
         response = self.get_response(request)
         duration = (time.time() - start_time) * 1000  # in ms
 
-        # Save the log
-        RequestLog.objects.create(
+        # Queue the log; the sink inserts it in a batch off the request thread
+        self.sink.submit(RequestLog(
             user=user,
             method=method,
             path=path,
@@ -64,11 +62,56 @@ class RequestLoggingMiddleware:
             timezone=timezone,
             status_code=response.status_code,
             duration_ms=round(duration, 2),
-        )
+        ))
 
         return response
 
 
+def open_geoip():
+    # Memory-mapped so forked gunicorn workers share the database pages.
+    try:
+        return GeoIP2(cache=MODE_MMAP)
+    except GeoIP2Exception as e:
+        logger.warning("GeoIP lookups disabled: %s", e)
+        return None
+
+
+def parse_user_agent(user_agent_str):
+    def parse():
+        user_agent = parse_ua(user_agent_str)
+        device = (
+            "Mobile" if user_agent.is_mobile
+            else "Tablet" if user_agent.is_tablet
+            else "PC"
+        )
+        browser = f"{user_agent.browser.family} {user_agent.browser.version_string}"
+        os = f"{user_agent.os.family} {user_agent.os.version_string}"
+        return device, browser, os
+
+    return user_agent_cache.get_or_set(user_agent_str, parse)
+
+
+def locate_ip(geoip, remote_addr):
+    if geoip is None or not remote_addr:
+        return '', ''
+
+    def locate():
+        try:
+            geo_data = geoip.city(remote_addr)
+        except Exception:
+            return '', ''
+        return geo_data.get('country_name', ''), geo_data.get('time_zone', '')
+
+    return geoip_cache.get_or_set(remote_addr, locate)
+
+
+def get_cache_stats():
+    return {
+        'user_agent': user_agent_cache.stats(),
+        'geoip': geoip_cache.stats(),
+    }
+
+
 def get_client_ip(request):
     x_forwarded_for = request.META.get('HTTP_X_FORWARDED_FOR')
     return x_forwarded_for.split(',')[0].strip() if x_forwarded_for else request.META.get('REMOTE_ADDR')
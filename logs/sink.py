@@ -0,0 +1,139 @@
+import atexit
+import logging
+import queue
+import threading
+import time
+
+from django.conf import settings
+from django.db import close_old_connections
+
+from logs.models import RequestLog
+
+logger = logging.getLogger(__name__)
+
+SYNC, ASYNC = 'sync', 'async'
+
+
+class RequestLogSink:
+    """
+    Buffers RequestLog rows and writes them with ``bulk_create`` off the request thread.
+
+    Records go onto a bounded queue. A daemon thread drains it and inserts a
+    batch when ``batch_size`` rows are waiting or ``flush_interval`` seconds
+    have passed, whichever comes first. When the queue is full new records are
+    dropped and counted rather than slowing requests down. In ``sync`` mode
+    every record is inserted immediately, which is what tests want.
+    """
+
+    def __init__(self, mode=ASYNC, batch_size=100, flush_interval=1.0, max_queue=10000):
+        self.mode = mode
+        self.batch_size = batch_size
+        self.flush_interval = flush_interval
+        self.queue = queue.Queue(maxsize=max_queue)
+        self.enqueued = 0
+        self.written = 0
+        self.dropped = 0
+        self.failed = 0
+        self.flushes = 0
+        self._write_lock = threading.Lock()
+        self._start_lock = threading.Lock()
+        self._stop = threading.Event()
+        self._thread = None
+
+    def submit(self, record):
+        if self.mode == SYNC:
+            self.enqueued += 1
+            self._write([record])
+            return True
+
+        self._ensure_started()
+        try:
+            self.queue.put_nowait(record)
+        except queue.Full:
+            self.dropped += 1
+            return False
+        self.enqueued += 1
+        return True
+
+    def flush(self):
+        """Write everything currently queued, in batches. Safe to call from any thread."""
+        while True:
+            batch = self._drain(block=False)
+            if not batch:
+                return
+            self._write(batch)
+
+    def stop(self, timeout=5.0):
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join(timeout)
+            self._thread = None
+        self.flush()
+
+    def stats(self):
+        return {
+            'mode': self.mode,
+            'queued': self.queue.qsize(),
+            'enqueued': self.enqueued,
+            'written': self.written,
+            'dropped': self.dropped,
+            'failed': self.failed,
+            'flushes': self.flushes,
+        }
+
+    def _ensure_started(self):
+        if self._thread is not None and self._thread.is_alive():
+            return
+        with self._start_lock:
+            if self._thread is None or not self._thread.is_alive():
+                self._stop.clear()
+                self._thread = threading.Thread(target=self._run, name='request-log-sink', daemon=True)
+                self._thread.start()
+
+    def _run(self):
+        while not self._stop.is_set():
+            batch = self._drain(block=True)
+            if batch:
+                close_old_connections()
+                self._write(batch)
+
+    def _drain(self, block):
+        batch = []
+        deadline = time.monotonic() + self.flush_interval
+        while len(batch) < self.batch_size:
+            try:
+                if block:
+                    remaining = deadline - time.monotonic()
+                    if remaining <= 0:
+                        break
+                    batch.append(self.queue.get(timeout=remaining))
+                else:
+                    batch.append(self.queue.get_nowait())
+            except queue.Empty:
+                break
+        return batch
+
+    def _write(self, batch):
+        with self._write_lock:
+            try:
+                RequestLog.objects.bulk_create(batch, batch_size=self.batch_size)
+            except Exception:
+                self.failed += len(batch)
+                logger.exception("Failed to write %d request logs", len(batch))
+            else:
+                self.written += len(batch)
+                self.flushes += 1
+
+
+_sink = None
+_sink_lock = threading.Lock()
+
+
+def get_request_log_sink():
+    global _sink
+    if _sink is None:
+        with _sink_lock:
+            if _sink is None:
+                _sink = RequestLogSink(**{key.lower(): value for key, value in settings.REQUEST_LOG_SINK.items()})
+                atexit.register(_sink.stop)
+    return _sink
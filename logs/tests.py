@@ -1,3 +1,86 @@
-from django.test import TestCase
+from unittest.mock import patch
 
-# Create your tests here.
+from django.test import TestCase, TransactionTestCase
+
+from crowpro.lru import LRUCache
+from .middleware import geoip_cache, locate_ip, parse_user_agent, user_agent_cache
+from .models import RequestLog
+from .sink import RequestLogSink
+
+
+def make_log(path='/api/posts/'):
+    return RequestLog(method='GET', path=path, headers={}, status_code=200)
+
+
+class SyncRequestLogSinkTest(TestCase):
+    def test_sync_mode_writes_inline(self):
+        sink = RequestLogSink(mode='sync')
+        sink.submit(make_log())
+        self.assertEqual(RequestLog.objects.count(), 1)
+        self.assertEqual(sink.stats()['written'], 1)
+
+    def test_drops_when_queue_is_full(self):
+        sink = RequestLogSink(max_queue=2)
+        with patch.object(sink, '_ensure_started'):
+            results = [sink.submit(make_log()) for _ in range(3)]
+        self.assertEqual(results, [True, True, False])
+        self.assertEqual(sink.dropped, 1)
+
+        sink.flush()
+        self.assertEqual(RequestLog.objects.count(), 2)
+
+
+class AsyncRequestLogSinkTest(TransactionTestCase):
+    def test_background_thread_writes_in_batches(self):
+        sink = RequestLogSink(batch_size=2, flush_interval=0.05)
+        for i in range(5):
+            sink.submit(make_log(f'/api/posts/{i}/'))
+        sink.stop()
+
+        self.assertEqual(RequestLog.objects.count(), 5)
+        stats = sink.stats()
+        self.assertEqual((stats['written'], stats['dropped'], stats['queued']), (5, 0, 0))
+        self.assertGreaterEqual(stats['flushes'], 3)
+
+
+class FakeGeoIP:
+    def __init__(self):
+        self.lookups = 0
+
+    def city(self, ip):
+        self.lookups += 1
+        return {'country_name': 'Nepal', 'time_zone': 'Asia/Kathmandu'}
+
+
+class RequestMetadataCacheTest(TestCase):
+    user_agent = 'Mozilla/5.0 (iPhone; CPU iPhone OS 17_0 like Mac OS X) AppleWebKit/605.1.15 Mobile/15E148'
+
+    def setUp(self):
+        user_agent_cache.clear()
+        geoip_cache.clear()
+
+    def test_user_agent_is_parsed_once(self):
+        with patch('logs.middleware.parse_ua', wraps=__import__('user_agents').parse) as parse:
+            first = parse_user_agent(self.user_agent)
+            second = parse_user_agent(self.user_agent)
+        self.assertEqual(first, second)
+        self.assertEqual(first[0], 'Mobile')
+        self.assertEqual(parse.call_count, 1)
+        self.assertEqual(user_agent_cache.stats()['hits'], 1)
+        self.assertEqual(user_agent_cache.stats()['misses'], 1)
+
+    def test_ip_is_located_once(self):
+        geoip = FakeGeoIP()
+        for _ in range(3):
+            self.assertEqual(locate_ip(geoip, '27.34.0.1'), ('Nepal', 'Asia/Kathmandu'))
+        self.assertEqual(geoip.lookups, 1)
+
+    def test_missing_database(self):
+        self.assertEqual(locate_ip(None, '27.34.0.1'), ('', ''))
+
+    def test_capacity_is_bounded(self):
+        cache = LRUCache(maxsize=2)
+        for key in 'abc':
+            cache.set(key, key)
+        self.assertNotIn('a', cache)
+        self.assertEqual(cache.stats()['evictions'], 1)
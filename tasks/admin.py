@@ -0,0 +1,18 @@
+from django.contrib import admin
+
+from tasks import queue
+from tasks.models import Task
+
+
+@admin.register(Task)
+class TaskAdmin(admin.ModelAdmin):
+    list_display = ['name', 'queue', 'status', 'attempts', 'max_attempts', 'run_at', 'locked_by', 'created_on']
+    list_filter = ['status', 'queue']
+    search_fields = ['name', 'last_error']
+    readonly_fields = ['locked_by', 'locked_at', 'created_on', 'finished_on', 'last_error']
+    actions = ['retry']
+
+    @admin.action(description="Retry selected dead tasks")
+    def retry(self, request, queryset):
+        count = queue.retry(queryset)
+        self.message_user(request, f"Queued {count} task(s) again.")
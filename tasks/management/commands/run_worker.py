@@ -0,0 +1,46 @@
+import signal
+
+from django.conf import settings
+from django.core.management.base import BaseCommand
+
+from tasks.models import DEFAULT_QUEUE
+from tasks.worker import Worker
+
+
+class Command(BaseCommand):
+    help = "Run queued background tasks until stopped."
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--concurrency', type=int, default=settings.TASKS['CONCURRENCY'],
+            help="Tasks run at the same time, each on its own thread and database connection.",
+        )
+        parser.add_argument(
+            '--queue', action='append', dest='queues',
+            help=f"Queue to take tasks from; repeat for several. Defaults to {DEFAULT_QUEUE!r}.",
+        )
+        parser.add_argument(
+            '--interval', type=float, default=settings.TASKS['POLL_INTERVAL'],
+            help="Seconds an idle thread waits before polling again.",
+        )
+        parser.add_argument(
+            '--burst', action='store_true',
+            help="Exit once the queues are empty.",
+        )
+
+    def handle(self, *args, **options):
+        worker = Worker(
+            queues=options['queues'] or [DEFAULT_QUEUE],
+            concurrency=max(options['concurrency'], 1),
+            poll_interval=options['interval'],
+        )
+        previous_handler = signal.signal(signal.SIGTERM, lambda signum, frame: worker.stop())
+        try:
+            worker.run(burst=options['burst'])
+        except KeyboardInterrupt:
+            worker.stop()
+        finally:
+            signal.signal(signal.SIGTERM, previous_handler)
+        self.stdout.write(self.style.SUCCESS(
+            f"Ran {worker.processed} task(s), {worker.failed} failed."
+        ))
@@ -0,0 +1,42 @@
+from django.db import models
+from django.utils import timezone
+from django.utils.translation import gettext_lazy as _
+
+DEFAULT_QUEUE = 'default'
+
+
+class Task(models.Model):
+    """A call to ``name``, an importable function, waiting to run on a worker; see ``tasks.queue``."""
+
+    class Status(models.TextChoices):
+        QUEUED = 'QUEUED', _('Queued')
+        RUNNING = 'RUNNING', _('Running')
+        SUCCEEDED = 'SUCCEEDED', _('Succeeded')
+        # Dead-lettered: out of attempts, kept for inspection or a manual retry.
+        DEAD = 'DEAD', _('Dead')
+
+    name = models.CharField(max_length=255)
+    args = models.JSONField(default=list, blank=True)
+    kwargs = models.JSONField(default=dict, blank=True)
+    queue = models.CharField(max_length=64, default=DEFAULT_QUEUE)
+    status = models.CharField(max_length=16, choices=Status.choices, default=Status.QUEUED)
+    attempts = models.PositiveIntegerField(default=0)
+    max_attempts = models.PositiveIntegerField(default=5)
+    run_at = models.DateTimeField(default=timezone.now)
+    locked_by = models.CharField(max_length=128, blank=True, default='')
+    locked_at = models.DateTimeField(null=True, blank=True)
+    last_error = models.TextField(blank=True, default='')
+    created_on = models.DateTimeField(auto_now_add=True)
+    finished_on = models.DateTimeField(null=True, blank=True)
+
+    class Meta:
+        indexes = [
+            # What workers poll: ready tasks of a queue in run_at order.
+            models.Index(fields=['queue', 'run_at', 'id'], condition=models.Q(status='QUEUED'),
+                         name='task_ready_idx'),
+            # Running tasks whose worker may have died.
+            models.Index(fields=['locked_at'], condition=models.Q(status='RUNNING'), name='task_running_idx'),
+        ]
+
+    def __str__(self):
+        return f"{self.name} ({self.get_status_display()})"
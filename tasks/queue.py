@@ -0,0 +1,149 @@
+"""
+A job queue kept in the ``Task`` table, so it needs nothing but the database.
+
+Request code calls :func:`enqueue` with an importable function and its
+JSON-serializable arguments; the row is committed with the request's
+transaction and the request returns. ``manage.py run_worker`` claims ready
+tasks, calls them and records the outcome.
+
+Claiming takes rows with ``SELECT ... FOR UPDATE SKIP LOCKED`` where the
+database supports it, so concurrent workers never wait on each other. Other
+databases (SQLite) claim with one ``UPDATE ... WHERE id IN (SELECT ...)``,
+which their write lock serializes. Either way the claimed rows are stamped
+with a token unique to the claim, so a task is never handed to two workers.
+
+A failed task is queued again after an exponential backoff until it runs out
+of attempts, then dead-lettered with its traceback. Tasks whose worker died
+mid-run are queued again once ``TASKS['LOCK_TIMEOUT']`` has passed, so a task
+may run more than once and should be idempotent.
+"""
+import os
+import socket
+import traceback
+from datetime import timedelta
+from uuid import uuid4
+
+from django.conf import settings
+from django.db import connection, transaction
+from django.db.models import F
+from django.utils import timezone
+from django.utils.module_loading import import_string
+
+from tasks.models import DEFAULT_QUEUE, Task
+
+
+def get_task_name(func):
+    if isinstance(func, str):
+        return func
+    return f'{func.__module__}.{func.__qualname__}'
+
+
+def enqueue(func, args=(), kwargs=None, *, queue=DEFAULT_QUEUE, delay=None, max_attempts=None):
+    """
+    Queue a call to ``func`` (a module-level function or its dotted path).
+
+    ``delay`` is a number of seconds or a timedelta to wait before the first run.
+    """
+    if isinstance(delay, (int, float)):
+        delay = timedelta(seconds=delay)
+    return Task.objects.create(
+        name=get_task_name(func),
+        args=list(args),
+        kwargs=kwargs or {},
+        queue=queue,
+        run_at=timezone.now() + (delay or timedelta()),
+        max_attempts=max_attempts or settings.TASKS['MAX_ATTEMPTS'],
+    )
+
+
+def get_worker_name():
+    return f'{socket.gethostname()}:{os.getpid()}'
+
+
+def claim(worker, queues=(DEFAULT_QUEUE,), limit=1):
+    """Mark up to ``limit`` ready tasks of ``queues`` as running on ``worker`` and return them."""
+    now = timezone.now()
+    # Unique per claim, so the rows this call took can be read back.
+    token = f'{worker}/{uuid4().hex[:12]}'
+    ready = Task.objects.filter(status=Task.Status.QUEUED, queue__in=queues, run_at__lte=now).order_by('run_at', 'pk')
+    values = {'status': Task.Status.RUNNING, 'locked_by': token, 'locked_at': now, 'attempts': F('attempts') + 1}
+    if connection.features.has_select_for_update_skip_locked:
+        with transaction.atomic():
+            pks = list(ready.select_for_update(skip_locked=True).values_list('pk', flat=True)[:limit])
+            Task.objects.filter(pk__in=pks).update(**values)
+    else:
+        # A single statement: the database's write lock serializes competing workers.
+        Task.objects.filter(pk__in=ready.values('pk')[:limit], status=Task.Status.QUEUED).update(**values)
+    return list(Task.objects.filter(status=Task.Status.RUNNING, locked_by=token).order_by('run_at', 'pk'))
+
+
+def get_backoff(attempts):
+    """Seconds to wait before retrying a task that has failed ``attempts`` times."""
+    return min(settings.TASKS['BACKOFF'] * 2 ** (attempts - 1), settings.TASKS['MAX_BACKOFF'])
+
+
+def succeed(task):
+    owned = Task.objects.filter(pk=task.pk, locked_by=task.locked_by)
+    if settings.TASKS['KEEP_SUCCEEDED']:
+        owned.update(status=Task.Status.SUCCEEDED, locked_by='', locked_at=None, finished_on=timezone.now())
+    else:
+        owned.delete()
+
+
+def fail(task, error):
+    """Queue ``task`` again after its backoff, or dead-letter it once it is out of attempts."""
+    now = timezone.now()
+    owned = Task.objects.filter(pk=task.pk, locked_by=task.locked_by)
+    if task.attempts >= task.max_attempts:
+        owned.update(status=Task.Status.DEAD, locked_by='', locked_at=None, last_error=error, finished_on=now)
+    else:
+        owned.update(
+            status=Task.Status.QUEUED, locked_by='', locked_at=None, last_error=error,
+            run_at=now + timedelta(seconds=get_backoff(task.attempts)),
+        )
+
+
+def execute(task):
+    """Run a claimed task and record the outcome; returns whether it succeeded."""
+    try:
+        import_string(task.name)(*task.args, **task.kwargs)
+    except Exception:
+        fail(task, traceback.format_exc())
+        return False
+    succeed(task)
+    return True
+
+
+def requeue_stale(timeout=None):
+    """Queue again, or dead-letter, tasks left running by a worker that died; returns how many."""
+    timeout = settings.TASKS['LOCK_TIMEOUT'] if timeout is None else timeout
+    now = timezone.now()
+    stale = Task.objects.filter(status=Task.Status.RUNNING, locked_at__lt=now - timedelta(seconds=timeout))
+    error = "The worker running this task stopped responding."
+    with transaction.atomic():
+        dead = stale.filter(attempts__gte=F('max_attempts')).update(
+            status=Task.Status.DEAD, locked_by='', locked_at=None, last_error=error, finished_on=now,
+        )
+        queued = stale.update(status=Task.Status.QUEUED, locked_by='', locked_at=None, last_error=error, run_at=now)
+    return dead + queued
+
+
+def retry(queryset):
+    """Queue dead-lettered tasks in ``queryset`` again with fresh attempts; returns how many."""
+    return queryset.filter(status=Task.Status.DEAD).update(
+        status=Task.Status.QUEUED, attempts=0, run_at=timezone.now(), finished_on=None,
+    )
+
+
+def run_pending(queues=(DEFAULT_QUEUE,), worker=None, limit=None):
+    """Run ready tasks in this thread until none are left (or ``limit`` ran); returns how many ran."""
+    worker = worker or get_worker_name()
+    count = 0
+    while limit is None or count < limit:
+        tasks = claim(worker, queues)
+        if not tasks:
+            break
+        for task in tasks:
+            execute(task)
+            count += 1
+    return count
@@ -0,0 +1,123 @@
+from datetime import timedelta
+from io import StringIO
+
+from django.core.management import call_command
+from django.test import TestCase, override_settings
+from django.utils import timezone
+
+from tasks import queue
+from tasks.models import Task
+
+calls = []
+
+
+def record(*args, **kwargs):
+    calls.append((args, kwargs))
+
+
+def explode(message):
+    raise ValueError(message)
+
+
+@override_settings(TASKS={
+    'CONCURRENCY': 1, 'POLL_INTERVAL': 0, 'MAX_ATTEMPTS': 3, 'BACKOFF': 10, 'MAX_BACKOFF': 25,
+    'LOCK_TIMEOUT': 60, 'KEEP_SUCCEEDED': False,
+})
+class TaskQueueTests(TestCase):
+    def setUp(self):
+        calls.clear()
+
+    def make_ready(self):
+        Task.objects.update(run_at=timezone.now())
+
+    def test_enqueued_tasks_run_and_are_removed(self):
+        queue.enqueue(record, args=[1, 'two'], kwargs={'three': 3})
+        queue.enqueue('tasks.tests.record')
+        self.assertEqual(calls, [])
+
+        self.assertEqual(queue.run_pending(), 2)
+        self.assertEqual(calls, [((1, 'two'), {'three': 3}), ((), {})])
+        self.assertFalse(Task.objects.exists())
+
+    @override_settings(TASKS={
+        'CONCURRENCY': 1, 'POLL_INTERVAL': 0, 'MAX_ATTEMPTS': 3, 'BACKOFF': 10, 'MAX_BACKOFF': 25,
+        'LOCK_TIMEOUT': 60, 'KEEP_SUCCEEDED': True,
+    })
+    def test_keep_succeeded(self):
+        task = queue.enqueue(record)
+        queue.run_pending()
+        task.refresh_from_db()
+        self.assertEqual(task.status, Task.Status.SUCCEEDED)
+        self.assertEqual(task.attempts, 1)
+        self.assertIsNotNone(task.finished_on)
+
+    def test_claim_respects_run_at_and_queues(self):
+        later = queue.enqueue(record, delay=60)
+        other = queue.enqueue(record, queue='emails')
+        ready = queue.enqueue(record)
+
+        self.assertEqual(queue.claim('worker-a', limit=10), [ready])
+        self.assertEqual(queue.claim('worker-b', limit=10), [])
+        self.assertEqual(queue.claim('worker-b', queues=['emails']), [other])
+
+        ready.refresh_from_db()
+        self.assertEqual((ready.status, ready.attempts), (Task.Status.RUNNING, 1))
+        self.assertTrue(ready.locked_by.startswith('worker-a/'))
+        later.refresh_from_db()
+        self.assertEqual(later.status, Task.Status.QUEUED)
+
+    def test_failures_back_off_then_dead_letter(self):
+        task = queue.enqueue(explode, args=['boom'])
+        run_at = []
+        for attempt in range(1, 4):
+            self.make_ready()
+            before = timezone.now()
+            self.assertEqual(queue.run_pending(), 1)
+            task.refresh_from_db()
+            self.assertEqual(task.attempts, attempt)
+            self.assertIn('ValueError: boom', task.last_error)
+            run_at.append((task.run_at - before).total_seconds())
+            self.assertEqual(queue.run_pending(), 0)
+
+        self.assertEqual(task.status, Task.Status.DEAD)
+        self.assertIsNotNone(task.finished_on)
+        # 10s, then 20s; the third failure is final.
+        self.assertAlmostEqual(run_at[0], 10, delta=1)
+        self.assertAlmostEqual(run_at[1], 20, delta=1)
+        self.assertEqual(queue.get_backoff(5), 25)
+
+        self.assertEqual(queue.retry(Task.objects.all()), 1)
+        task.refresh_from_db()
+        self.assertEqual((task.status, task.attempts), (Task.Status.QUEUED, 0))
+
+    def test_requeue_stale(self):
+        abandoned = queue.enqueue(record)
+        exhausted = queue.enqueue(record, max_attempts=1)
+        queue.claim('dead-worker', limit=2)
+        self.assertEqual(queue.requeue_stale(), 0)
+
+        Task.objects.update(locked_at=timezone.now() - timedelta(minutes=5))
+        self.assertEqual(queue.requeue_stale(), 2)
+        abandoned.refresh_from_db()
+        exhausted.refresh_from_db()
+        self.assertEqual(abandoned.status, Task.Status.QUEUED)
+        self.assertEqual(exhausted.status, Task.Status.DEAD)
+
+        self.assertEqual(queue.run_pending(), 1)
+        self.assertEqual(len(calls), 1)
+
+    def test_claims_do_not_overlap(self):
+        tasks = [queue.enqueue(record) for _ in range(5)]
+        first = queue.claim('worker-a', limit=3)
+        second = queue.claim('worker-a', limit=3)
+        self.assertEqual(first + second, tasks)
+        self.assertNotEqual(first[0].locked_by, second[0].locked_by)
+        self.assertEqual(queue.claim('worker-b', limit=3), [])
+
+    def test_run_worker_command(self):
+        queue.enqueue(record)
+        queue.enqueue(explode, args=['boom'])
+        out = StringIO()
+        call_command('run_worker', '--burst', '--concurrency', '1', stdout=out)
+        self.assertIn("Ran 2 task(s), 1 failed.", out.getvalue())
+        self.assertEqual(len(calls), 1)
@@ -0,0 +1,88 @@
+import logging
+import threading
+import time
+
+from django.conf import settings
+from django.db import DatabaseError, close_old_connections, connection
+
+from tasks import queue
+
+logger = logging.getLogger(__name__)
+
+
+class Worker:
+    """
+    Runs queued tasks on ``concurrency`` threads until stopped.
+
+    Tasks are mostly I/O (storage uploads, e-mail), so threads in one process
+    are enough; each thread claims one task at a time on its own database
+    connection. The first thread also requeues tasks abandoned by dead workers.
+    With ``burst`` every thread exits once the queue is empty.
+    """
+
+    def __init__(self, queues=(queue.DEFAULT_QUEUE,), concurrency=1, poll_interval=None, name=None):
+        self.queues = tuple(queues)
+        self.concurrency = concurrency
+        self.poll_interval = settings.TASKS['POLL_INTERVAL'] if poll_interval is None else poll_interval
+        self.name = name or queue.get_worker_name()
+        self.stopping = threading.Event()
+        self.processed = 0
+        self.failed = 0
+        self._count_lock = threading.Lock()
+        self._next_requeue = 0
+
+    def stop(self):
+        self.stopping.set()
+
+    def run(self, burst=False):
+        if self.concurrency == 1:
+            self.loop(0, burst)
+            return
+        threads = [
+            threading.Thread(target=self.run_thread, args=(index, burst), name=f'task-worker-{index}', daemon=True)
+            for index in range(self.concurrency)
+        ]
+        for thread in threads:
+            thread.start()
+        try:
+            for thread in threads:
+                while thread.is_alive():
+                    thread.join(0.5)
+        except KeyboardInterrupt:
+            self.stop()
+            for thread in threads:
+                thread.join()
+
+    def run_thread(self, index, burst):
+        try:
+            self.loop(index, burst)
+        finally:
+            connection.close()
+
+    def loop(self, index, burst=False):
+        worker = f'{self.name}:{index}'
+        while not self.stopping.is_set():
+            if not connection.in_atomic_block:
+                close_old_connections()
+            try:
+                if index == 0 and time.monotonic() >= self._next_requeue:
+                    queue.requeue_stale()
+                    self._next_requeue = time.monotonic() + min(settings.TASKS['LOCK_TIMEOUT'] / 2, 60)
+                tasks = queue.claim(worker, self.queues)
+            except DatabaseError:
+                # E.g. a busy SQLite database; poll again later.
+                logger.exception("Claiming tasks failed")
+                self.stopping.wait(self.poll_interval)
+                continue
+            if not tasks:
+                if burst:
+                    return
+                self.stopping.wait(self.poll_interval)
+                continue
+            for task in tasks:
+                succeeded = queue.execute(task)
+                if not succeeded:
+                    logger.warning("Task %s (%s) failed on attempt %s", task.pk, task.name, task.attempts)
+                with self._count_lock:
+                    self.processed += 1
+                    self.failed += not succeeded
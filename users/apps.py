@@ -6,4 +6,4 @@ class UsersConfig(AppConfig):
     name = 'users'  # updated app name to users
 
     def ready(self):
-        pass
+        from users import signals
@@ -0,0 +1,134 @@
+"""
+Cached ``User`` snapshots for request authentication.
+
+Every JWT-authenticated request needs the token's user. Snapshots of the user
+row live in the shared cache next to a per-user version stamp; saving or
+deleting the user replaces the stamp once the transaction commits (see
+``users.signals``), so role, staff and ``is_active`` changes reach the next
+request while unchanged users skip the SELECT. Other processes only see the
+new stamp through a shared cache, so snapshots are only used with
+``SHARED_CACHE``. The password hash is never cached: it stays deferred and is
+loaded on first access.
+
+The user's ``token_version`` is cached on its own so that authenticating a
+token that carries its user's claims costs a single cache read. Revocation has
+to lock every worker out at once, so it too is only cached with ``SHARED_CACHE``.
+"""
+import threading
+from uuid import uuid4
+
+from django.conf import settings
+from django.core.cache import cache
+from django.db import DEFAULT_DB_ALIAS
+
+from users.models import User
+
+KEY_PREFIX = 'users:snapshot'
+UNCACHED_FIELDS = ('password',)
+# Stored as the token version of deleted users; no token carries it.
+REVOKED = -1
+
+
+def is_enabled():
+    return bool(settings.USER_CACHE_TTL) and settings.SHARED_CACHE
+
+
+def _snapshot_fields():
+    return [field.attname for field in User._meta.concrete_fields if field.attname not in UNCACHED_FIELDS]
+
+
+class UserSnapshotCache:
+    def __init__(self):
+        self.hits = 0
+        self.misses = 0
+        self.invalidations = 0
+        self._lock = threading.Lock()
+
+    def _count(self, name):
+        with self._lock:
+            setattr(self, name, getattr(self, name) + 1)
+
+    def version_key(self, user_id):
+        return f'{KEY_PREFIX}:version:{user_id}'
+
+    def snapshot_key(self, user_id):
+        return f'{KEY_PREFIX}:{user_id}'
+
+    def get_version(self, user_id):
+        """The user's current version stamp, created on first use."""
+        key = self.version_key(user_id)
+        version = cache.get(key)
+        if version is None:
+            version = uuid4().hex
+            if not cache.add(key, version, None):
+                version = cache.get(key, version)
+        return version
+
+    def get(self, user_id):
+        """Return the user with ``user_id``; raises ``User.DoesNotExist`` like ``objects.get``."""
+        if not is_enabled():
+            return User.objects.get(pk=user_id)
+
+        version_key, snapshot_key = self.version_key(user_id), self.snapshot_key(user_id)
+        cached = cache.get_many([version_key, snapshot_key])
+        version, snapshot = cached.get(version_key), cached.get(snapshot_key)
+        if version is not None and snapshot is not None and snapshot[0] == version:
+            self._count('hits')
+            values = snapshot[1]
+            return User.from_db(DEFAULT_DB_ALIAS, list(values), list(values.values()))
+
+        self._count('misses')
+        # Read the stamp before the row: a change committed in between leaves
+        # this snapshot under a stale stamp, so it is never served.
+        if version is None:
+            version = self.get_version(user_id)
+        fields = _snapshot_fields()
+        values = User.objects.filter(pk=user_id).values(*fields).first()
+        if values is None:
+            raise User.DoesNotExist(f'User {user_id} does not exist.')
+        cache.set(snapshot_key, (version, values), settings.USER_CACHE_TTL)
+        return User.from_db(DEFAULT_DB_ALIAS, fields, [values[name] for name in fields])
+
+    def token_version_key(self, user_id):
+        return f'{KEY_PREFIX}:token_version:{user_id}'
+
+    def get_token_version(self, user_id):
+        """The user's current ``token_version``, or None if there is no such user."""
+        if not is_enabled():
+            return User.objects.filter(pk=user_id).values_list('token_version', flat=True).first()
+
+        key = self.token_version_key(user_id)
+        token_version = cache.get(key)
+        if token_version is None:
+            self._count('misses')
+            token_version = User.objects.filter(pk=user_id).values_list('token_version', flat=True).first()
+            if token_version is None:
+                return None
+            # add() never overwrites the value a concurrent invalidate() just stored.
+            cache.add(key, token_version, settings.USER_CACHE_TTL)
+        else:
+            self._count('hits')
+        return token_version
+
+    def invalidate(self, user_id, token_version=REVOKED):
+        """Drop the user's snapshot and publish their current ``token_version``."""
+        self._count('invalidations')
+        cache.set(self.version_key(user_id), uuid4().hex, None)
+        cache.delete(self.snapshot_key(user_id))
+        cache.set(self.token_version_key(user_id), token_version, settings.USER_CACHE_TTL or None)
+
+    def stats(self):
+        lookups = self.hits + self.misses
+        return {
+            'hits': self.hits,
+            'misses': self.misses,
+            'invalidations': self.invalidations,
+            'hit_rate': round(self.hits / lookups, 4) if lookups else 0.0,
+        }
+
+
+user_cache = UserSnapshotCache()
+
+
+def get_cached_user(user_id):
+    return user_cache.get(user_id)
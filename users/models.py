@@ -27,6 +27,8 @@ ACTION_TYPES = [
 SUCCESS, FAILED = "Success", "Failed"
 ACTION_STATUS = [(SUCCESS, SUCCESS), (FAILED, FAILED)]
 
+TOKEN_STATE_FIELDS = ('role', 'is_staff', 'is_superuser', 'is_active')
+
 
 class User(AbstractUser):
     class Role(models.IntegerChoices):
@@ -42,10 +44,14 @@ class User(AbstractUser):
     display_name = models.CharField(max_length=255, blank=True, null=True)
     email = models.EmailField(unique=True)
     profile_img = models.ImageField(upload_to='images', default='placeholder.png')
+    # Resized copies of profile_img, written by blog.thumbnails.
+    profile_img_derivatives = models.JSONField(default=dict, blank=True, editable=False)
     role = models.PositiveSmallIntegerField(choices=Role.choices, default=Role.READER)
     last_login = models.DateTimeField(blank=True, null=True)
     current_login_ip = models.GenericIPAddressField(blank=True, null=True)
     last_login_ip = models.GenericIPAddressField(blank=True, null=True)
+    # Carried in access tokens; bumping it revokes every token issued before.
+    token_version = models.PositiveIntegerField(default=0)
 
     USERNAME_FIELD = 'email'
     EMAIL_FIELD = 'email'
@@ -59,6 +65,38 @@ class User(AbstractUser):
     def get_display_name(self):
         return self.display_name if self.display_name else self.first_name
 
+    @classmethod
+    def from_db(cls, db, field_names, values):
+        instance = super().from_db(db, field_names, values)
+        instance._token_state = instance.get_token_state()
+        # So blog.thumbnails only queues derivatives for a new picture.
+        instance._loaded_profile_img = instance.__dict__.get('profile_img')
+        return instance
+
+    def get_token_state(self):
+        """The loaded values of the fields whose change must revoke issued tokens."""
+        return {name: self.__dict__[name] for name in TOKEN_STATE_FIELDS if name in self.__dict__}
+
+    def save(self, *args, **kwargs):
+        loaded = getattr(self, '_token_state', None)
+        if not self._state.adding and loaded is not None:
+            current = self.get_token_state()
+            changed = any(current.get(name, value) != value for name, value in loaded.items())
+            # set_password() keeps the raw password in _password until the next save.
+            if changed or self._password is not None:
+                self.token_version += 1
+                if kwargs.get('update_fields') is not None:
+                    kwargs['update_fields'] = {*kwargs['update_fields'], 'token_version'}
+        super().save(*args, **kwargs)
+        self._token_state = self.get_token_state()
+        if 'profile_img' in self.__dict__:
+            self._loaded_profile_img = self.profile_img.name
+
+    def revoke_tokens(self):
+        """Reject every access and refresh token issued to this user so far."""
+        self.token_version += 1
+        self.save(update_fields=['token_version'])
+
 
 class Author(User):
     objects = AuthorManager()
@@ -0,0 +1,31 @@
+from django.db import transaction
+from django.db.models.signals import post_delete, post_save
+from django.dispatch import receiver
+
+from users.cache import REVOKED, user_cache
+from users.models import Admin, Author, Editor, Moderator, Reader, User, Writer
+
+
+# Proxy models such as Author or Editor send the signals with their own class.
+@receiver(post_save, sender=User)
+@receiver(post_save, sender=Author)
+@receiver(post_save, sender=Editor)
+@receiver(post_save, sender=Moderator)
+@receiver(post_save, sender=Admin)
+@receiver(post_save, sender=Reader)
+@receiver(post_save, sender=Writer)
+@receiver(post_delete, sender=User)
+@receiver(post_delete, sender=Author)
+@receiver(post_delete, sender=Editor)
+@receiver(post_delete, sender=Moderator)
+@receiver(post_delete, sender=Admin)
+@receiver(post_delete, sender=Reader)
+@receiver(post_delete, sender=Writer)
+def invalidate_user_snapshot(sender, instance, **kwargs):
+    """
+    Any save of a user replaces their snapshot version: profile edits, password
+    changes (``set_password`` + ``save``), role changes and deactivation alike.
+    """
+    user_id = instance.pk
+    token_version = REVOKED if kwargs['signal'] is post_delete else instance.token_version
+    transaction.on_commit(lambda: user_cache.invalidate(user_id, token_version))
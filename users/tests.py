@@ -1,6 +1,11 @@
-from django.test import TestCase
+from django.core.cache import cache
+from django.test import TestCase, modify_settings, override_settings
+from rest_framework.test import APIClient
+from rest_framework_simplejwt.tokens import AccessToken
 
-from .models import User
+from api.utils import get_user_from_token
+from .cache import get_cached_user, user_cache
+from .models import Author, User
 
 
 class AuthenticationTest(TestCase):
@@ -16,3 +21,100 @@ class AuthenticationTest(TestCase):
     def test_user_is_admin(self):
         user = User.objects.get(email='superuser@email.com')
         self.assertTrue(user.is_superuser)
+
+
+@override_settings(USER_CACHE_TTL=60)
+@modify_settings(MIDDLEWARE={'remove': ['logs.middleware.RequestLoggingMiddleware']})
+class UserSnapshotCacheTest(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.client = APIClient()
+        self.user = User.objects.create_user(email='test@email.com', password='testpass', first_name='Test',
+                                             last_name='Test', role=User.Role.AUTHOR)
+        self.client.credentials(HTTP_AUTHORIZATION=f'Bearer {AccessToken.for_user(self.user)}')
+
+    def get_current_user(self):
+        return self.client.get('/auth/user')
+
+    def save(self, user):
+        with self.captureOnCommitCallbacks(execute=True):
+            user.save()
+
+    def test_authenticated_requests_skip_user_select(self):
+        hits = user_cache.hits
+        self.assertEqual(self.get_current_user().status_code, 200)
+        with self.assertNumQueries(0):
+            response = self.get_current_user()
+        self.assertEqual(response.data['id'], self.user.id)
+        self.assertEqual(user_cache.hits, hits + 1)
+
+    def test_cookie_token(self):
+        self.client.credentials()
+        self.client.cookies['access'] = str(AccessToken.for_user(self.user))
+        self.get_current_user()
+        with self.assertNumQueries(0):
+            self.assertEqual(self.get_current_user().data['id'], self.user.id)
+
+    def test_role_change_is_seen_immediately(self):
+        self.get_current_user()
+        self.user.role = User.Role.EDITOR
+        self.save(self.user)
+        self.assertEqual(self.get_current_user().data['role'], User.Role.EDITOR)
+
+    def test_deactivation_locks_out(self):
+        self.get_current_user()
+        self.user.is_active = False
+        self.save(self.user)
+        self.assertEqual(self.get_current_user().status_code, 401)
+
+    def test_password_change_invalidates(self):
+        get_cached_user(self.user.id)
+        invalidations = user_cache.invalidations
+        self.user.set_password('changed-pass')
+        self.save(self.user)
+        self.assertEqual(user_cache.invalidations, invalidations + 1)
+        with self.assertNumQueries(1):
+            get_cached_user(self.user.id)
+
+    def test_proxy_saves_invalidate(self):
+        get_cached_user(self.user.id)
+        author = Author.objects.get(pk=self.user.pk)
+        author.first_name = 'Renamed'
+        self.save(author)
+        self.assertEqual(get_cached_user(self.user.id).first_name, 'Renamed')
+
+    @override_settings(SHARED_CACHE=False)
+    def test_unshared_cache_reads_the_database(self):
+        get_cached_user(self.user.id)
+        with self.assertNumQueries(1):
+            self.assertEqual(get_cached_user(self.user.id), self.user)
+
+    def test_uncommitted_changes_are_not_applied(self):
+        get_cached_user(self.user.id)
+        with self.captureOnCommitCallbacks(execute=False):
+            self.user.role = User.Role.EDITOR
+            self.user.save()
+            self.assertEqual(get_cached_user(self.user.id).role, User.Role.AUTHOR)
+
+    def test_snapshot_never_holds_password(self):
+        get_cached_user(self.user.id)
+        user = get_cached_user(self.user.id)
+        self.assertIn('password', user.get_deferred_fields())
+        user.first_name = 'Edited'
+        self.save(user)
+        self.user.refresh_from_db()
+        self.assertEqual(self.user.first_name, 'Edited')
+        self.assertTrue(self.user.check_password('testpass'))
+
+    def test_get_user_from_token(self):
+        authorization = f'Bearer {AccessToken.for_user(self.user)}'
+        get_user_from_token(authorization)
+        with self.assertNumQueries(0):
+            self.assertEqual(get_user_from_token(authorization), self.user)
+
+    def test_stats(self):
+        get_cached_user(self.user.id)
+        get_cached_user(self.user.id)
+        stats = user_cache.stats()
+        self.assertEqual(set(stats), {'hits', 'misses', 'invalidations', 'hit_rate'})
+        self.assertGreater(stats['hit_rate'], 0)